@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Career Spark Backend Server (async serving mode)
+
+ASGI app for production serving. The I/O-bound endpoints run as coroutines
+on one event loop, with aioboto3 S3/Bedrock clients and the AsyncGroq
+client, so a request waiting on S3 or an LLM doesn't hold a worker thread:
+  - POST /api/submit-questions
+  - POST /api/find-best-role/<user_id> (and the -stream / -async-stream variants)
+  - POST /api/chat-with-mentor
+Every other path is served by the Flask app in server.py. Requests and
+responses are the same as server.py's.
+
+Run with:
+    cd backend && hypercorn async_server:app --bind 0.0.0.0:3001
+"""
+
+import os
+import sys
+import json
+import asyncio
+
+from quart import Quart, request, jsonify, Response
+from quart_cors import cors
+from asgiref.wsgi import WsgiToAsgi
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.dirname(__file__))
+from server import (
+    app as flask_app,
+    S3_BUCKET,
+    S3_FOLDER,
+    AWS_REGION,
+    PORT,
+    load_user_input_summary,
+    prepare_persona_submission,
+    submit_questions_response_body,
+    recommendation_data,
+    final_result_event,
+    start_client_prewarm,
+)
+from process_s3_scores import asubmit_user_persona
+from debate_agents import stream_debate, GEMINI_MODEL
+from debate_cache import debate_cache_key, aload_cached_debate, astore_cached_debate
+from mentor_agent import aask_llm
+from session_store import get_session_store
+from clients import get_s3_client, get_async_aws_client, get_async_s3_client, close_async_clients
+
+# Path prefixes served by the async app; everything else goes to Flask
+ASYNC_PATH_PREFIXES = ('/api/submit-questions', '/api/find-best-role', '/api/chat-with-mentor')
+
+async_app = cors(Quart(__name__))
+
+
+@async_app.before_serving
+async def open_clients():
+    start_client_prewarm()
+    if os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY'):
+        try:
+            await get_async_s3_client(AWS_REGION)
+            print('Async S3 client initialized successfully')
+        except Exception as s3_error:
+            print(f'Failed to initialize async S3 client: {s3_error}')
+
+
+@async_app.after_serving
+async def close_clients():
+    await close_async_clients()
+
+
+async def get_analysis_object(user_id):
+    """
+    Read a user's analysis file.
+
+    Returns:
+        Tuple of (analysis_body, etag)
+    """
+    s3 = await get_async_s3_client(AWS_REGION)
+    s3_key = f"{S3_FOLDER}/{user_id}_final_userpersona_analysis.json"
+    response = await s3.get_object(Bucket=S3_BUCKET, Key=s3_key)
+    analysis_body = await response['Body'].read()
+    return analysis_body, response.get('ETag')
+
+
+@async_app.route('/api/submit-questions', methods=['POST'])
+async def submit_questions():
+    """Handle questions submission and upload to S3"""
+    try:
+        data = await request.get_json()
+
+        if not data or 'questions' not in data:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request. Questions data is required.'
+            }), 400
+
+        user_id = data.get('user_id', 'uuid001')
+        s3_folder = user_id
+
+        # Validate AWS credentials
+        if not os.getenv('AWS_ACCESS_KEY_ID') or not os.getenv('AWS_SECRET_ACCESS_KEY'):
+            print('AWS credentials not configured')
+            return jsonify({
+                'success': False,
+                'error': 'AWS credentials not configured. Please check your .env file.'
+            }), 500
+
+        if not data.get('questions'):
+            print('⚠️  Warning: No questions found in request data')
+            return jsonify({
+                'success': False,
+                'error': 'Questions data is required in the request.'
+            }), 400
+
+        # The manifest / combine step fans out on its own thread pool, so it
+        # runs in a thread with the shared sync client
+        user_input_summary = await asyncio.to_thread(load_user_input_summary, s3_folder, get_s3_client(AWS_REGION))
+        output_data = prepare_persona_submission(data, user_id, user_input_summary)
+
+        try:
+            print(f'Processing responses and generating personality analysis...')
+            final_output = await asubmit_user_persona(
+                persona_data=output_data,
+                s3_client_instance=await get_async_s3_client(AWS_REGION),
+                bucket=S3_BUCKET,
+                user_id=user_id,
+                metadata={'questionCount': str(len(data['questions']))},
+                bedrock_client=await get_async_aws_client('bedrock-runtime', AWS_REGION),
+                verbose=True
+            )
+
+            if final_output:
+                print(f'✓ Successfully processed and uploaded personality analysis')
+            else:
+                print(f'⚠️  Warning: Processing completed but no output was generated')
+
+            return jsonify(submit_questions_response_body(user_id, output_data))
+
+        except ClientError as upload_error:
+            error_code = upload_error.response.get('Error', {}).get('Code', 'Unknown')
+            error_message = upload_error.response.get('Error', {}).get('Message', str(upload_error))
+            print(f'✗ Failed to upload questions data: {upload_error}')
+            print(f'Error details: Code={error_code}, Message={error_message}')
+            raise Exception(f'Failed to upload to S3: {error_message or error_code}')
+
+    except ClientError as error:
+        error_code = error.response.get('Error', {}).get('Code', 'Unknown')
+        error_message = error.response.get('Error', {}).get('Message', str(error))
+
+        print(f'✗ Upload error: {error}')
+        print(f'Error Code: {error_code}, Message: {error_message}')
+
+        return jsonify({
+            'success': False,
+            'error': error_message,
+            'errorCode': error_code
+        }), 500
+
+    except Exception as error:
+        print(f'✗ Error: {error}')
+
+        error_message = str(error) if str(error) else 'Failed to save questions'
+
+        return jsonify({
+            'success': False,
+            'error': error_message,
+            'details': str(error) if os.getenv('FLASK_ENV') == 'development' else None
+        }), 500
+
+
+@async_app.route('/api/find-best-role/<user_id>', methods=['POST'])
+async def find_best_role(user_id):
+    """Run debate agents to find the best matching role for the user"""
+    try:
+        data = await request.get_json(silent=True) or {}
+        predicted_category = data.get('predicted_category', '')
+
+        if not predicted_category:
+            return jsonify({
+                'success': False,
+                'error': 'predicted_category is required'
+            }), 400
+
+        try:
+            analysis_body, analysis_etag = await get_analysis_object(user_id)
+            user_persona = json.loads(analysis_body.decode('utf-8'))
+
+            # Reuse the stored recommendation if the analysis hasn't changed
+            s3 = await get_async_s3_client(AWS_REGION)
+            cache_key = debate_cache_key(analysis_body, predicted_category, GEMINI_MODEL)
+            cached = await aload_cached_debate(s3, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag)
+
+            if cached:
+                debate_results = cached['results']
+            else:
+                print(f"Running debate agents for user {user_id} with category: {predicted_category}")
+
+                debate_events = []
+                debate_results = {}
+                async for event in stream_debate(user_persona=user_persona, predicted_category=predicted_category, verbose=True):
+                    if event['type'] == 'result':
+                        debate_results = event['data']
+                    else:
+                        debate_events.append(event)
+
+                await astore_cached_debate(s3, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag, debate_results, debate_events)
+
+            if 'error' in debate_results:
+                return jsonify({
+                    'success': False,
+                    'error': debate_results['error']
+                }), 500
+
+            return jsonify({
+                'success': True,
+                **recommendation_data(debate_results, predicted_category)
+            })
+
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            if error_code == 'NoSuchKey':
+                return jsonify({
+                    'success': False,
+                    'error': 'User analysis not found. Please complete the questions first.'
+                }), 404
+            else:
+                print(f'Error fetching analysis: {e}')
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 500
+        except Exception as e:
+            print(f'Error running debate: {e}')
+            import traceback
+            traceback.print_exc()
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    except Exception as error:
+        print(f'Error in find_best_role: {error}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 500
+
+
+@async_app.route('/api/find-best-role-stream/<user_id>', methods=['POST'])
+@async_app.route('/api/find-best-role-async-stream/<user_id>', methods=['POST'])
+async def find_best_role_stream(user_id):
+    """Run debate agents with live streaming output using Server-Sent Events
+
+    Both streaming endpoints of server.py share this handler: events are read
+    straight from the debate's async generator on the serving loop.
+    """
+    data = await request.get_json(silent=True) or {}
+    predicted_category = data.get('predicted_category', '')
+
+    async def generate():
+        try:
+            if not predicted_category:
+                yield f"data: {json.dumps({'type': 'error', 'message': 'predicted_category is required'})}\n\n"
+                return
+
+            try:
+                analysis_body, analysis_etag = await get_analysis_object(user_id)
+                user_persona = json.loads(analysis_body.decode('utf-8'))
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+                if error_code == 'NoSuchKey':
+                    yield f"data: {json.dumps({'type': 'error', 'message': 'User analysis not found. Please complete the questions first.'})}\n\n"
+                else:
+                    yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                return
+
+            # Replay the stored debate right away if the analysis hasn't changed
+            s3 = await get_async_s3_client(AWS_REGION)
+            cache_key = debate_cache_key(analysis_body, predicted_category, GEMINI_MODEL)
+            cached = await aload_cached_debate(s3, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag)
+            if cached:
+                for event in cached.get('events', []):
+                    yield f"data: {json.dumps(event)}\n\n"
+                yield final_result_event(cached['results'], predicted_category)
+                return
+
+            events = stream_debate(user_persona=user_persona, predicted_category=predicted_category)
+            debate_events = []
+            try:
+                async for event in events:
+                    if event['type'] == 'result':
+                        await astore_cached_debate(s3, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag, event['data'], debate_events)
+                        yield final_result_event(event['data'], predicted_category)
+                    else:
+                        debate_events.append(event)
+                        yield f"data: {json.dumps(event)}\n\n"
+            finally:
+                # Cancels the debate if the client disconnected early
+                await events.aclose()
+
+        except Exception as error:
+            print(f'Error in find_best_role_stream: {error}')
+            import traceback
+            traceback.print_exc()
+            yield f"data: {json.dumps({'type': 'error', 'message': str(error)})}\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.timeout = None
+    return response
+
+
+@async_app.route('/api/chat-with-mentor', methods=['POST'])
+async def chat_with_mentor():
+    """Chat with mentor agent about a specific role"""
+    try:
+        data = await request.get_json(silent=True) or {}
+        job_title = data.get('job_title', '')
+        message = data.get('message', '')
+        session_id = data.get('session_id', 'default')
+        category = data.get('category', None)
+
+        if not job_title:
+            return jsonify({
+                'success': False,
+                'error': 'job_title is required'
+            }), 400
+
+        if not message:
+            return jsonify({
+                'success': False,
+                'error': 'message is required'
+            }), 400
+
+        session_store = get_session_store()
+
+        async with session_store.alock(session_id, job_title):
+            conversation_history = await asyncio.to_thread(session_store.get, session_id, job_title)
+
+            reply, updated_history, peer_mentors = await aask_llm(job_title, message, conversation_history, category=category)
+
+            await asyncio.to_thread(session_store.set, session_id, job_title, updated_history)
+
+        response_data = {
+            'success': True,
+            'reply': reply,
+            'job_title': job_title
+        }
+
+        if peer_mentors:
+            response_data['peer_mentors'] = peer_mentors
+
+        return jsonify(response_data)
+
+    except Exception as error:
+        print(f'Error in chat_with_mentor: {error}')
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 500
+
+
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+async def app(scope, receive, send):
+    """ASGI entry point: async endpoints (and lifespan events) go to Quart, the rest to Flask"""
+    if scope['type'] == 'lifespan' or scope.get('path', '').startswith(ASYNC_PATH_PREFIXES):
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
+
+
+if __name__ == '__main__':
+    from hypercorn.config import Config
+    from hypercorn.asyncio import serve
+
+    config = Config()
+    config.bind = [f'0.0.0.0:{PORT}']
+    print(f'\n🚀 Async server running on http://localhost:{PORT}')
+    print(f'📦 S3 Bucket: {S3_BUCKET}')
+    print(f'📁 S3 Folder: {S3_FOLDER}')
+    print(f'🌍 AWS Region: {AWS_REGION}')
+    asyncio.run(serve(app, config))
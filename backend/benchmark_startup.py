@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark.
+
+Imports each backend module in a fresh interpreter (so nothing is cached
+between runs) and reports the median wall time, plus the heavy SDKs each
+import pulled in. Use it to check that importing the server or the CLI
+scripts doesn't load SDKs or create clients ahead of their first use.
+
+Usage:
+    python3 backend/benchmark_startup.py [module ...] [--runs N] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MODULES = ['server', 'async_server', 'process_s3_scores', 'process_s3_files', 'debate_agents', 'mentor_agent']
+
+# SDKs that should only be loaded when a client is first needed
+HEAVY_MODULES = ['boto3', 'aioboto3', 'google.generativeai', 'groq', 'tavily']
+
+_PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+'''
+
+
+def measure_import(module, runs=5):
+    """
+    Import a module in fresh interpreters.
+
+    Returns:
+        Dict with the module name, the 'median' and 'min' import time in
+        seconds, and the 'heavy' SDKs loaded by the import.
+    """
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get('PYTHONPATH')])),
+        # Measure the import itself, not a background warm-up
+        'PREWARM_CLIENTS': 'false',
+    }
+    timings = []
+    heavy = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f'importing {module} failed:\n{result.stderr.strip()}')
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(sample['seconds'])
+        heavy = sample['heavy']
+    return {
+        'module': module,
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'heavy': heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the import time of backend modules.')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='modules to import')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per module')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules:
+        try:
+            results.append(measure_import(module, args.runs))
+        except RuntimeError as e:
+            print(f'❌ {e}', file=sys.stderr)
+            sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f'{"module":<20} {"median":>9} {"min":>9}  SDKs loaded at import')
+    for result in results:
+        heavy = ', '.join(result['heavy']) or '-'
+        print(f'{result["module"]:<20} {result["median"] * 1000:>7.0f}ms {result["min"] * 1000:>7.0f}ms  {heavy}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Process-wide registry of SDK clients.
+
+AWS clients, Gemini models and the Groq/Tavily clients are created once per
+process and reused by every request, so their HTTP connection pools (and TLS
+sessions) stay warm. The SDKs themselves are only imported when a client is
+first requested, so importing this module (or the server) stays cheap;
+prewarm_clients() builds the clients ahead of the first request.
+
+The async serving mode (async_server.py) uses aioboto3 clients instead,
+created once per event loop by get_async_aws_client() and closed by
+close_async_clients().
+"""
+
+import os
+import time
+import asyncio
+import threading
+from contextlib import AsyncExitStack
+
+AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+
+# Connection pool size per AWS client; should cover the busiest thread pool using it
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+
+_clients = {}
+_clients_lock = threading.Lock()
+_gemini_configured = False
+_warmup = {'state': 'cold', 'started_at': None, 'finished_at': None, 'errors': {}}
+
+# aioboto3 clients are bound to the event loop that created them
+_async_clients = {}
+_async_stacks = {}
+_async_locks = {}
+
+
+def aws_credentials():
+    """Explicit AWS credentials from the environment, or {} to use the default chain."""
+    credentials = {}
+    if os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY'):
+        credentials['aws_access_key_id'] = os.getenv('AWS_ACCESS_KEY_ID')
+        credentials['aws_secret_access_key'] = os.getenv('AWS_SECRET_ACCESS_KEY')
+
+        # Add session token if provided (for temporary credentials)
+        if os.getenv('AWS_SESSION_TOKEN'):
+            credentials['aws_session_token'] = os.getenv('AWS_SESSION_TOKEN')
+    return credentials
+
+
+def get_aws_client(service, region=None):
+    """
+    Get the shared boto3 client for a service and region.
+
+    boto3 clients are thread-safe, so one client (and its connection pool)
+    is shared by every request in the process.
+    """
+    region = region or AWS_REGION
+    key = ('aws', service, region)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client(
+                service,
+                region_name=region,
+                config=Config(
+                    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+                    tcp_keepalive=True,
+                    retries={'max_attempts': 3, 'mode': 'standard'},
+                ),
+                **aws_credentials()
+            )
+            _clients[key] = client
+        return client
+
+
+class LazyClient:
+    """Stand-in for a shared client that creates it on first attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+
+
+def lazy_aws_client(service, region=None):
+    """A LazyClient for get_aws_client(service, region)."""
+    return LazyClient(lambda: get_aws_client(service, region))
+
+
+def get_s3_client(region=None):
+    """Get the shared S3 client."""
+    return get_aws_client('s3', region)
+
+
+def get_bedrock_client(region=None):
+    """Get the shared Bedrock runtime client."""
+    return get_aws_client('bedrock-runtime', region)
+
+
+def get_gemini_model(model_name):
+    """Get the shared Gemini model object for a model name."""
+    global _gemini_configured
+    key = ('gemini', model_name)
+    with _clients_lock:
+        import google.generativeai as genai
+
+        if not _gemini_configured:
+            genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+            _gemini_configured = True
+        model = _clients.get(key)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            _clients[key] = model
+        return model
+
+
+def _get_client(key, factory):
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def get_groq_client():
+    """Get the shared Groq client (GROQ_API_KEY)."""
+    def create():
+        from groq import Groq
+        return Groq(api_key=os.getenv('GROQ_API_KEY', ''))
+    return _get_client(('llm', 'groq'), create)
+
+
+def get_async_groq_client():
+    """Get the shared AsyncGroq client (GROQ_API_KEY)."""
+    def create():
+        from groq import AsyncGroq
+        return AsyncGroq(api_key=os.getenv('GROQ_API_KEY', ''))
+    return _get_client(('llm', 'groq-async'), create)
+
+
+def get_tavily_client():
+    """Get the shared Tavily client (TAVILY_API_KEY)."""
+    def create():
+        from tavily import TavilyClient
+        return TavilyClient(api_key=os.getenv('TAVILY_API_KEY', ''))
+    return _get_client(('llm', 'tavily'), create)
+
+
+def _async_aws_config():
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        retries={'max_attempts': 3, 'mode': 'standard'},
+    )
+
+
+async def get_async_aws_client(service, region=None):
+    """
+    Get the shared aioboto3 client for a service and region on the running event loop.
+
+    Like get_aws_client(), one client (and its connection pool) is shared by
+    every request, but aioboto3 clients are async context managers bound to
+    one loop, so they are kept per loop until close_async_clients().
+    """
+    import aioboto3
+
+    loop = asyncio.get_running_loop()
+    region = region or AWS_REGION
+    key = (loop, service, region)
+    client = _async_clients.get(key)
+    if client is not None:
+        return client
+
+    lock = _async_locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        client = _async_clients.get(key)
+        if client is None:
+            stack = _async_stacks.setdefault(loop, AsyncExitStack())
+            session = aioboto3.Session(**aws_credentials())
+            client = await stack.enter_async_context(
+                session.client(service, region_name=region, config=_async_aws_config())
+            )
+            _async_clients[key] = client
+        return client
+
+
+async def get_async_s3_client(region=None):
+    """Get the shared async S3 client of the running event loop."""
+    return await get_async_aws_client('s3', region)
+
+
+async def close_async_clients():
+    """Close the async clients of the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _async_clients if key[0] is loop]:
+        del _async_clients[key]
+    _async_locks.pop(loop, None)
+    stack = _async_stacks.pop(loop, None)
+    if stack is not None:
+        await stack.aclose()
+
+
+def prewarm_clients(bucket=None, gemini_model=None, region=None):
+    """
+    Create the shared clients ahead of the first request.
+
+    Args:
+        bucket: optional S3 bucket; a HeadBucket call opens a pooled TLS connection to S3
+        gemini_model: optional Gemini model name to create
+        region: AWS region (default: AWS_REGION)
+
+    The Groq and Tavily clients are created too, which loads their SDKs.
+
+    Returns:
+        Dict with the warm-up state (see warmup_status()).
+    """
+    _warmup.update(state='warming', started_at=time.time(), finished_at=None, errors={})
+    steps = {
+        's3': lambda: get_s3_client(region).head_bucket(Bucket=bucket) if bucket else get_s3_client(region),
+        'bedrock-runtime': lambda: get_bedrock_client(region),
+        'groq': lambda: (get_groq_client(), get_async_groq_client()),
+        'tavily': get_tavily_client,
+    }
+    if gemini_model:
+        steps['gemini'] = lambda: get_gemini_model(gemini_model)
+
+    for name, step in steps.items():
+        try:
+            step()
+        except Exception as e:
+            print(f'⚠️  Failed to pre-warm {name} client: {e}')
+            _warmup['errors'][name] = str(e)
+
+    _warmup.update(state='warm' if not _warmup['errors'] else 'degraded', finished_at=time.time())
+    return warmup_status()
+
+
+def prewarm_clients_in_background(**kwargs):
+    """
+    Run prewarm_clients() in a daemon thread so startup isn't blocked.
+
+    Only the first call starts a warm-up; later calls return None.
+    """
+    with _clients_lock:
+        if _warmup['state'] != 'cold':
+            return None
+        _warmup['state'] = 'warming'
+    thread = threading.Thread(target=prewarm_clients, kwargs=kwargs, name='client-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def warmup_status():
+    """Current warm-up state and the clients created so far."""
+    with _clients_lock:
+        created = sorted('/'.join(key[1:]) for key in _clients)
+    created += sorted(f'async:{service}/{region}' for _, service, region in list(_async_clients))
+    return {**_warmup, 'errors': dict(_warmup['errors']), 'clients': created}
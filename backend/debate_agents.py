@@ -1,56 +1,86 @@
+from __future__ import annotations
+
 import json
 import textwrap
 import os
+import asyncio
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
-import google.generativeai as genai
+from typing import List, Dict, Any, Optional, AsyncIterator, TYPE_CHECKING
 from llm_classifier import classify_user_persona
+from persona_prompt import serialize_persona
+from llm_cache import cached_call, acached_call
+from clients import get_gemini_model
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
 
-# Google API Key - should be set via environment variable
+# Google API Key - should be set via environment variable (the Gemini SDK is
+# loaded and configured by clients.get_gemini_model on the first debate)
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-genai.configure(api_key=GOOGLE_API_KEY)
 
 # Gemini model name - can be configured via environment variable
 # Valid paid models: 'gemini-1.5-pro', 'gemini-1.5-flash', 'gemini-pro'
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
 
+# Maximum number of Gemini calls a debate round may have in flight at once.
+# Set DEBATE_CONCURRENCY=1 to run every call strictly one after another.
+DEBATE_CONCURRENCY = max(1, int(os.getenv('DEBATE_CONCURRENCY', '6')))
+
+# Batched rebuttals: each agent rebuts all opponents in one call instead of one call per opponent
+DEBATE_BATCH_REBUTTALS = os.getenv('DEBATE_BATCH_REBUTTALS', 'false').lower() in ('true', '1', 'yes', 'on')
+
 # Debug logging configuration
 DEBUG_MODE = os.getenv('DEBUG_DEBATE', 'false').lower() in ('true', '1', 'yes', 'on')
 LOG_LEVEL = logging.DEBUG if DEBUG_MODE else logging.INFO
 
-# Configure logging with explicit console handler to ensure output to terminal
 logger = logging.getLogger(__name__)
-logger.setLevel(LOG_LEVEL)
 
-# Remove existing handlers to avoid duplicates
-logger.handlers = []
+_logging_configured = False
+_logging_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """Set up the debate logger on first use (called by main() and amain())."""
+    global _logging_configured
+    with _logging_lock:
+        if _logging_configured:
+            return
+        _logging_configured = True
 
-# Create console handler that outputs to stderr (visible in terminal)
-console_handler = logging.StreamHandler()
-console_handler.setLevel(LOG_LEVEL)
+    # Configure logging with explicit console handler to ensure output to terminal
+    logger.setLevel(LOG_LEVEL)
 
-# Create formatter
-formatter = logging.Formatter(
-    '%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-console_handler.setFormatter(formatter)
+    # Remove existing handlers to avoid duplicates
+    logger.handlers = []
 
-# Add handler to logger
-logger.addHandler(console_handler)
+    # Create console handler that outputs to stderr (visible in terminal)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(LOG_LEVEL)
 
-# Prevent propagation to root logger to avoid duplicate messages
-logger.propagate = False
+    # Create formatter
+    formatter = logging.Formatter(
+        '%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    console_handler.setFormatter(formatter)
 
-# Print debug status immediately to terminal
-if DEBUG_MODE:
-    print("🐛 DEBUG MODE ENABLED - Detailed logging active", flush=True)
-    logger.info("🐛 DEBUG MODE ENABLED - Detailed logging active")
-    logger.debug(f"Using Gemini model: {GEMINI_MODEL}")
-    logger.debug(f"Google API Key configured: {'Yes' if GOOGLE_API_KEY else 'No'}")
-else:
-    print(f"ℹ️  Debug mode is OFF. Set DEBUG_DEBATE=true to enable detailed logs", flush=True)
+    # Add handler to logger
+    logger.addHandler(console_handler)
+
+    # Prevent propagation to root logger to avoid duplicate messages
+    logger.propagate = False
+
+    # Print debug status to terminal
+    if DEBUG_MODE:
+        print("🐛 DEBUG MODE ENABLED - Detailed logging active", flush=True)
+        logger.info("🐛 DEBUG MODE ENABLED - Detailed logging active")
+        logger.debug(f"Using Gemini model: {GEMINI_MODEL}")
+        logger.debug(f"Google API Key configured: {'Yes' if GOOGLE_API_KEY else 'No'}")
+    else:
+        print(f"ℹ️  Debug mode is OFF. Set DEBUG_DEBATE=true to enable detailed logs", flush=True)
 
 # Role mapping for each career category
 CATEGORY_ROLES = {
@@ -128,6 +158,35 @@ CATEGORY_ROLES = {
     ]
 }
 
+@dataclass
+class CachedResponse:
+    """Gemini response text served through the shared LLM cache."""
+    text: str
+    usage_metadata: Any = None
+
+def _gemini_payload(model: genai.GenerativeModel, prompt: str) -> Dict[str, Any]:
+    """LLM cache payload of a Gemini request: the prompt, the model's generation config and its temperature."""
+    config = getattr(model, '_generation_config', None) or {}
+    if not isinstance(config, dict):
+        config = {key: value for key, value in vars(config).items() if value is not None}
+    # No temperature means Gemini's default sampling, which the cache skips
+    return {'prompt': prompt, 'generation_config': config, 'temperature': config.get('temperature')}
+
+def _generate(model: genai.GenerativeModel, prompt: str) -> CachedResponse:
+    """Generate content with Gemini, reusing cached responses for identical low-temperature requests."""
+    model_name = getattr(model, 'model_name', GEMINI_MODEL)
+    return CachedResponse(cached_call('gemini', model_name, _gemini_payload(model, prompt), lambda: model.generate_content(prompt).text))
+
+async def _agenerate(model: genai.GenerativeModel, prompt: str) -> CachedResponse:
+    """Async version of _generate using Gemini async generation."""
+    model_name = getattr(model, 'model_name', GEMINI_MODEL)
+
+    async def call():
+        response = await model.generate_content_async(prompt)
+        return response.text
+
+    return CachedResponse(await acached_call('gemini', model_name, _gemini_payload(model, prompt), call))
+
 @dataclass
 class DebateAgent:
     """An agent that participates in a debate about career paths."""
@@ -138,65 +197,193 @@ class DebateAgent:
     arguments: List[str] = None
     persona: str = "neutral"
     
-    def prepare_arguments(self, user_persona: Dict[str, Any]) -> None:
-        """Prepare initial arguments based on the user's persona and the agent's role."""
-        prompt = f"""You are a {self.persona} career advisor arguing for the role of {self.role}.
-        
+    def _arguments_prompt(self, user_persona: Dict[str, Any], persona_text: str = None) -> str:
+        """Build the prompt used to prepare the agent's opening argument."""
+        return f"""You are a {self.persona} career advisor arguing for the role of {self.role}.
+
 User's profile:
-{json.dumps(user_persona, indent=2)}
+{persona_text or serialize_persona(user_persona)}
 
 Present 1 strong argument why the user would be successful as a {self.role}.
 Focus on how their skills and personality align with this role.
 Keep your response concise and to the point.
 """
+
+    def _store_arguments(self, response) -> None:
+        """Store the opening argument from a Gemini response."""
+        if DEBUG_MODE:
+            logger.debug(f"[{self.name}] API Response received")
+            logger.debug(f"[{self.name}] Response text length: {len(response.text) if response.text else 0} characters")
+            if response.usage_metadata:
+                logger.debug(f"[{self.name}] Token usage: {response.usage_metadata}")
+        
+        self.arguments = [response.text.strip()]
+        logger.debug(f"[{self.name}] Arguments prepared successfully: {self.arguments[0][:100]}...")
+    
+    def _arguments_failed(self, error: Exception) -> None:
+        """Fall back to a generic argument when generation fails."""
+        logger.error(f"[{self.name}] Error preparing arguments: {str(error)}", exc_info=DEBUG_MODE)
+        print(f"Error preparing arguments for {self.name}: {str(error)}")
+        self.arguments = [f"I believe the user would excel as a {self.role}."]
+    
+    def prepare_arguments(self, user_persona: Dict[str, Any], persona_text: str = None) -> None:
+        """Prepare initial arguments based on the user's persona and the agent's role.
+        
+        Args:
+            user_persona: Dictionary containing user's profile information
+            persona_text: Optional pre-serialized persona (see persona_prompt.serialize_persona)
+        """
+        prompt = self._arguments_prompt(user_persona, persona_text)
         try:
             logger.debug(f"[{self.name}] Preparing arguments for role: {self.role}")
             logger.debug(f"[{self.name}] Prompt length: {len(prompt)} characters")
             if DEBUG_MODE:
                 logger.debug(f"[{self.name}] Prompt preview: {prompt[:200]}...")
             
-            response = self.model.generate_content(prompt)
-            
-            if DEBUG_MODE:
-                logger.debug(f"[{self.name}] API Response received")
-                logger.debug(f"[{self.name}] Response text length: {len(response.text) if response.text else 0} characters")
-                if response.usage_metadata:
-                    logger.debug(f"[{self.name}] Token usage: {response.usage_metadata}")
-            
-            self.arguments = [response.text.strip()]
-            logger.debug(f"[{self.name}] Arguments prepared successfully: {self.arguments[0][:100]}...")
+            response = _generate(self.model, prompt)
+            self._store_arguments(response)
         except Exception as e:
-            logger.error(f"[{self.name}] Error preparing arguments: {str(e)}", exc_info=DEBUG_MODE)
-            print(f"Error preparing arguments for {self.name}: {str(e)}")
-            self.arguments = [f"I believe the user would excel as a {self.role}."]
+            self._arguments_failed(e)
+    
+    async def aprepare_arguments(self, user_persona: Dict[str, Any], persona_text: str = None) -> None:
+        """Async version of prepare_arguments using Gemini async generation."""
+        prompt = self._arguments_prompt(user_persona, persona_text)
+        try:
+            logger.debug(f"[{self.name}] Preparing arguments for role: {self.role} (async)")
+            response = await _agenerate(self.model, prompt)
+            self._store_arguments(response)
+        except Exception as e:
+            self._arguments_failed(e)
+    
+    def _rebuttal_prompt(self, opponent_arguments: List[str], opponent_role: str) -> str:
+        """Build the prompt used to rebut a single opponent."""
+        return f"""You are a {self.persona} career advisor arguing for the role of {self.role}.
 
-    def rebut(self, opponent_arguments: List[str], opponent_role: str) -> str:
-        """Generate a rebuttal to the opponent's arguments."""
-        prompt = f"""You are a {self.persona} career advisor arguing for the role of {self.role}.
-        
 Your opponent, who supports the role of {opponent_role}, made these points:
 {chr(10).join(opponent_arguments)}
 
 Provide a 1-sentence counter-argument explaining why {self.role} is still the better choice.
 """
+
+    def _parse_rebuttal(self, response) -> str:
+        """Extract the rebuttal text from a Gemini response."""
+        if DEBUG_MODE:
+            logger.debug(f"[{self.name}] Rebuttal response received")
+            if response.usage_metadata:
+                logger.debug(f"[{self.name}] Token usage: {response.usage_metadata}")
+        
+        rebuttal = response.text.strip()
+        logger.debug(f"[{self.name}] Rebuttal generated: {rebuttal[:100]}...")
+        return rebuttal
+    
+    def _rebuttal_failed(self, opponent_role: str, error: Exception) -> str:
+        """Fall back to a generic rebuttal when generation fails."""
+        logger.error(f"[{self.name}] Error generating rebuttal: {str(error)}", exc_info=DEBUG_MODE)
+        print(f"Error generating rebuttal for {self.name}: {str(error)}")
+        return f"While {opponent_role} has merit, {self.role} is still the better fit."
+    
+    def rebut(self, opponent_arguments: List[str], opponent_role: str) -> str:
+        """Generate a rebuttal to the opponent's arguments."""
+        prompt = self._rebuttal_prompt(opponent_arguments, opponent_role)
         try:
             logger.debug(f"[{self.name}] Generating rebuttal against {opponent_role}")
             logger.debug(f"[{self.name}] Opponent arguments: {opponent_arguments}")
             
-            response = self.model.generate_content(prompt)
-            
-            if DEBUG_MODE:
-                logger.debug(f"[{self.name}] Rebuttal response received")
-                if response.usage_metadata:
-                    logger.debug(f"[{self.name}] Token usage: {response.usage_metadata}")
-            
-            rebuttal = response.text.strip()
-            logger.debug(f"[{self.name}] Rebuttal generated: {rebuttal[:100]}...")
-            return rebuttal
+            response = _generate(self.model, prompt)
+            return self._parse_rebuttal(response)
         except Exception as e:
-            logger.error(f"[{self.name}] Error generating rebuttal: {str(e)}", exc_info=DEBUG_MODE)
-            print(f"Error generating rebuttal for {self.name}: {str(e)}")
-            return f"While {opponent_role} has merit, {self.role} is still the better fit."
+            return self._rebuttal_failed(opponent_role, e)
+    
+    async def arebut(self, opponent_arguments: List[str], opponent_role: str) -> str:
+        """Async version of rebut using Gemini async generation."""
+        prompt = self._rebuttal_prompt(opponent_arguments, opponent_role)
+        try:
+            logger.debug(f"[{self.name}] Generating rebuttal against {opponent_role} (async)")
+            response = await _agenerate(self.model, prompt)
+            return self._parse_rebuttal(response)
+        except Exception as e:
+            return self._rebuttal_failed(opponent_role, e)
+    
+    def _rebuttals_prompt(self, opponents: List["DebateAgent"]) -> str:
+        """Build the prompt used to rebut every opponent in one response."""
+        opponent_points = "\n\n".join(
+            f"{opponent.name}, who supports the role of {opponent.role}, made these points:\n{chr(10).join(opponent.arguments)}"
+            for opponent in opponents
+        )
+        return f"""You are a {self.persona} career advisor arguing for the role of {self.role}.
+
+Your opponents made the following arguments:
+
+{opponent_points}
+
+For each opponent, provide a 1-sentence counter-argument explaining why {self.role} is still the better choice.
+
+Format your response as a JSON object mapping each opponent's name to your counter-argument.
+Use exactly these keys: {json.dumps([opponent.name for opponent in opponents])}
+
+IMPORTANT: Your response MUST be valid JSON. Only output the JSON object, nothing else.
+"""
+
+    def _parse_rebuttals(self, response, opponents: List["DebateAgent"]) -> Dict[str, str]:
+        """Split a batched Gemini response back into one rebuttal per opponent."""
+        response_text = response.text.strip()
+        
+        if DEBUG_MODE:
+            logger.debug(f"[{self.name}] Batched rebuttal response: {response_text}")
+            if response.usage_metadata:
+                logger.debug(f"[{self.name}] Token usage: {response.usage_metadata}")
+        
+        # Clean the response
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        
+        parsed = json.loads(response_text)
+        if not isinstance(parsed, dict):
+            raise ValueError("Expected a JSON object of rebuttals")
+        
+        rebuttals = {}
+        for opponent in opponents:
+            # Accept the opponent's role as key too, in case the model used it instead
+            rebuttal = parsed.get(opponent.name) or parsed.get(opponent.role)
+            if isinstance(rebuttal, str) and rebuttal.strip():
+                rebuttals[opponent.name] = rebuttal.strip()
+            else:
+                logger.debug(f"[{self.name}] No rebuttal for {opponent.name} in batched response")
+                rebuttals[opponent.name] = f"While {opponent.role} has merit, {self.role} is still the better fit."
+        return rebuttals
+    
+    def _rebuttals_failed(self, opponents: List["DebateAgent"], error: Exception) -> Dict[str, str]:
+        """Fall back to a generic rebuttal for every opponent when generation fails."""
+        return {opponent.name: self._rebuttal_failed(opponent.role, error) for opponent in opponents}
+    
+    def rebut_all(self, opponents: List["DebateAgent"]) -> Dict[str, str]:
+        """Rebut every opponent with a single LLM call.
+        
+        Args:
+            opponents: Opposing agents whose arguments have been prepared
+        
+        Returns:
+            Dictionary mapping each opponent's name to the rebuttal against them
+        """
+        prompt = self._rebuttals_prompt(opponents)
+        try:
+            logger.debug(f"[{self.name}] Generating batched rebuttal against {len(opponents)} opponents")
+            response = _generate(self.model, prompt)
+            return self._parse_rebuttals(response, opponents)
+        except Exception as e:
+            return self._rebuttals_failed(opponents, e)
+    
+    async def arebut_all(self, opponents: List["DebateAgent"]) -> Dict[str, str]:
+        """Async version of rebut_all using Gemini async generation."""
+        prompt = self._rebuttals_prompt(opponents)
+        try:
+            logger.debug(f"[{self.name}] Generating batched rebuttal against {len(opponents)} opponents (async)")
+            response = await _agenerate(self.model, prompt)
+            return self._parse_rebuttals(response, opponents)
+        except Exception as e:
+            return self._rebuttals_failed(opponents, e)
 
 @dataclass
 class ModeratorAgent:
@@ -204,20 +391,12 @@ class ModeratorAgent:
     name: str = "Moderator"
     model: genai.GenerativeModel = None
     
-    def review_debate(self, debate_transcript: str, user_persona: Dict[str, Any]) -> Dict[str, Any]:
-        """Review the debate and make a final recommendation.
-        
-        Args:
-            debate_transcript: Full transcript of the debate
-            user_persona: Dictionary containing user's profile information
-            
-        Returns:
-            Dictionary containing the moderator's recommendation and analysis
-        """
-        prompt = f"""You are a career advisor moderating a debate about the best career path for a user.
+    def _review_prompt(self, debate_transcript: str, user_persona: Dict[str, Any], persona_text: str = None) -> str:
+        """Build the prompt used to review the debate."""
+        return f"""You are a career advisor moderating a debate about the best career path for a user.
 
 User Profile:
-{json.dumps(user_persona, indent=2)}
+{persona_text or serialize_persona(user_persona)}
 
 Debate Transcript:
 {debate_transcript}
@@ -237,167 +416,308 @@ Format your response as a JSON object with these keys:
 
 IMPORTANT: Your response MUST be valid JSON. Only output the JSON object, nothing else.
 """
+
+    def _parse_review(self, response) -> Dict[str, Any]:
+        """Parse the moderator's JSON recommendation from a Gemini response."""
+        response_text = response.text.strip()
+        
+        if DEBUG_MODE:
+            logger.debug(f"[Moderator] Raw response: {response_text}")
+            if response.usage_metadata:
+                logger.debug(f"[Moderator] Token usage: {response.usage_metadata}")
+        
+        # Clean the response
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        
+        logger.debug(f"[Moderator] Cleaned response: {response_text}")
+        
+        result = json.loads(response_text)
+        logger.debug(f"[Moderator] Parsed recommendation: {result}")
+        return result
+    
+    def _review_failed(self, error: Exception, response) -> Dict[str, Any]:
+        """Fall back to an 'Unknown' recommendation when the review fails."""
+        logger.error(f"[Moderator] Error in review: {str(error)}", exc_info=DEBUG_MODE)
+        print(f"Error in moderator review: {str(error)}")
+        print(f"Raw response: {getattr(response, 'text', 'No response text')}")
+        return {
+            "recommended_role": "Unknown",
+            "confidence": 0,
+            "reason": f"Error in processing debate: {str(error)}",
+            "pros": [],
+            "considerations": []
+        }
+    
+    def review_debate(self, debate_transcript: str, user_persona: Dict[str, Any], persona_text: str = None) -> Dict[str, Any]:
+        """Review the debate and make a final recommendation.
+        
+        Args:
+            debate_transcript: Full transcript of the debate
+            user_persona: Dictionary containing user's profile information
+            persona_text: Optional pre-serialized persona (see persona_prompt.serialize_persona)
+        
+        Returns:
+            Dictionary containing the moderator's recommendation and analysis
+        """
+        prompt = self._review_prompt(debate_transcript, user_persona, persona_text)
+        response = None
         try:
             logger.debug("[Moderator] Reviewing debate and generating recommendation")
             logger.debug(f"[Moderator] Debate transcript length: {len(debate_transcript)} characters")
             if DEBUG_MODE:
                 logger.debug(f"[Moderator] Prompt preview: {prompt[:300]}...")
             
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            if DEBUG_MODE:
-                logger.debug(f"[Moderator] Raw response: {response_text}")
-                if response.usage_metadata:
-                    logger.debug(f"[Moderator] Token usage: {response.usage_metadata}")
-            
-            # Clean the response
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            
-            logger.debug(f"[Moderator] Cleaned response: {response_text}")
-            
-            result = json.loads(response_text)
-            logger.debug(f"[Moderator] Parsed recommendation: {result}")
-            return result
-            
+            response = _generate(self.model, prompt)
+            return self._parse_review(response)
+        
         except Exception as e:
-            logger.error(f"[Moderator] Error in review: {str(e)}", exc_info=DEBUG_MODE)
-            print(f"Error in moderator review: {str(e)}")
-            print(f"Raw response: {getattr(response, 'text', 'No response text')}")
-            return {
-                "recommended_role": "Unknown",
-                "confidence": 0,
-                "reason": f"Error in processing debate: {str(e)}",
-                "pros": [],
-                "considerations": []
-            }
+            return self._review_failed(e, response)
+    
+    async def areview_debate(self, debate_transcript: str, user_persona: Dict[str, Any], persona_text: str = None) -> Dict[str, Any]:
+        """Async version of review_debate using Gemini async generation."""
+        prompt = self._review_prompt(debate_transcript, user_persona, persona_text)
+        response = None
+        try:
+            logger.debug("[Moderator] Reviewing debate and generating recommendation (async)")
+            response = await _agenerate(self.model, prompt)
+            return self._parse_review(response)
+        except Exception as e:
+            return self._review_failed(e, response)
+
+def _print_debate_event(event_type: str, data: Dict[str, Any]) -> None:
+    """Print a debate event to the terminal."""
+    if event_type == "header":
+        print("=" * 80)
+        print(data.get("message", ""))
+        print("=" * 80)
+    elif event_type == "info":
+        print(data.get("message", ""))
+    elif event_type == "agent_argument":
+        print(f"\n{data.get('agent_name', '')} ({data.get('role', '')}) presents their case:")
+        print(f"- {data.get('argument', '')}")
+    elif event_type == "rebuttal":
+        print(f"\n{data.get('agent_name', '')} responds to {data.get('opponent_name', '')}:")
+        print(textwrap.fill(data.get('rebuttal', ''), width=80))
+    elif event_type == "moderator_review":
+        print("\n" + "="*30 + " MODERATOR REVIEW " + "="*30)
+        print("\nAnalyzing the debate and user profile...\n")
+    elif event_type == "conclusion":
+        print(f"\n🎯 FINAL RECOMMENDATION: {data.get('recommended_role', '')}")
+        print(f"   Confidence: {'⭐' * int(data.get('confidence', 0))} ({data.get('confidence', 0)}/10)")
+        print(f"\n📝 Reason: {data.get('reason', '')}")
+        if data.get('pros'):
+            print("\n✅ Key Strengths:")
+            for pro in data.get('pros', []):
+                print(f"   • {pro}")
+        if data.get('considerations'):
+            print("\nℹ️  Considerations:")
+            for consideration in data.get('considerations', []):
+                print(f"   • {consideration}")
+        print("\n" + "="*30 + " DEBATE CONCLUDED " + "="*30)
+
+def _debate_emitter(verbose: bool, stream_callback: callable) -> callable:
+    """Create the helper that emits debate events to both callback and print."""
+    def emit(event_type, data):
+        if stream_callback:
+            stream_callback(event_type, data)
+        if verbose:
+            _print_debate_event(event_type, data)
+    return emit
+
+def _open_debate(emit: callable, user_persona: Dict[str, Any], category: str = None) -> None:
+    """Emit the events that introduce a debate."""
+    emit("header", {"message": "DEBATE: Best Career Path for the User"})
+    if category:
+        emit("info", {"message": f"Category: {category}"})
+    emit("info", {"message": f"User Profile: {user_persona.get('user_input_summary', 'No profile available')}\n"})
+
+def _close_debate(emit: callable, agents: List[DebateAgent], review: Dict[str, Any], debate_transcript: List[str]) -> Dict[str, Any]:
+    """Emit the conclusion of a debate and build its result dictionary."""
+    emit("conclusion", {
+        "recommended_role": review.get('recommended_role', ''),
+        "confidence": review.get('confidence', 0),
+        "reason": review.get('reason', ''),
+        "pros": review.get('pros', []),
+        "considerations": review.get('considerations', [])
+    })
+    
+    # Show all debated roles for reference
+    emit("info", {"message": "\nRoles considered in this debate:"})
+    for i, agent in enumerate(agents, 1):
+        emit("info", {"message": f"{i}. {agent.role} (presented by {agent.name})"})
+    
+    # Return the review along with debated roles
+    return {
+        "moderator_review": review,
+        "debated_roles": [agent.role for agent in agents],
+        "debate_transcript": debate_transcript
+    }
 
-def conduct_debate(agents: List[DebateAgent], user_persona: Dict[str, Any], category: str = None, verbose: bool = True, stream_callback: callable = None) -> Dict[str, Any]:
+def conduct_debate(agents: List[DebateAgent], user_persona: Dict[str, Any], category: str = None, verbose: bool = True, stream_callback: callable = None, max_concurrency: int = None, batch_rebuttals: bool = None, persona_text: str = None) -> Dict[str, Any]:
     """Conduct a debate between multiple agents and include moderator review.
     
+    All opening arguments are generated concurrently, then all rebuttals are
+    generated concurrently. Events are still emitted in the same order as a
+    sequential debate, so streaming clients see no difference.
+    
     Args:
         agents: List of DebateAgent instances
         user_persona: Dictionary containing user's profile information
         category: Optional predicted career category
         verbose: Whether to print detailed output (default: True)
         stream_callback: Optional callback function(event_type, data) to stream events
+        max_concurrency: Maximum Gemini calls in flight per round (default: DEBATE_CONCURRENCY)
+        batch_rebuttals: Have each agent rebut all opponents in one call (default: DEBATE_BATCH_REBUTTALS)
+        persona_text: Optional pre-serialized persona; computed once here if not given
     
     Returns:
         Dictionary containing the moderator's review and recommendation
     """
-    def emit(event_type, data):
-        """Helper to emit events to both callback and print"""
-        if stream_callback:
-            stream_callback(event_type, data)
-        if verbose:
-            if event_type == "header":
-                print("=" * 80)
-                print(data.get("message", ""))
-                print("=" * 80)
-            elif event_type == "info":
-                print(data.get("message", ""))
-            elif event_type == "agent_argument":
-                print(f"\n{data.get('agent_name', '')} ({data.get('role', '')}) presents their case:")
-                print(f"- {data.get('argument', '')}")
-            elif event_type == "rebuttal":
-                print(f"\n{data.get('agent_name', '')} responds to {data.get('opponent_name', '')}:")
-                print(textwrap.fill(data.get('rebuttal', ''), width=80))
-            elif event_type == "moderator_review":
-                print("\n" + "="*30 + " MODERATOR REVIEW " + "="*30)
-                print("\nAnalyzing the debate and user profile...\n")
-            elif event_type == "conclusion":
-                print(f"\n🎯 FINAL RECOMMENDATION: {data.get('recommended_role', '')}")
-                print(f"   Confidence: {'⭐' * int(data.get('confidence', 0))} ({data.get('confidence', 0)}/10)")
-                print(f"\n📝 Reason: {data.get('reason', '')}")
-                if data.get('pros'):
-                    print("\n✅ Key Strengths:")
-                    for pro in data.get('pros', []):
-                        print(f"   • {pro}")
-                if data.get('considerations'):
-                    print("\nℹ️  Considerations:")
-                    for consideration in data.get('considerations', []):
-                        print(f"   • {consideration}")
-                print("\n" + "="*30 + " DEBATE CONCLUDED " + "="*30)
-    
-    emit("header", {"message": "DEBATE: Best Career Path for the User"})
-    if category:
-        emit("info", {"message": f"Category: {category}"})
-    emit("info", {"message": f"User Profile: {user_persona.get('user_input_summary', 'No profile available')}\n"})
+    emit = _debate_emitter(verbose, stream_callback)
+    _open_debate(emit, user_persona, category)
     
     debate_transcript = []
+    persona_text = persona_text or serialize_persona(user_persona)
+    max_concurrency = max(1, max_concurrency or DEBATE_CONCURRENCY)
+    if batch_rebuttals is None:
+        batch_rebuttals = DEBATE_BATCH_REBUTTALS
+    logger.debug(f"Running debate rounds with up to {max_concurrency} concurrent calls")
     
-    # Initial arguments
-    for agent in agents:
-        emit("info", {"message": f"\nPreparing arguments for {agent.name} ({agent.role})..."})
-        agent.prepare_arguments(user_persona)
-        for arg in agent.arguments:
-            debate_transcript.append(f"{agent.name}: {arg}")
-            emit("agent_argument", {
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="debate") as executor:
+        # Initial arguments - every agent prepares its case at the same time
+        argument_futures = [executor.submit(agent.prepare_arguments, user_persona, persona_text) for agent in agents]
+        for agent, future in zip(agents, argument_futures):
+            emit("info", {"message": f"\nPreparing arguments for {agent.name} ({agent.role})..."})
+            future.result()
+            for arg in agent.arguments:
+                debate_transcript.append(f"{agent.name}: {arg}")
+                emit("agent_argument", {
+                    "agent_name": agent.name,
+                    "role": agent.role,
+                    "argument": arg
+                })
+        
+        # Rebuttal round - only depends on the opening arguments, so all pairs run at once
+        emit("header", {"message": "REBUTTAL ROUND"})
+        pairings = [(agent, opponent) for agent in agents for opponent in agents if opponent != agent]
+        if batch_rebuttals:
+            # One call per agent; each pair reads its rebuttal from the agent's batch
+            batch_futures = {
+                agent.name: executor.submit(agent.rebut_all, [a for a in agents if a != agent])
+                for agent in agents
+            }
+            rebuttal_futures = [batch_futures[agent.name] for agent, _ in pairings]
+        else:
+            rebuttal_futures = [
+                executor.submit(agent.rebut, opponent.arguments, opponent.role)
+                for agent, opponent in pairings
+            ]
+        for (agent, opponent), future in zip(pairings, rebuttal_futures):
+            emit("info", {"message": f"\n{agent.name} preparing rebuttal to {opponent.name}..."})
+            rebuttal = future.result()
+            if batch_rebuttals:
+                rebuttal = rebuttal[opponent.name]
+            debate_transcript.append(f"{agent.name} (rebuttal to {opponent.name}): {rebuttal}")
+            emit("rebuttal", {
                 "agent_name": agent.name,
-                "role": agent.role,
-                "argument": arg
+                "opponent_name": opponent.name,
+                "rebuttal": rebuttal
             })
     
-    # Rebuttal round
+    # Add moderator review
+    moderator = ModeratorAgent(model=agents[0].model)
+    emit("moderator_review", {"message": "Moderator is analyzing the debate..."})
+    
+    review = moderator.review_debate("\n".join(debate_transcript), user_persona, persona_text)
+    
+    return _close_debate(emit, agents, review, debate_transcript)
+
+async def aconduct_debate(agents: List[DebateAgent], user_persona: Dict[str, Any], category: str = None, verbose: bool = True, stream_callback: callable = None, max_concurrency: int = None, batch_rebuttals: bool = None, persona_text: str = None) -> Dict[str, Any]:
+    """Async version of conduct_debate.
+    
+    Runs every round as coroutines on the current event loop instead of
+    worker threads, so a single loop can drive many debates at once. Takes
+    the same arguments and emits the same events, in the same order.
+    """
+    emit = _debate_emitter(verbose, stream_callback)
+    _open_debate(emit, user_persona, category)
+    
+    debate_transcript = []
+    persona_text = persona_text or serialize_persona(user_persona)
+    limiter = asyncio.Semaphore(max(1, max_concurrency or DEBATE_CONCURRENCY))
+    if batch_rebuttals is None:
+        batch_rebuttals = DEBATE_BATCH_REBUTTALS
+    
+    async def limited(coro):
+        async with limiter:
+            return await coro
+    
+    # Initial arguments - every agent prepares its case at the same time
+    argument_tasks = [asyncio.ensure_future(limited(agent.aprepare_arguments(user_persona, persona_text))) for agent in agents]
+    try:
+        for agent, task in zip(agents, argument_tasks):
+            emit("info", {"message": f"\nPreparing arguments for {agent.name} ({agent.role})..."})
+            await task
+            for arg in agent.arguments:
+                debate_transcript.append(f"{agent.name}: {arg}")
+                emit("agent_argument", {
+                    "agent_name": agent.name,
+                    "role": agent.role,
+                    "argument": arg
+                })
+    finally:
+        for task in argument_tasks:
+            task.cancel()
+    
+    # Rebuttal round - only depends on the opening arguments, so all pairs run at once
     emit("header", {"message": "REBUTTAL ROUND"})
-    for agent in agents:
-        opponents = [a for a in agents if a != agent]
-        for opponent in opponents:
+    pairings = [(agent, opponent) for agent in agents for opponent in agents if opponent != agent]
+    if batch_rebuttals:
+        # One call per agent; each pair reads its rebuttal from the agent's batch
+        batch_tasks = {
+            agent.name: asyncio.ensure_future(limited(agent.arebut_all([a for a in agents if a != agent])))
+            for agent in agents
+        }
+        rebuttal_tasks = [batch_tasks[agent.name] for agent, _ in pairings]
+    else:
+        rebuttal_tasks = [
+            asyncio.ensure_future(limited(agent.arebut(opponent.arguments, opponent.role)))
+            for agent, opponent in pairings
+        ]
+    try:
+        for (agent, opponent), task in zip(pairings, rebuttal_tasks):
             emit("info", {"message": f"\n{agent.name} preparing rebuttal to {opponent.name}..."})
-            rebuttal = agent.rebut(opponent.arguments, opponent.role)
+            rebuttal = await task
+            if batch_rebuttals:
+                rebuttal = rebuttal[opponent.name]
             debate_transcript.append(f"{agent.name} (rebuttal to {opponent.name}): {rebuttal}")
             emit("rebuttal", {
                 "agent_name": agent.name,
                 "opponent_name": opponent.name,
                 "rebuttal": rebuttal
             })
+    finally:
+        for task in rebuttal_tasks:
+            task.cancel()
     
     # Add moderator review
     moderator = ModeratorAgent(model=agents[0].model)
     emit("moderator_review", {"message": "Moderator is analyzing the debate..."})
     
-    review = moderator.review_debate("\n".join(debate_transcript), user_persona)
-    
-    # Emit conclusion
-    emit("conclusion", {
-        "recommended_role": review.get('recommended_role', ''),
-        "confidence": review.get('confidence', 0),
-        "reason": review.get('reason', ''),
-        "pros": review.get('pros', []),
-        "considerations": review.get('considerations', [])
-    })
-    
-    # Show all debated roles for reference
-    emit("info", {"message": "\nRoles considered in this debate:"})
-    for i, agent in enumerate(agents, 1):
-        emit("info", {"message": f"{i}. {agent.role} (presented by {agent.name})"})
+    review = await moderator.areview_debate("\n".join(debate_transcript), user_persona, persona_text)
     
-    # Return the review along with debated roles
-    return {
-        "moderator_review": review,
-        "debated_roles": [agent.role for agent in agents],
-        "debate_transcript": debate_transcript
-    }
+    return _close_debate(emit, agents, review, debate_transcript)
 
 @dataclass
 class RoleSelector:
     """Agent responsible for selecting top 3 roles for the user based on predicted category."""
     model: genai.GenerativeModel
     
-    def select_top_roles(self, user_persona: Dict[str, Any], category: str) -> List[str]:
-        """Select top 3 roles based on user persona and predicted category.
-        
-        Args:
-            user_persona: Dictionary containing user's profile information
-            category: The predicted career category from LLM classifier
-            
-        Returns:
-            List of 3 role names ordered by suitability
-        """
-        # Get available roles for the category
+    def _available_roles(self, category: str) -> List[str]:
+        """Get the roles the selector may choose from for a category."""
         available_roles = CATEGORY_ROLES.get(category, [])
         
         if not available_roles:
@@ -405,14 +725,14 @@ class RoleSelector:
             # Fallback to Business & Management roles
             available_roles = CATEGORY_ROLES.get("Business & Management", [])
         
-        if len(available_roles) < 3:
-            print(f"⚠️  Warning: Only {len(available_roles)} roles available for category '{category}'.")
-            return available_roles[:3] if available_roles else ["Unknown Role 1", "Unknown Role 2", "Unknown Role 3"]
-        
-        prompt = f"""Analyze the following user profile and select the top 3 most suitable roles from the available roles for the category: {category}.
+        return available_roles
+    
+    def _selection_prompt(self, user_persona: Dict[str, Any], category: str, available_roles: List[str], persona_text: str = None) -> str:
+        """Build the prompt used to pick the top 3 roles."""
+        return f"""Analyze the following user profile and select the top 3 most suitable roles from the available roles for the category: {category}.
 
 User Profile:
-{json.dumps(user_persona, indent=2)}
+{persona_text or serialize_persona(user_persona)}
 
 Available Roles for {category}:
 {chr(10).join(f"{i+1}. {role}" for i, role in enumerate(available_roles))}
@@ -420,76 +740,255 @@ Available Roles for {category}:
 Your response must be a valid JSON array of exactly 3 role names (matching exactly from the list above), ordered by suitability.
 Example: ["Role 1", "Role 2", "Role 3"]
 
-IMPORTANT: 
+IMPORTANT:
 - Only output the JSON array, with no additional text, markdown, or formatting.
 - The role names must match exactly from the available roles list above.
 """
+
+    def _parse_roles(self, response, available_roles: List[str]) -> List[str]:
+        """Parse and validate the selected roles from a Gemini response."""
+        response_text = response.text.strip()
+        
+        if DEBUG_MODE:
+            logger.debug(f"[RoleSelector] Raw response: {response_text}")
+            if response.usage_metadata:
+                logger.debug(f"[RoleSelector] Token usage: {response.usage_metadata}")
+        
+        # Clean the response
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        response_text = response_text.strip()
+        
+        logger.debug(f"[RoleSelector] Cleaned response: {response_text}")
+        
+        # Parse the JSON
+        roles = json.loads(response_text)
+        logger.debug(f"[RoleSelector] Parsed roles: {roles}")
+        
+        # Ensure we have exactly 3 roles
+        if not isinstance(roles, list) or len(roles) != 3:
+            raise ValueError("Expected exactly 3 roles")
+        
+        # Validate that all roles are in the available roles list
+        valid_roles = []
+        for role in roles:
+            if role in available_roles:
+                valid_roles.append(role)
+            else:
+                # Try to find a close match
+                for available_role in available_roles:
+                    if role.lower() in available_role.lower() or available_role.lower() in role.lower():
+                        valid_roles.append(available_role)
+                        break
+                else:
+                    print(f"⚠️  Warning: Role '{role}' not found in available roles. Skipping.")
+        
+        # If we don't have 3 valid roles, fill with available roles
+        while len(valid_roles) < 3 and len(valid_roles) < len(available_roles):
+            for role in available_roles:
+                if role not in valid_roles:
+                    valid_roles.append(role)
+                    break
+        
+        return valid_roles[:3]
+    
+    def _selection_failed(self, error: Exception, response, available_roles: List[str]) -> List[str]:
+        """Fall back to the first 3 roles of the category when selection fails."""
+        logger.error(f"[RoleSelector] Error selecting roles: {str(error)}", exc_info=DEBUG_MODE)
+        print(f"Error selecting roles: {str(error)}")
+        try:
+            raw_response = getattr(response, 'text', 'No response text')
+            logger.debug(f"[RoleSelector] Raw response on error: {raw_response}")
+            print(f"Raw response: {raw_response}")
+        except:
+            logger.debug("[RoleSelector] Raw response not available")
+            print("Raw response: Not available")
+        # Fallback to first 3 roles from the category
+        return available_roles[:3]
+    
+    def select_top_roles(self, user_persona: Dict[str, Any], category: str, persona_text: str = None) -> List[str]:
+        """Select top 3 roles based on user persona and predicted category.
+        
+        Args:
+            user_persona: Dictionary containing user's profile information
+            category: The predicted career category from LLM classifier
+            persona_text: Optional pre-serialized persona (see persona_prompt.serialize_persona)
+        
+        Returns:
+            List of 3 role names ordered by suitability
+        """
+        # Get available roles for the category
+        available_roles = self._available_roles(category)
+        
+        if len(available_roles) < 3:
+            print(f"⚠️  Warning: Only {len(available_roles)} roles available for category '{category}'.")
+            return available_roles[:3] if available_roles else ["Unknown Role 1", "Unknown Role 2", "Unknown Role 3"]
+        
+        prompt = self._selection_prompt(user_persona, category, available_roles, persona_text)
+        response = None
         try:
             logger.debug(f"[RoleSelector] Selecting top 3 roles for category: {category}")
             logger.debug(f"[RoleSelector] Available roles: {available_roles}")
             if DEBUG_MODE:
                 logger.debug(f"[RoleSelector] Prompt preview: {prompt[:300]}...")
             
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            if DEBUG_MODE:
-                logger.debug(f"[RoleSelector] Raw response: {response_text}")
-                if response.usage_metadata:
-                    logger.debug(f"[RoleSelector] Token usage: {response.usage_metadata}")
-            
-            # Clean the response
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-            
-            logger.debug(f"[RoleSelector] Cleaned response: {response_text}")
-            
-            # Parse the JSON
-            roles = json.loads(response_text)
-            logger.debug(f"[RoleSelector] Parsed roles: {roles}")
-            
-            # Ensure we have exactly 3 roles
-            if not isinstance(roles, list) or len(roles) != 3:
-                raise ValueError("Expected exactly 3 roles")
-            
-            # Validate that all roles are in the available roles list
-            valid_roles = []
-            for role in roles:
-                if role in available_roles:
-                    valid_roles.append(role)
-                else:
-                    # Try to find a close match
-                    for available_role in available_roles:
-                        if role.lower() in available_role.lower() or available_role.lower() in role.lower():
-                            valid_roles.append(available_role)
-                            break
-                    else:
-                        print(f"⚠️  Warning: Role '{role}' not found in available roles. Skipping.")
-            
-            # If we don't have 3 valid roles, fill with available roles
-            while len(valid_roles) < 3 and len(valid_roles) < len(available_roles):
-                for role in available_roles:
-                    if role not in valid_roles:
-                        valid_roles.append(role)
-                        break
-            
-            return valid_roles[:3]
-            
+            response = _generate(self.model, prompt)
+            return self._parse_roles(response, available_roles)
+        
         except Exception as e:
-            logger.error(f"[RoleSelector] Error selecting roles: {str(e)}", exc_info=DEBUG_MODE)
-            print(f"Error selecting roles: {str(e)}")
-            try:
-                raw_response = getattr(response, 'text', 'No response text')
-                logger.debug(f"[RoleSelector] Raw response on error: {raw_response}")
-                print(f"Raw response: {raw_response}")
-            except:
-                logger.debug("[RoleSelector] Raw response not available")
-                print("Raw response: Not available")
-            # Fallback to first 3 roles from the category
-            return available_roles[:3]
+            return self._selection_failed(e, response, available_roles)
+    
+    async def aselect_top_roles(self, user_persona: Dict[str, Any], category: str, persona_text: str = None) -> List[str]:
+        """Async version of select_top_roles using Gemini async generation."""
+        available_roles = self._available_roles(category)
+        
+        if len(available_roles) < 3:
+            print(f"⚠️  Warning: Only {len(available_roles)} roles available for category '{category}'.")
+            return available_roles[:3] if available_roles else ["Unknown Role 1", "Unknown Role 2", "Unknown Role 3"]
+        
+        prompt = self._selection_prompt(user_persona, category, available_roles, persona_text)
+        response = None
+        try:
+            logger.debug(f"[RoleSelector] Selecting top 3 roles for category: {category} (async)")
+            response = await _agenerate(self.model, prompt)
+            return self._parse_roles(response, available_roles)
+        except Exception as e:
+            return self._selection_failed(e, response, available_roles)
+
+def _print_step_event(event_type: str, data: Dict[str, Any]) -> None:
+    """Print a pipeline step event to the terminal."""
+    if event_type == "step_header":
+        print("\n" + "=" * 80)
+        print(data.get("message", ""))
+        print("=" * 80)
+    elif event_type == "step_info":
+        print(data.get("message", ""))
+    elif event_type == "step_success":
+        print(f"\n✅ {data.get('message', '')}")
+
+def _step_emitter(verbose: bool, stream_callback: callable) -> callable:
+    """Create the helper that emits step events to both callback and print."""
+    def emit_step(event_type, data):
+        if stream_callback:
+            stream_callback(event_type, data)
+        if verbose:
+            _print_step_event(event_type, data)
+    return emit_step
+
+def _load_user_persona(user_persona: Optional[Dict[str, Any]], user_persona_file: Optional[str]) -> Dict[str, Any]:
+    """Return the given user persona, or load it from file if not provided."""
+    if user_persona is None:
+        if user_persona_file is None:
+            user_persona_file = 'Test/uuid003_final_userpersona.json'
+        
+        logger.info(f"Loading user persona from: {user_persona_file}")
+        print(f"Loading user persona from: {user_persona_file}")
+        with open(user_persona_file, 'r') as f:
+            user_persona = json.load(f)
+        logger.debug(f"User persona loaded: {len(str(user_persona))} characters")
+    else:
+        logger.debug(f"User persona provided directly: {len(str(user_persona))} characters")
+    return user_persona
+
+def _create_debate_agents(top_roles: List[str], predicted_category: str, model: genai.GenerativeModel) -> List[DebateAgent]:
+    """Create one debate agent per role, with personas adjusted to the category."""
+    # Define agent personas based on category
+    personas = {
+        "Agent 1": "business-oriented, focusing on leadership and management skills",
+        "Agent 2": "technically-minded, focusing on skills and expertise",
+        "Agent 3": "creatively-inclined, focusing on innovation and problem-solving"
+    }
+    
+    # Adjust personas based on category
+    if predicted_category == "Music":
+        personas = {
+            "Agent 1": "musically-inclined, focusing on creative expression and artistic vision",
+            "Agent 2": "technically-oriented, focusing on production and sound engineering",
+            "Agent 3": "business-minded, focusing on industry connections and career growth"
+        }
+    elif predicted_category == "Film/TV":
+        personas = {
+            "Agent 1": "creatively-driven, focusing on storytelling and visual narrative",
+            "Agent 2": "technically-skilled, focusing on production and post-production",
+            "Agent 3": "collaborative, focusing on teamwork and industry relationships"
+        }
+    elif predicted_category == "VFX/Animation":
+        personas = {
+            "Agent 1": "artistically-focused, emphasizing creativity and visual design",
+            "Agent 2": "technically-proficient, emphasizing software skills and technical expertise",
+            "Agent 3": "project-oriented, emphasizing efficiency and meeting deadlines"
+        }
+    elif predicted_category == "Writing & Journalism":
+        personas = {
+            "Agent 1": "creatively-driven, focusing on storytelling and narrative structure",
+            "Agent 2": "analytically-minded, focusing on research and factual accuracy",
+            "Agent 3": "communication-focused, emphasizing clarity and audience engagement"
+        }
+    elif predicted_category == "Sport":
+        personas = {
+            "Agent 1": "performance-oriented, focusing on athletic excellence and training",
+            "Agent 2": "strategically-minded, focusing on coaching and game analysis",
+            "Agent 3": "business-focused, emphasizing career management and opportunities"
+        }
+    
+    # Create debate agents with different personas
+    agents = []
+    for i, (role, (agent_name, persona_desc)) in enumerate(zip(top_roles, personas.items()), 1):
+        agents.append(
+            DebateAgent(
+                name=f"{agent_name}",
+                role=role,
+                model=model,
+                position=f"The user would be most successful as a {role}.",
+                persona=persona_desc
+            )
+        )
+    return agents
+
+def _debate_summary(predicted_category: str, top_roles: List[str], debate_results: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the result returned by main() from a finished debate."""
+    return {
+        "predicted_category": predicted_category,
+        "selected_roles": top_roles,
+        "category_roles_available": CATEGORY_ROLES.get(predicted_category, []),
+        "recommended_role": debate_results["moderator_review"].get("recommended_role", ""),
+        "confidence": debate_results["moderator_review"].get("confidence", 0),
+        "reason": debate_results["moderator_review"].get("reason", ""),
+        "pros": debate_results["moderator_review"].get("pros", []),
+        "considerations": debate_results["moderator_review"].get("considerations", []),
+        "debated_roles": debate_results["debated_roles"]
+    }
+
+def _debate_error(error: Exception) -> Dict[str, Any]:
+    """Report an error raised by main() and build its error result."""
+    if isinstance(error, FileNotFoundError):
+        print(f"Error: Could not find the user persona file: {error}")
+        return {"error": f"File not found: {error}"}
+    if isinstance(error, json.JSONDecodeError):
+        print(f"Error: Invalid JSON in user persona file: {error}")
+        return {"error": f"Invalid JSON: {error}"}
+    print(f"An unexpected error occurred: {str(error)}")
+    import traceback
+    traceback.print_exc()
+    return {"error": str(error)}
+
+def _resolve_category(predicted_category: str, emit_step: callable) -> str:
+    """Fall back to the default category when classification failed."""
+    logger.info(f"Predicted category: {predicted_category}")
+    
+    if predicted_category == "Unknown":
+        logger.warning("Could not classify user persona, using default")
+        emit_step("step_info", {"message": "⚠️  Warning: Could not classify user persona. Using 'Business & Management' as default."})
+        predicted_category = "Business & Management"
+    return predicted_category
+
+def _announce_category(predicted_category: str, emit_step: callable) -> None:
+    """Emit the step events reporting the predicted category."""
+    emit_step("step_success", {"message": f"Predicted Category: {predicted_category}"})
+    emit_step("step_info", {"message": f"   Available roles for this category: {len(CATEGORY_ROLES.get(predicted_category, []))}"})
+    logger.debug(f"Available roles for {predicted_category}: {CATEGORY_ROLES.get(predicted_category, [])}")
 
 def main(user_persona: Dict[str, Any] = None, user_persona_file: str = None, predicted_category: str = None, verbose: bool = True, stream_callback: callable = None) -> Dict[str, Any]:
     """Main function to execute the debate simulation.
@@ -501,39 +1000,22 @@ def main(user_persona: Dict[str, Any] = None, user_persona_file: str = None, pre
     Returns:
         Dictionary containing debate results including predicted category, selected roles, and moderator recommendation
     """
+    configure_logging()
     try:
         # Initialize the Gemini model (using paid model)
         logger.info(f"🤖 Initializing Gemini model: {GEMINI_MODEL}")
         print(f"🤖 Initializing Gemini model: {GEMINI_MODEL}")
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        model = get_gemini_model(GEMINI_MODEL)
         logger.debug(f"Model initialized successfully: {GEMINI_MODEL}")
         
         # Load user persona if not provided
-        if user_persona is None:
-            if user_persona_file is None:
-                user_persona_file = 'Test/uuid003_final_userpersona.json'
-            
-            logger.info(f"Loading user persona from: {user_persona_file}")
-            print(f"Loading user persona from: {user_persona_file}")
-            with open(user_persona_file, 'r') as f:
-                user_persona = json.load(f)
-            logger.debug(f"User persona loaded: {len(str(user_persona))} characters")
-        else:
-            logger.debug(f"User persona provided directly: {len(str(user_persona))} characters")
-        
-        # Helper function to emit step events
-        def emit_step(event_type, data):
-            if stream_callback:
-                stream_callback(event_type, data)
-            if verbose:
-                if event_type == "step_header":
-                    print("\n" + "=" * 80)
-                    print(data.get("message", ""))
-                    print("=" * 80)
-                elif event_type == "step_info":
-                    print(data.get("message", ""))
-                elif event_type == "step_success":
-                    print(f"\n✅ {data.get('message', '')}")
+        user_persona = _load_user_persona(user_persona, user_persona_file)
+        
+        # Serialize the persona once; every prompt below reuses this string
+        persona_text = serialize_persona(user_persona)
+        logger.debug(f"Serialized persona for prompts: {len(persona_text)} characters")
+        
+        emit_step = _step_emitter(verbose, stream_callback)
         
         # Step 1: Classify user persona using LLM classifier (if not provided)
         if predicted_category is None:
@@ -544,20 +1026,14 @@ def main(user_persona: Dict[str, Any] = None, user_persona_file: str = None, pre
             predicted_category = classify_user_persona(
                 json_data=user_persona,
                 region=os.getenv('AWS_REGION', 'us-east-1'),
-                verbose=verbose
+                verbose=verbose,
+                persona_text=persona_text
             )
-            logger.info(f"Predicted category: {predicted_category}")
-            
-            if predicted_category == "Unknown":
-                logger.warning("Could not classify user persona, using default")
-                emit_step("step_info", {"message": "⚠️  Warning: Could not classify user persona. Using 'Business & Management' as default."})
-                predicted_category = "Business & Management"
+            predicted_category = _resolve_category(predicted_category, emit_step)
         else:
             logger.info(f"Using provided predicted category: {predicted_category}")
         
-        emit_step("step_success", {"message": f"Predicted Category: {predicted_category}"})
-        emit_step("step_info", {"message": f"   Available roles for this category: {len(CATEGORY_ROLES.get(predicted_category, []))}"})
-        logger.debug(f"Available roles for {predicted_category}: {CATEGORY_ROLES.get(predicted_category, [])}")
+        _announce_category(predicted_category, emit_step)
         
         # Step 2: Select top 3 roles based on predicted category
         emit_step("step_header", {"message": "STEP 2: SELECTING TOP 3 ROLES"})
@@ -565,97 +1041,119 @@ def main(user_persona: Dict[str, Any] = None, user_persona_file: str = None, pre
         
         logger.info("STEP 2: Selecting top 3 roles")
         selector = RoleSelector(model)
-        top_roles = selector.select_top_roles(user_persona, predicted_category)
+        top_roles = selector.select_top_roles(user_persona, predicted_category, persona_text)
         logger.info(f"Selected top 3 roles: {top_roles}")
         emit_step("step_success", {"message": f"Selected top 3 roles for debate: {', '.join(top_roles)}\n"})
         
         # Step 3: Conduct debate
         logger.info("STEP 3: Conducting debate")
         emit_step("step_header", {"message": "STEP 3: CONDUCTING DEBATE"})
+        agents = _create_debate_agents(top_roles, predicted_category, model)
         
-        # Define agent personas based on category
-        personas = {
-            "Agent 1": "business-oriented, focusing on leadership and management skills",
-            "Agent 2": "technically-minded, focusing on skills and expertise",
-            "Agent 3": "creatively-inclined, focusing on innovation and problem-solving"
-        }
+        # Conduct the debate
+        logger.info(f"Starting debate with {len(agents)} agents")
+        debate_results = conduct_debate(agents, user_persona, predicted_category, verbose=verbose, stream_callback=stream_callback, persona_text=persona_text)
+        logger.info(f"Debate completed. Recommended role: {debate_results.get('moderator_review', {}).get('recommended_role', 'Unknown')}")
         
-        # Adjust personas based on category
-        if predicted_category == "Music":
-            personas = {
-                "Agent 1": "musically-inclined, focusing on creative expression and artistic vision",
-                "Agent 2": "technically-oriented, focusing on production and sound engineering",
-                "Agent 3": "business-minded, focusing on industry connections and career growth"
-            }
-        elif predicted_category == "Film/TV":
-            personas = {
-                "Agent 1": "creatively-driven, focusing on storytelling and visual narrative",
-                "Agent 2": "technically-skilled, focusing on production and post-production",
-                "Agent 3": "collaborative, focusing on teamwork and industry relationships"
-            }
-        elif predicted_category == "VFX/Animation":
-            personas = {
-                "Agent 1": "artistically-focused, emphasizing creativity and visual design",
-                "Agent 2": "technically-proficient, emphasizing software skills and technical expertise",
-                "Agent 3": "project-oriented, emphasizing efficiency and meeting deadlines"
-            }
-        elif predicted_category == "Writing & Journalism":
-            personas = {
-                "Agent 1": "creatively-driven, focusing on storytelling and narrative structure",
-                "Agent 2": "analytically-minded, focusing on research and factual accuracy",
-                "Agent 3": "communication-focused, emphasizing clarity and audience engagement"
-            }
-        elif predicted_category == "Sport":
-            personas = {
-                "Agent 1": "performance-oriented, focusing on athletic excellence and training",
-                "Agent 2": "strategically-minded, focusing on coaching and game analysis",
-                "Agent 3": "business-focused, emphasizing career management and opportunities"
-            }
+        # Return results including moderator recommendation
+        return _debate_summary(predicted_category, top_roles, debate_results)
+    
+    except Exception as e:
+        return _debate_error(e)
+
+async def amain(user_persona: Dict[str, Any] = None, user_persona_file: str = None, predicted_category: str = None, verbose: bool = True, stream_callback: callable = None) -> Dict[str, Any]:
+    """Async version of main, driven entirely from the current event loop.
+    
+    Gemini calls use async generation; the Bedrock classifier (only needed
+    when predicted_category is not given) runs in the default executor.
+    Takes the same arguments and returns the same dictionary as main().
+    """
+    configure_logging()
+    try:
+        logger.info(f"🤖 Initializing Gemini model: {GEMINI_MODEL} (async)")
+        model = get_gemini_model(GEMINI_MODEL)
         
-        # Create debate agents with different personas
-        agents = []
-        for i, (role, (agent_name, persona_desc)) in enumerate(zip(top_roles, personas.items()), 1):
-            agents.append(
-                DebateAgent(
-                    name=f"{agent_name}",
-                    role=role,
-                    model=model,
-                    position=f"The user would be most successful as a {role}.",
-                    persona=persona_desc
+        user_persona = _load_user_persona(user_persona, user_persona_file)
+        
+        # Serialize the persona once; every prompt below reuses this string
+        persona_text = serialize_persona(user_persona)
+        logger.debug(f"Serialized persona for prompts: {len(persona_text)} characters")
+        
+        emit_step = _step_emitter(verbose, stream_callback)
+        
+        # Step 1: Classify user persona using LLM classifier (if not provided)
+        if predicted_category is None:
+            logger.info("STEP 1: Classifying user persona")
+            emit_step("step_header", {"message": "STEP 1: CLASSIFYING USER PERSONA"})
+            emit_step("step_info", {"message": "Calling LLM classifier to predict career category...\n"})
+            
+            predicted_category = await asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: classify_user_persona(
+                    json_data=user_persona,
+                    region=os.getenv('AWS_REGION', 'us-east-1'),
+                    verbose=verbose,
+                    persona_text=persona_text
                 )
             )
+            predicted_category = _resolve_category(predicted_category, emit_step)
+        else:
+            logger.info(f"Using provided predicted category: {predicted_category}")
         
-        # Conduct the debate
-        logger.info(f"Starting debate with {len(agents)} agents")
-        debate_results = conduct_debate(agents, user_persona, predicted_category, verbose=verbose, stream_callback=stream_callback)
-        logger.info(f"Debate completed. Recommended role: {debate_results.get('moderator_review', {}).get('recommended_role', 'Unknown')}")
+        _announce_category(predicted_category, emit_step)
         
-        # Return results including moderator recommendation
-        return {
-            "predicted_category": predicted_category,
-            "selected_roles": top_roles,
-            "category_roles_available": CATEGORY_ROLES.get(predicted_category, []),
-            "recommended_role": debate_results["moderator_review"].get("recommended_role", ""),
-            "confidence": debate_results["moderator_review"].get("confidence", 0),
-            "reason": debate_results["moderator_review"].get("reason", ""),
-            "pros": debate_results["moderator_review"].get("pros", []),
-            "considerations": debate_results["moderator_review"].get("considerations", []),
-            "debated_roles": debate_results["debated_roles"]
-        }
+        # Step 2: Select top 3 roles based on predicted category
+        emit_step("step_header", {"message": "STEP 2: SELECTING TOP 3 ROLES"})
+        emit_step("step_info", {"message": f"Analyzing user profile to determine top 3 roles from '{predicted_category}' category...\n"})
+        
+        logger.info("STEP 2: Selecting top 3 roles")
+        top_roles = await RoleSelector(model).aselect_top_roles(user_persona, predicted_category, persona_text)
+        logger.info(f"Selected top 3 roles: {top_roles}")
+        emit_step("step_success", {"message": f"Selected top 3 roles for debate: {', '.join(top_roles)}\n"})
+        
+        # Step 3: Conduct debate
+        logger.info("STEP 3: Conducting debate")
+        emit_step("step_header", {"message": "STEP 3: CONDUCTING DEBATE"})
+        agents = _create_debate_agents(top_roles, predicted_category, model)
+        
+        debate_results = await aconduct_debate(agents, user_persona, predicted_category, verbose=verbose, stream_callback=stream_callback, persona_text=persona_text)
+        logger.info(f"Debate completed. Recommended role: {debate_results.get('moderator_review', {}).get('recommended_role', 'Unknown')}")
         
-    except FileNotFoundError as e:
-        print(f"Error: Could not find the user persona file: {e}")
-        return {"error": f"File not found: {e}"}
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in user persona file: {e}")
-        return {"error": f"Invalid JSON: {e}"}
+        return _debate_summary(predicted_category, top_roles, debate_results)
+    
     except Exception as e:
-        print(f"An unexpected error occurred: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return {"error": str(e)}
-
+        return _debate_error(e)
 
+async def stream_debate(user_persona: Dict[str, Any] = None, user_persona_file: str = None, predicted_category: str = None, verbose: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """Run amain() and yield its events as they happen.
+    
+    Yields {'type': event_type, 'data': data} dictionaries in emission order,
+    followed by a final {'type': 'result', 'data': results} item holding the
+    dictionary amain() returned. Closing the generator early cancels the debate.
+    """
+    events = asyncio.Queue()
+    
+    def stream_callback(event_type, data):
+        events.put_nowait({'type': event_type, 'data': data})
+    
+    debate = asyncio.ensure_future(amain(
+        user_persona=user_persona,
+        user_persona_file=user_persona_file,
+        predicted_category=predicted_category,
+        verbose=verbose,
+        stream_callback=stream_callback
+    ))
+    debate.add_done_callback(lambda _: events.put_nowait(None))
+    
+    try:
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        yield {'type': 'result', 'data': debate.result()}
+    finally:
+        debate.cancel()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of debate recommendations.
+
+A finished debate is stored in S3 next to the user's analysis file as
+<user_id>_debate_cache.json, together with the events it emitted. The
+entry is only reused while the analysis content, the predicted category,
+the Gemini model and the analysis file's ETag are all unchanged.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+from botocore.exceptions import ClientError
+
+# Set DEBATE_CACHE_ENABLED=false to always rerun debates
+DEBATE_CACHE_ENABLED = os.getenv('DEBATE_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+
+DEBATE_CACHE_SUFFIX = '_debate_cache.json'
+
+
+def debate_cache_key(analysis_body: bytes, predicted_category: str, model_name: str) -> str:
+    """Hash the analysis JSON, predicted category and Gemini model into a cache key."""
+    digest = hashlib.sha256()
+    for part in (analysis_body, predicted_category.encode('utf-8'), model_name.encode('utf-8')):
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def debate_cache_s3_key(folder: str, user_id: str) -> str:
+    """S3 key of a user's cached debate, next to their analysis file."""
+    return f'{folder}/{user_id}{DEBATE_CACHE_SUFFIX}'
+
+
+def load_cached_debate(s3_client_instance, bucket, folder, user_id, cache_key, analysis_etag):
+    """
+    Load a cached debate if it matches the current analysis.
+
+    Args:
+        s3_client_instance: S3 client instance
+        bucket: S3 bucket name
+        folder: folder holding the analysis file
+        user_id: user ID
+        cache_key: key from debate_cache_key()
+        analysis_etag: ETag of the analysis file the debate would run on
+
+    Returns:
+        Dict with 'results' (the debate_agents.main() result) and 'events'
+        (list of {'type', 'data'} stream events), or None on a miss.
+    """
+    if not DEBATE_CACHE_ENABLED:
+        return None
+
+    s3_key = debate_cache_s3_key(folder, user_id)
+    try:
+        response = s3_client_instance.get_object(Bucket=bucket, Key=s3_key)
+        entry = json.loads(response['Body'].read().decode('utf-8'))
+    except Exception as e:
+        return _read_error(e, bucket, s3_key)
+
+    return _check_entry(entry, user_id, cache_key, analysis_etag)
+
+
+async def aload_cached_debate(s3_client_instance, bucket, folder, user_id, cache_key, analysis_etag):
+    """Async version of load_cached_debate, for an aioboto3 S3 client."""
+    if not DEBATE_CACHE_ENABLED:
+        return None
+
+    s3_key = debate_cache_s3_key(folder, user_id)
+    try:
+        response = await s3_client_instance.get_object(Bucket=bucket, Key=s3_key)
+        entry = json.loads((await response['Body'].read()).decode('utf-8'))
+    except Exception as e:
+        return _read_error(e, bucket, s3_key)
+
+    return _check_entry(entry, user_id, cache_key, analysis_etag)
+
+
+def _read_error(e, bucket, s3_key):
+    if isinstance(e, ClientError):
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+        if error_code != 'NoSuchKey':
+            print(f'⚠️  Could not read debate cache s3://{bucket}/{s3_key}: {e}')
+    else:
+        print(f'⚠️  Ignoring unreadable debate cache s3://{bucket}/{s3_key}: {e}')
+    return None
+
+
+def _check_entry(entry, user_id, cache_key, analysis_etag):
+    if entry.get('cache_key') != cache_key or entry.get('analysis_etag') != analysis_etag:
+        print(f'Debate cache for {user_id} is stale, rerunning debate')
+        return None
+
+    print(f'✓ Using cached debate for {user_id} (created {entry.get("created_at", "unknown")})')
+    return entry
+
+
+def store_cached_debate(s3_client_instance, bucket, folder, user_id, cache_key, analysis_etag, results, events):
+    """
+    Store a finished debate so later requests can replay it.
+
+    Failed debates (errors or an 'Unknown' recommendation) are not cached.
+    Errors while writing are logged and otherwise ignored.
+
+    Returns:
+        True if the debate was stored, False otherwise.
+    """
+    cache_object = _cache_object(bucket, folder, user_id, cache_key, analysis_etag, results, events)
+    if cache_object is None:
+        return False
+
+    try:
+        s3_client_instance.put_object(**cache_object)
+        print(f'✓ Cached debate result: s3://{bucket}/{cache_object["Key"]}')
+        return True
+    except Exception as e:
+        print(f'⚠️  Failed to cache debate result: {e}')
+        return False
+
+
+async def astore_cached_debate(s3_client_instance, bucket, folder, user_id, cache_key, analysis_etag, results, events):
+    """Async version of store_cached_debate, for an aioboto3 S3 client."""
+    cache_object = _cache_object(bucket, folder, user_id, cache_key, analysis_etag, results, events)
+    if cache_object is None:
+        return False
+
+    try:
+        await s3_client_instance.put_object(**cache_object)
+        print(f'✓ Cached debate result: s3://{bucket}/{cache_object["Key"]}')
+        return True
+    except Exception as e:
+        print(f'⚠️  Failed to cache debate result: {e}')
+        return False
+
+
+def _cache_object(bucket, folder, user_id, cache_key, analysis_etag, results, events):
+    """put_object arguments of a finished debate, or None if it shouldn't be cached."""
+    if not DEBATE_CACHE_ENABLED:
+        return None
+    if 'error' in results or results.get('recommended_role', 'Unknown') in ('', 'Unknown'):
+        return None
+
+    entry = {
+        'cache_key': cache_key,
+        'analysis_etag': analysis_etag,
+        'created_at': datetime.now().isoformat(),
+        'results': results,
+        'events': events,
+    }
+    return {
+        'Bucket': bucket,
+        'Key': debate_cache_s3_key(folder, user_id),
+        'Body': json.dumps(entry, ensure_ascii=False).encode('utf-8'),
+        'ContentType': 'application/json; charset=utf-8',
+        'Metadata': {
+            'userId': user_id,
+            'cachedAt': entry['created_at'],
+        }
+    }
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cache of text extracted from uploaded files.
+
+The text extracted from an S3 object is stored next to it as a sidecar
+object <key>.extracted.txt, tagged with the source object's ETag. An
+in-process LRU sits in front of the sidecars. A file is only downloaded and
+parsed again when its ETag (or the extraction cache version) changes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from botocore.exceptions import ClientError
+
+EXTRACTED_SUFFIX = '.extracted.txt'
+
+# Bump when extraction output changes so existing sidecars are ignored
+EXTRACTION_CACHE_VERSION = '3'
+
+EXTRACTION_CACHE_ENABLED = os.getenv('EXTRACTION_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '512'))
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def sidecar_key(key: str) -> str:
+    """S3 key of the extracted-text sidecar of an object."""
+    return f'{key}{EXTRACTED_SUFFIX}'
+
+
+def is_sidecar(key: str) -> bool:
+    """Whether a key is an extracted-text sidecar."""
+    return key.endswith(EXTRACTED_SUFFIX)
+
+
+def _remember(cache_key, text):
+    with _memory_lock:
+        _memory[cache_key] = text
+        _memory.move_to_end(cache_key)
+        while len(_memory) > EXTRACTION_CACHE_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def get_cached_text(s3_client_instance, bucket, key, etag):
+    """
+    Return the cached extracted text of an object version.
+
+    Args:
+        s3_client_instance: S3 client instance
+        bucket: S3 bucket name
+        key: key of the source object
+        etag: current ETag of the source object
+
+    Returns:
+        The extracted text (possibly empty), or None on a miss.
+    """
+    if not EXTRACTION_CACHE_ENABLED or not etag:
+        return None
+
+    cache_key = (bucket, key, etag)
+    with _memory_lock:
+        if cache_key in _memory:
+            _memory.move_to_end(cache_key)
+            return _memory[cache_key]
+
+    try:
+        response = s3_client_instance.get_object(Bucket=bucket, Key=sidecar_key(key))
+        metadata = response.get('Metadata', {})
+        if metadata.get('source-etag') != etag or metadata.get('cache-version') != EXTRACTION_CACHE_VERSION:
+            response['Body'].close()
+            return None
+        text = response['Body'].read().decode('utf-8')
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+        if error_code not in ('NoSuchKey', '404'):
+            print(f'⚠️  Could not read extracted text cache for {key}: {e}')
+        return None
+    except Exception as e:
+        print(f'⚠️  Ignoring unreadable extracted text cache for {key}: {e}')
+        return None
+
+    _remember(cache_key, text)
+    return text
+
+
+def store_cached_text(s3_client_instance, bucket, key, etag, text):
+    """Store the extracted text of an object version; errors are logged and ignored."""
+    if not EXTRACTION_CACHE_ENABLED or not etag:
+        return
+
+    _remember((bucket, key, etag), text)
+    try:
+        s3_client_instance.put_object(
+            Bucket=bucket,
+            Key=sidecar_key(key),
+            Body=text.encode('utf-8'),
+            ContentType='text/plain; charset=utf-8',
+            Metadata={
+                'source-etag': etag,
+                'cache-version': EXTRACTION_CACHE_VERSION,
+            }
+        )
+    except Exception as e:
+        print(f'⚠️  Failed to cache extracted text for {key}: {e}')
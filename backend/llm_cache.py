@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for LLM responses.
+
+Every LLM call (Gemini, Bedrock, Groq) and the Tavily web search goes
+through one cache keyed by provider, model and the full request payload
+(prompt/messages and sampling parameters). Only low-temperature requests
+are served from it (see is_cacheable), so sampled output such as the
+debates isn't replayed. Entries live in a bounded in-memory LRU and, when
+LLM_CACHE_DB is set, in an SQLite file that is shared across processes and
+restarts.
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Cache configuration
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1024'))
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '3600'))
+LLM_CACHE_DB = os.getenv('LLM_CACHE_DB', '')
+
+# Requests sampled above this temperature are never cached
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv('LLM_CACHE_MAX_TEMPERATURE', '0.3'))
+
+
+class LLMCache:
+    """Two-tier (memory LRU + optional SQLite) cache of JSON-serializable LLM responses."""
+
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL, db_path=None, enabled=True):
+        """
+        Args:
+            max_entries: maximum number of entries kept in memory
+            ttl: default time-to-live in seconds (0 or less means no expiry)
+            db_path: optional SQLite file for the on-disk tier
+            enabled: when False, every lookup misses and nothing is stored
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.enabled = enabled
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0, 'stores': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(provider, model, payload):
+        """Hash provider, model and request payload into a cache key."""
+        raw = json.dumps(
+            {'provider': provider, 'model': model, 'payload': payload},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        """Open the SQLite tier on first use (caller holds the lock)."""
+        if self._db is None and self.db_path:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+            )
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key, value, expires_at):
+        """Put an entry in the memory tier, evicting the least recently used (caller holds the lock)."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['memory_hits'] += 1
+                    return value
+                del self._memory[key]
+
+            try:
+                db = self._connect()
+                if db is not None:
+                    row = db.execute(
+                        'SELECT value, expires_at FROM llm_cache WHERE key = ?', (key,)
+                    ).fetchone()
+                    if row is not None:
+                        value, expires_at = json.loads(row[0]), row[1]
+                        if expires_at is None or expires_at > now:
+                            self._remember(key, value, expires_at)
+                            self._stats['hits'] += 1
+                            self._stats['disk_hits'] += 1
+                            return value
+                        db.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                        db.commit()
+            except sqlite3.Error as e:
+                print(f'⚠️  LLM cache read failed: {e}')
+
+            self._stats['misses'] += 1
+            return None
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serializable value under key."""
+        if not self.enabled or value is None:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl and ttl > 0 else None
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._stats['stores'] += 1
+            try:
+                db = self._connect()
+                if db is not None:
+                    db.execute(
+                        'INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                        (key, json.dumps(value, ensure_ascii=False), expires_at),
+                    )
+                    db.commit()
+            except sqlite3.Error as e:
+                print(f'⚠️  LLM cache write failed: {e}')
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            try:
+                db = self._connect()
+                if db is not None:
+                    db.execute('DELETE FROM llm_cache')
+                    db.commit()
+            except sqlite3.Error as e:
+                print(f'⚠️  LLM cache clear failed: {e}')
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                **self._stats,
+                'enabled': self.enabled,
+                'memory_entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'disk_tier': bool(self.db_path),
+            }
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Get the process-wide LLM cache, configured from environment variables."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache(
+                max_entries=LLM_CACHE_MAX_ENTRIES,
+                ttl=LLM_CACHE_TTL,
+                db_path=LLM_CACHE_DB or None,
+                enabled=LLM_CACHE_ENABLED,
+            )
+        return _llm_cache
+
+
+def is_cacheable(payload, max_temperature=None):
+    """
+    Whether a request is deterministic enough to serve from the cache.
+
+    A payload with a 'temperature' key is cacheable when the temperature is
+    set and at most max_temperature (default LLM_CACHE_MAX_TEMPERATURE); a
+    None temperature means the provider's default sampling and isn't. A
+    payload without the key (e.g. a web search) doesn't sample and is.
+    """
+    if 'temperature' not in payload:
+        return True
+    temperature = payload['temperature']
+    limit = LLM_CACHE_MAX_TEMPERATURE if max_temperature is None else max_temperature
+    return temperature is not None and float(temperature) <= limit
+
+
+def cached_call(provider, model, payload, call, ttl=None):
+    """
+    Return the cached response for a request, or run call() and cache its result.
+
+    Args:
+        provider: provider name, e.g. 'gemini', 'bedrock', 'groq'
+        model: model identifier
+        payload: dict with everything that affects the output (prompt, messages,
+            generation config and sampling params, including 'temperature')
+        call: zero-argument function performing the request; must return a JSON-serializable value
+        ttl: optional time-to-live overriding the default
+
+    Returns:
+        The cached or freshly computed value. Exceptions from call() are not
+        cached, and requests that aren't is_cacheable() always run call().
+    """
+    if not is_cacheable(payload):
+        return call()
+    cache = get_llm_cache()
+    key = cache.make_key(provider, model, payload)
+    value = cache.get(key)
+    if value is None:
+        value = call()
+        cache.set(key, value, ttl=ttl)
+    return value
+
+
+async def acached_call(provider, model, payload, call, ttl=None):
+    """
+    Async version of cached_call; call is a zero-argument coroutine function.
+
+    Cache lookups and stores run in a thread, since the SQLite tier blocks.
+    """
+    if not is_cacheable(payload):
+        return await call()
+    cache = get_llm_cache()
+    key = cache.make_key(provider, model, payload)
+    value = await asyncio.to_thread(cache.get, key)
+    if value is None:
+        value = await call()
+        await asyncio.to_thread(cache.set, key, value, ttl)
+    return value
@@ -1,45 +1,33 @@
 import json
-import boto3
 import re
 import os
 from botocore.exceptions import ClientError
+from persona_prompt import serialize_persona
+from llm_cache import cached_call, acached_call
+from clients import get_bedrock_client, get_async_aws_client
+from local_classifier import predict_local_category, LOCAL_CLASSIFIER_THRESHOLD, CATEGORY_SOURCE_BEDROCK, CATEGORY_SOURCE_LOCAL
 
-def classify_user_persona(json_data, bedrock_client=None, region=None, verbose=True):
-    """
-    Classify user persona data using AWS Bedrock LLM.
-    
-    Args:
-        json_data: Dictionary containing the user persona data
-        bedrock_client: Optional Bedrock client instance. If not provided, will create one.
-        region: Optional AWS region. Uses environment variable or 'us-east-1' as default.
-        verbose: Whether to print progress messages (default: True)
-    
-    Returns:
-        String containing the predicted category, or "Unknown" if classification fails
-    """
-    try:
-        # Initialize Bedrock client if not provided
-        if bedrock_client is None:
-            region = region or os.getenv('AWS_REGION', 'us-east-1')
-            credentials = {}
-            
-            if os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY'):
-                credentials['aws_access_key_id'] = os.getenv('AWS_ACCESS_KEY_ID')
-                credentials['aws_secret_access_key'] = os.getenv('AWS_SECRET_ACCESS_KEY')
-                
-                if os.getenv('AWS_SESSION_TOKEN'):
-                    credentials['aws_session_token'] = os.getenv('AWS_SESSION_TOKEN')
-                
-                bedrock_client = boto3.client('bedrock-runtime', region_name=region, **credentials)
-            else:
-                # Try without explicit credentials (use default AWS credentials)
-                bedrock_client = boto3.client('bedrock-runtime', region_name=region)
-        
+CLASSIFIER_MODEL_ID = "meta.llama3-70b-instruct-v1:0"
+
+
+def _local_category(json_data, verbose):
+    """Category from the local model when it is confident enough, else None."""
+    local_prediction = predict_local_category(json_data)
+    if local_prediction:
+        category, confidence = local_prediction
+        if confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+            if verbose:
+                print(f'✅ Predicted Category (local, confidence {confidence:.2f}): {category}')
+            return category
         if verbose:
-            print('🤖 Calling LLM classifier...')
-        
-        # Build LLM prompt
-        prompt = f"""
+            print(f'Local classifier not confident ({category}, {confidence:.2f}), asking Bedrock')
+    return None
+
+
+def _classifier_request(json_data, persona_text=None):
+    """Bedrock request body of the LLM classifier."""
+    # Build LLM prompt
+    prompt = f"""
 You are an AI career-path classifier for the entertainment industry.
 
 You MUST choose exactly ONE category from this list:
@@ -57,54 +45,147 @@ Rules:
 - ONLY return JSON: {{"category": "CategoryName"}}
 
 Here is the user JSON:
-{json.dumps(json_data, indent=2)}
+{persona_text or serialize_persona(json_data)}
 """
+    return {
+        "prompt": prompt,
+        "max_gen_len": 150,
+        "temperature": 0.1
+    }
 
-        # Invoke LLAMA3
-        response = bedrock_client.invoke_model(
-            modelId="meta.llama3-70b-instruct-v1:0",
-            body=json.dumps({
-                "prompt": prompt,
-                "max_gen_len": 150,
-                "temperature": 0.1
-            })
-        )
 
-        model_output = json.loads(response["body"].read())
-        raw_output = model_output.get("generation", "").strip()
-        
-        if verbose:
-            print(f'LLM Raw Output: {raw_output}')
-
-        # Extract JSON category
-        clean = raw_output.replace("```json", "").replace("```", "").strip()
-        clean = re.sub(r'Here.*response.*:', '', clean, flags=re.IGNORECASE).strip()
-
-        match = re.search(r'\{.*\}', clean, flags=re.DOTALL)
-        if match:
-            try:
-                parsed = json.loads(match.group(0))
-                category = parsed.get("category", "Unknown")
-            except:
-                category = "Unknown"
-        else:
+def _parse_category(model_output, verbose):
+    """Extract the category from the LLM output."""
+    raw_output = model_output.get("generation", "").strip()
+    
+    if verbose:
+        print(f'LLM Raw Output: {raw_output}')
+
+    # Extract JSON category
+    clean = raw_output.replace("```json", "").replace("```", "").strip()
+    clean = re.sub(r'Here.*response.*:', '', clean, flags=re.IGNORECASE).strip()
+
+    match = re.search(r'\{.*\}', clean, flags=re.DOTALL)
+    if match:
+        try:
+            parsed = json.loads(match.group(0))
+            category = parsed.get("category", "Unknown")
+        except:
             category = "Unknown"
+    else:
+        category = "Unknown"
 
-        if verbose:
-            print(f'✅ Predicted Category: {category}')
-        
-        return category
-        
-    except ClientError as e:
+    if verbose:
+        print(f'✅ Predicted Category: {category}')
+    
+    return category
+
+
+def _classification_error(e, verbose):
+    if isinstance(e, ClientError):
         error_code = e.response.get('Error', {}).get('Code', 'Unknown')
         error_message = e.response.get('Error', {}).get('Message', str(e))
         if verbose:
             print(f'❌ Bedrock API Error: {error_message} (Code: {error_code})')
-        return "Unknown"
+    elif verbose:
+        print(f'❌ Error in classification: {e}')
+    return "Unknown"
+
+
+def classify_user_persona(json_data, bedrock_client=None, region=None, verbose=True, persona_text=None):
+    """
+    Classify user persona data, trying the local classifier first and
+    falling back to the AWS Bedrock LLM when it is not confident enough.
+    
+    Args:
+        json_data: Dictionary containing the user persona data
+        bedrock_client: Optional Bedrock client instance. If not provided, uses the shared one.
+        region: Optional AWS region. Uses environment variable or 'us-east-1' as default.
+        verbose: Whether to print progress messages (default: True)
+        persona_text: Optional pre-serialized persona (see persona_prompt.serialize_persona)
+    
+    Returns:
+        String containing the predicted category, or "Unknown" if classification fails
+    """
+    return classify_user_persona_with_source(json_data, bedrock_client, region, verbose, persona_text)[0]
+
+
+def classify_user_persona_with_source(json_data, bedrock_client=None, region=None, verbose=True, persona_text=None):
+    """
+    Same as classify_user_persona, also saying which classifier answered.
+    
+    Returns:
+        Tuple (category, source): source is 'local' or 'bedrock', or None
+        when classification failed (category is then "Unknown")
+    """
+    try:
+        # Try the local model first; Bedrock is only called when it isn't confident
+        category = _local_category(json_data, verbose)
+        if category:
+            return category, CATEGORY_SOURCE_LOCAL
+        
+        # Use the shared Bedrock client if none was provided
+        if bedrock_client is None:
+            bedrock_client = get_bedrock_client(region or os.getenv('AWS_REGION', 'us-east-1'))
+        
+        if verbose:
+            print('🤖 Calling LLM classifier...')
+        
+        # Invoke LLAMA3 (identical prompts are served from the LLM cache)
+        request_body = _classifier_request(json_data, persona_text)
+
+        def invoke():
+            response = bedrock_client.invoke_model(
+                modelId=CLASSIFIER_MODEL_ID,
+                body=json.dumps(request_body)
+            )
+            return json.loads(response["body"].read())
+
+        model_output = cached_call("bedrock", CLASSIFIER_MODEL_ID, request_body, invoke)
+        return _parse_category(model_output, verbose), CATEGORY_SOURCE_BEDROCK
+        
     except Exception as e:
+        return _classification_error(e, verbose), None
+
+
+async def aclassify_user_persona(json_data, bedrock_client=None, region=None, verbose=True, persona_text=None):
+    """
+    Async version of classify_user_persona.
+    
+    Args:
+        bedrock_client: Optional aioboto3 bedrock-runtime client. If not provided,
+            uses the shared one of the running event loop (clients.get_async_aws_client).
+    """
+    return (await aclassify_user_persona_with_source(json_data, bedrock_client, region, verbose, persona_text))[0]
+
+
+async def aclassify_user_persona_with_source(json_data, bedrock_client=None, region=None, verbose=True, persona_text=None):
+    """Async version of classify_user_persona_with_source."""
+    try:
+        category = _local_category(json_data, verbose)
+        if category:
+            return category, CATEGORY_SOURCE_LOCAL
+        
+        if bedrock_client is None:
+            bedrock_client = await get_async_aws_client('bedrock-runtime', region or os.getenv('AWS_REGION', 'us-east-1'))
+        
         if verbose:
-            print(f'❌ Error in classification: {e}')
-        return "Unknown"
+            print('🤖 Calling LLM classifier...')
+        
+        request_body = _classifier_request(json_data, persona_text)
+
+        async def invoke():
+            response = await bedrock_client.invoke_model(
+                modelId=CLASSIFIER_MODEL_ID,
+                body=json.dumps(request_body)
+            )
+            return json.loads(await response["body"].read())
+
+        model_output = await acached_call("bedrock", CLASSIFIER_MODEL_ID, request_body, invoke)
+        return _parse_category(model_output, verbose), CATEGORY_SOURCE_BEDROCK
+        
+    except Exception as e:
+        return _classification_error(e, verbose), None
 
 
 def lambda_handler(event, context):
@@ -126,6 +207,8 @@ def lambda_handler(event, context):
     # ---------------------------------------------------------
     # 2️⃣ Load JSON from S3
     # ---------------------------------------------------------
+    import boto3
+
     s3 = boto3.client("s3")
     try:
         file_obj = s3.get_object(Bucket=bucket_name, Key=file_key)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Local first-tier category classifier.
+
+A multinomial logistic regression (NumPy) over the ten-trait vector and
+hashed bag-of-words features from user_input_summary. It is trained from
+existing _final_userpersona_analysis.json files whose predicted_category
+was set by the Bedrock classifier (category_source 'bedrock'), and
+classify_user_persona() only calls Bedrock when this model is not confident
+enough. Categories this model predicted itself are stored with
+category_source 'local' and never used for training.
+
+Usage:
+    python3 local_classifier.py <dir | s3://bucket[/prefix]> [--output local_classifier.npz]
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import argparse
+import threading
+
+import numpy as np
+
+# Trained model location and the confidence needed to skip the Bedrock call
+LOCAL_CLASSIFIER_ENABLED = os.getenv('LOCAL_CLASSIFIER_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+LOCAL_CLASSIFIER_MODEL = os.getenv(
+    'LOCAL_CLASSIFIER_MODEL',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'local_classifier.npz')
+)
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.85'))
+
+# Number of hashed text feature buckets
+TEXT_FEATURES = 512
+
+ANALYSIS_SUFFIX = '_final_userpersona_analysis.json'
+UNLABELED_CATEGORIES = ('', 'Unknown')
+
+# category_source of a predicted_category: which classifier set it
+CATEGORY_SOURCE_BEDROCK = 'bedrock'
+CATEGORY_SOURCE_LOCAL = 'local'
+
+TOKEN_PATTERN = re.compile(r'[a-z][a-z+#]+')
+
+
+def load_trait_names():
+    """Trait names, in order, from personality_traits.json."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'personality_traits.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['traits']
+
+
+def trait_vector(persona, traits):
+    """Trait scores of a persona as a float vector (aggregated_traits, else trait_scores)."""
+    scores = persona.get('aggregated_traits') or persona.get('personality_analysis', {}).get('trait_scores') or {}
+    vector = np.zeros(len(traits))
+    for i, trait in enumerate(traits):
+        try:
+            vector[i] = float(scores.get(trait, 0) or 0)
+        except (TypeError, ValueError):
+            pass
+    return vector
+
+
+def text_vector(text, n_features=TEXT_FEATURES):
+    """L2-normalized hashed bag-of-words (unigrams and bigrams) of a summary."""
+    vector = np.zeros(n_features)
+    tokens = TOKEN_PATTERN.findall((text or '').lower())
+    for gram in tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]:
+        vector[zlib.crc32(gram.encode('utf-8')) % n_features] += 1.0
+    if tokens:
+        vector = np.log1p(vector)
+        vector /= np.linalg.norm(vector)
+    return vector
+
+
+class LocalCategoryClassifier:
+    """Softmax regression over standardized trait scores and hashed summary text."""
+
+    def __init__(self, categories, traits, weights, bias, mean, std, text_features=TEXT_FEATURES):
+        self.categories = list(categories)
+        self.traits = list(traits)
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.std = std
+        self.text_features = text_features
+
+    @staticmethod
+    def _raw_features(personas, traits, text_features):
+        traits_matrix = np.array([trait_vector(p, traits) for p in personas]).reshape(len(personas), len(traits))
+        text_matrix = np.array([text_vector(p.get('user_input_summary', ''), text_features) for p in personas])
+        return traits_matrix, text_matrix.reshape(len(personas), text_features)
+
+    def features(self, personas):
+        """Feature matrix for a list of personas."""
+        traits_matrix, text_matrix = self._raw_features(personas, self.traits, self.text_features)
+        return np.hstack([(traits_matrix - self.mean) / self.std, text_matrix])
+
+    def predict_proba(self, personas):
+        """Category probabilities, one row per persona (columns follow self.categories)."""
+        return _softmax(self.features(personas) @ self.weights + self.bias)
+
+    def predict(self, persona):
+        """
+        Predict the category of one persona.
+
+        Returns:
+            Tuple (category, confidence).
+        """
+        probabilities = self.predict_proba([persona])[0]
+        best = int(np.argmax(probabilities))
+        return self.categories[best], float(probabilities[best])
+
+    @classmethod
+    def fit(cls, personas, labels, traits=None, text_features=TEXT_FEATURES,
+            epochs=500, learning_rate=0.5, l2=1e-3):
+        """
+        Train on personas labeled with their Bedrock predicted_category.
+
+        Full-batch gradient descent on the L2-regularized cross-entropy.
+        """
+        traits = traits or load_trait_names()
+        categories = sorted(set(labels))
+        index = {category: i for i, category in enumerate(categories)}
+
+        traits_matrix, text_matrix = cls._raw_features(personas, traits, text_features)
+        mean = traits_matrix.mean(axis=0)
+        std = traits_matrix.std(axis=0)
+        std[std == 0] = 1.0
+        X = np.hstack([(traits_matrix - mean) / std, text_matrix])
+        Y = np.zeros((len(labels), len(categories)))
+        Y[np.arange(len(labels)), [index[label] for label in labels]] = 1.0
+
+        weights = np.zeros((X.shape[1], len(categories)))
+        bias = np.zeros(len(categories))
+        for _ in range(epochs):
+            error = (_softmax(X @ weights + bias) - Y) / len(labels)
+            weights -= learning_rate * (X.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        return cls(categories, traits, weights, bias, mean, std, text_features)
+
+    def save(self, path):
+        """Save the model as a .npz file."""
+        np.savez(
+            path,
+            categories=np.array(self.categories),
+            traits=np.array(self.traits),
+            weights=self.weights,
+            bias=self.bias,
+            mean=self.mean,
+            std=self.std,
+            text_features=np.array(self.text_features),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a model saved by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                categories=[str(c) for c in data['categories']],
+                traits=[str(t) for t in data['traits']],
+                weights=data['weights'],
+                bias=data['bias'],
+                mean=data['mean'],
+                std=data['std'],
+                text_features=int(data['text_features']),
+            )
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+_local_classifier = None
+_local_classifier_mtime = None
+_local_classifier_lock = threading.Lock()
+
+
+def get_local_classifier():
+    """The trained model, reloaded when the model file changes; None if there is none."""
+    global _local_classifier, _local_classifier_mtime
+    if not LOCAL_CLASSIFIER_ENABLED:
+        return None
+
+    try:
+        mtime = os.path.getmtime(LOCAL_CLASSIFIER_MODEL)
+    except OSError:
+        return None
+
+    with _local_classifier_lock:
+        if _local_classifier is None or mtime != _local_classifier_mtime:
+            try:
+                _local_classifier = LocalCategoryClassifier.load(LOCAL_CLASSIFIER_MODEL)
+                _local_classifier_mtime = mtime
+            except Exception as e:
+                print(f'⚠️  Failed to load local classifier {LOCAL_CLASSIFIER_MODEL}: {e}')
+                _local_classifier = None
+        return _local_classifier
+
+
+def predict_local_category(persona):
+    """
+    Predict a persona's category with the local model.
+
+    Returns:
+        Tuple (category, confidence), or None if no model is available.
+    """
+    classifier = get_local_classifier()
+    if classifier is None:
+        return None
+    try:
+        return classifier.predict(persona)
+    except Exception as e:
+        print(f'⚠️  Local classifier failed: {e}')
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Training data + CLI
+# ---------------------------------------------------------------------------
+
+def load_training_data(source, include_unsourced=False):
+    """
+    Load Bedrock-labeled personas from analysis files.
+
+    Args:
+        source: local directory (searched recursively) or s3://bucket[/prefix]
+        include_unsourced: also use files without a category_source (written
+            before it was recorded), whose category may come from this model
+
+    Returns:
+        Tuple (personas, labels); files without a usable predicted_category,
+        or whose category wasn't set by Bedrock, are skipped.
+    """
+    documents = []
+    if source.startswith('s3://'):
+        from clients import get_s3_client
+
+        bucket, _, prefix = source[len('s3://'):].partition('/')
+        s3 = get_s3_client()
+        for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'].endswith(ANALYSIS_SUFFIX):
+                    body = s3.get_object(Bucket=bucket, Key=obj['Key'])['Body'].read()
+                    documents.append((obj['Key'], body))
+    else:
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.endswith(ANALYSIS_SUFFIX):
+                    with open(os.path.join(root, name), 'rb') as f:
+                        documents.append((os.path.join(root, name), f.read()))
+
+    personas, labels = [], []
+    skipped_sources = 0
+    for name, body in documents:
+        try:
+            persona = json.loads(body)
+        except ValueError as e:
+            print(f'⚠️  Skipping {name}: {e}')
+            continue
+        category = (persona.get('predicted_category') or '').strip()
+        if category in UNLABELED_CATEGORIES:
+            continue
+        # Never learn from this model's own predictions
+        category_source = persona.get('category_source')
+        if category_source != CATEGORY_SOURCE_BEDROCK and not (include_unsourced and not category_source):
+            skipped_sources += 1
+            continue
+        personas.append(persona)
+        labels.append(category)
+    if skipped_sources:
+        print(f'Skipped {skipped_sources} file(s) whose category was not set by Bedrock')
+    return personas, labels
+
+
+def main():
+    """CLI entrypoint: train the local classifier and report its accuracy."""
+    parser = argparse.ArgumentParser(description='Train the local category classifier from analysis files.')
+    parser.add_argument('source', help='directory or s3://bucket[/prefix] with *_final_userpersona_analysis.json files')
+    parser.add_argument('--output', default=LOCAL_CLASSIFIER_MODEL, help='model file to write (.npz)')
+    parser.add_argument('--holdout', type=float, default=0.2, help='fraction of files held out for evaluation')
+    parser.add_argument(
+        '--include-unsourced', action='store_true',
+        help='also train on files without a category_source (labeled before it was recorded)'
+    )
+    args = parser.parse_args()
+
+    personas, labels = load_training_data(args.source, args.include_unsourced)
+    print(f'📊 Loaded {len(personas)} labeled personas ({len(set(labels))} categories)')
+    if len(set(labels)) < 2:
+        print('❌ Need at least two categories to train')
+        sys.exit(1)
+
+    order = np.random.default_rng(0).permutation(len(personas))
+    n_test = int(len(personas) * args.holdout)
+    if n_test:
+        test, train = order[:n_test], order[n_test:]
+        model = LocalCategoryClassifier.fit([personas[i] for i in train], [labels[i] for i in train])
+        predictions = [model.predict(personas[i]) for i in test]
+        correct = [category == labels[i] for (category, _), i in zip(predictions, test)]
+        confident = [ok for ok, (_, confidence) in zip(correct, predictions) if confidence >= LOCAL_CLASSIFIER_THRESHOLD]
+        print(f'✅ Holdout accuracy: {np.mean(correct):.1%} on {n_test} files')
+        if confident:
+            print(
+                f'   Above threshold {LOCAL_CLASSIFIER_THRESHOLD}: {len(confident)}/{n_test} files, '
+                f'accuracy {np.mean(confident):.1%}'
+            )
+
+    model = LocalCategoryClassifier.fit(personas, labels)
+    model.save(args.output)
+    print(f'💾 Saved model to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,14 @@
 import os
 import json
 import re
+import asyncio
 from pathlib import Path
-from groq import Groq
-from tavily import TavilyClient
+from llm_cache import cached_call, acached_call
+from clients import get_groq_client, get_async_groq_client, get_tavily_client
 
 
 # ----------------- CONFIG -----------------
-GROQ_API_KEY = ""
-TAVILY_API_KEY = ""
-
-groq_client = Groq(api_key=GROQ_API_KEY)
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
+# Groq and Tavily clients are created on first use (GROQ_API_KEY / TAVILY_API_KEY, see clients.py)
 
 # ----------------- PEER MENTOR DATA -----------------
 def load_peer_mentors_data():
@@ -232,13 +229,27 @@ def beautify_response(text):
     return text
 
 # ----------------- WEB SEARCH TOOL -----------------
-def search_web(job_title, user_query):
+def _search_params(job_title, user_query):
     query = f"{job_title} job demand salary outlook {user_query}"
+    return {"query": query, "max_results": 5, "include_answer": True}
+
+
+def search_web(job_title, user_query):
+    search_params = _search_params(job_title, user_query)
     try:
-        result = tavily_client.search(
-            query=query,
-            max_results=5,
-            include_answer=True
+        result = cached_call("tavily", "search", search_params, lambda: get_tavily_client().search(**search_params))
+        return result.get("answer", "")[:1500]
+    except:
+        return ""
+
+
+async def asearch_web(job_title, user_query):
+    """Async version of search_web (the Tavily client is blocking, so it runs in a thread)."""
+    search_params = _search_params(job_title, user_query)
+    try:
+        result = await acached_call(
+            "tavily", "search", search_params,
+            lambda: asyncio.to_thread(get_tavily_client().search, **search_params)
         )
         return result.get("answer", "")[:1500]
     except:
@@ -246,25 +257,13 @@ def search_web(job_title, user_query):
 
 
 # ----------------- LLM CALL -----------------
-def ask_llm(job_title, message, conversation_history=None, category=None):
+def _add_peer_mentors(job_title, message, category=None):
     """
-    Ask the mentor agent a question about a job role.
-    
-    Args:
-        job_title: The job role to ask about
-        message: The user's question
-        conversation_history: List of previous messages in format [{"role": "user", "content": "..."}, ...]
-        category: Optional career category for peer mentor recommendations
-    
+    Append peer mentor recommendations to the message when the user asks for them.
+
     Returns:
-        Tuple of (reply, updated_conversation_history, peer_mentors)
-        - reply: The mentor's response
-        - updated_conversation_history: Updated conversation history
-        - peer_mentors: List of peer mentor recommendations if requested, otherwise None
+        Tuple of (message, peer_mentors)
     """
-    if conversation_history is None:
-        conversation_history = []
-    
     # Check if user is asking for mentor or peer recommendations
     peer_mentors = None
     message_lower = message.lower()
@@ -311,12 +310,14 @@ def ask_llm(job_title, message, conversation_history=None, category=None):
             # Add peer mentors info to the message
             message = f"{message}\n\n{mentors_info}"
     
+    return message, peer_mentors
+
+
+def _completion_params(job_title, message, conversation_history, web_info):
+    """Groq chat completion parameters of a mentor question."""
     # System instruction
     sys_prompt = system_prompt(job_title)
 
-    # Web search snippet
-    web_info = search_web(job_title, message)
-
     web_message = f"Web research summary:\n{web_info}\nUse it for grounding but don't copy."
 
     # Build messages
@@ -327,26 +328,87 @@ def ask_llm(job_title, message, conversation_history=None, category=None):
         {"role": "user", "content": message}
     ]
 
+    return {
+        "model": "llama-3.1-8b-instant",
+        "messages": messages,
+        "temperature": 0.2,
+        "max_tokens": 700
+    }
+
+
+def _mentor_reply(reply, message, conversation_history, peer_mentors):
+    # Beautify the response by removing markdown and formatting nicely
+    reply = beautify_response(reply)
+
+    # Update conversation history
+    updated_history = conversation_history + [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": reply}
+    ]
+
+    return reply, updated_history, peer_mentors
+
+
+def ask_llm(job_title, message, conversation_history=None, category=None):
+    """
+    Ask the mentor agent a question about a job role.
+    
+    Args:
+        job_title: The job role to ask about
+        message: The user's question
+        conversation_history: List of previous messages in format [{"role": "user", "content": "..."}, ...]
+        category: Optional career category for peer mentor recommendations
+    
+    Returns:
+        Tuple of (reply, updated_conversation_history, peer_mentors)
+        - reply: The mentor's response
+        - updated_conversation_history: Updated conversation history
+        - peer_mentors: List of peer mentor recommendations if requested, otherwise None
+    """
+    if conversation_history is None:
+        conversation_history = []
+    
+    message, peer_mentors = _add_peer_mentors(job_title, message, category)
+
+    # Web search snippet
+    web_info = search_web(job_title, message)
+    completion_params = _completion_params(job_title, message, conversation_history, web_info)
+
     try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=messages,
-            temperature=0.2,
-            max_tokens=700
+        # Identical conversations are served from the LLM cache
+        reply = cached_call(
+            "groq",
+            completion_params["model"],
+            completion_params,
+            lambda: get_groq_client().chat.completions.create(**completion_params).choices[0].message.content
         )
+        return _mentor_reply(reply, message, conversation_history, peer_mentors)
+    except Exception as e:
+        return f"Sorry, I encountered an error: {str(e)}", conversation_history, None
 
-        reply = response.choices[0].message.content
-        
-        # Beautify the response by removing markdown and formatting nicely
-        reply = beautify_response(reply)
 
-        # Update conversation history
-        updated_history = conversation_history + [
-            {"role": "user", "content": message},
-            {"role": "assistant", "content": reply}
-        ]
+async def aask_llm(job_title, message, conversation_history=None, category=None):
+    """
+    Async version of ask_llm, using the AsyncGroq client.
+    
+    Returns:
+        Tuple of (reply, updated_conversation_history, peer_mentors), as ask_llm
+    """
+    if conversation_history is None:
+        conversation_history = []
+    
+    message, peer_mentors = _add_peer_mentors(job_title, message, category)
+
+    web_info = await asearch_web(job_title, message)
+    completion_params = _completion_params(job_title, message, conversation_history, web_info)
 
-        return reply, updated_history, peer_mentors
+    async def complete():
+        completion = await get_async_groq_client().chat.completions.create(**completion_params)
+        return completion.choices[0].message.content
+
+    try:
+        reply = await acached_call("groq", completion_params["model"], completion_params, complete)
+        return _mentor_reply(reply, message, conversation_history, peer_mentors)
     except Exception as e:
         return f"Sorry, I encountered an error: {str(e)}", conversation_history, None
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Compact serialization of user persona data for LLM prompts.
+
+The persona is serialized once per request and the resulting string is
+reused by every prompt that embeds the user's profile.
+"""
+
+import os
+import json
+from typing import Dict, Any
+
+# Token budget for the serialized persona (estimated at ~4 characters per token)
+PERSONA_PROMPT_MAX_TOKENS = int(os.getenv('PERSONA_PROMPT_MAX_TOKENS', '1500'))
+CHARS_PER_TOKEN = 4
+
+# Top-level fields that carry no information for the LLM
+DROPPED_FIELDS = ('user_id', 'timestamp')
+
+TRUNCATION_MARKER = ' [truncated]'
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of LLM tokens in a string."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def compact_persona(user_persona: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop the fields of a user persona that are redundant in a prompt.
+
+    - personality_analysis.responses repeats the questions and answers that
+      trait_scores already summarizes
+    - personality_analysis.trait_scores is dropped when it equals aggregated_traits
+    - question lists keep only the question text and the response
+    - empty values, user_id and timestamp are dropped
+
+    Args:
+        user_persona: dict in the _final_userpersona(_analysis).json format
+
+    Returns:
+        New dict; the input is not modified.
+    """
+    compact = {}
+    for key, value in user_persona.items():
+        if key in DROPPED_FIELDS or value in ('', None, [], {}):
+            continue
+
+        if key == 'personality_analysis' and isinstance(value, dict):
+            analysis = {k: v for k, v in value.items() if k != 'responses' and v not in ('', None, [], {})}
+            if analysis.get('trait_scores') == user_persona.get('aggregated_traits'):
+                analysis.pop('trait_scores', None)
+            if analysis:
+                compact[key] = analysis
+        elif key == 'questions' and isinstance(value, list):
+            compact[key] = [
+                {'question': q.get('question', q.get('id', '')), 'response': q.get('response')}
+                for q in value
+                if isinstance(q, dict) and q.get('response') not in ('', None)
+            ]
+        else:
+            compact[key] = value
+
+    return compact
+
+
+def serialize_persona(user_persona: Dict[str, Any], max_tokens: int = None) -> str:
+    """
+    Serialize a user persona into compact JSON for embedding in prompts.
+
+    The output is minified and kept within max_tokens by truncating
+    user_input_summary, which is the only unbounded field.
+
+    Args:
+        user_persona: dict in the _final_userpersona(_analysis).json format
+        max_tokens: token budget (default: PERSONA_PROMPT_MAX_TOKENS)
+
+    Returns:
+        JSON string of the compacted persona.
+    """
+    max_chars = (max_tokens or PERSONA_PROMPT_MAX_TOKENS) * CHARS_PER_TOKEN
+    compact = compact_persona(user_persona or {})
+
+    def dumps(data):
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+    serialized = dumps(compact)
+    summary = compact.get('user_input_summary')
+    if len(serialized) <= max_chars or not isinstance(summary, str):
+        return serialized
+
+    # Shrink the summary by however much the whole output is over budget
+    overflow = len(serialized) - max_chars
+    keep = max(0, len(summary) - overflow - len(TRUNCATION_MARKER))
+    compact['user_input_summary'] = summary[:keep].rstrip() + TRUNCATION_MARKER
+    serialized = dumps(compact)
+
+    # Escaped characters can take more room than their raw length
+    while len(serialized) > max_chars and keep > 0:
+        keep = max(0, keep - (len(serialized) - max_chars))
+        compact['user_input_summary'] = summary[:keep].rstrip() + TRUNCATION_MARKER
+        serialized = dumps(compact)
+
+    return serialized
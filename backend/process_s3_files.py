@@ -6,13 +6,15 @@ with user_input_summary containing all extracted text.
 
 import os
 import json
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 import tempfile
 import mimetypes
 from pathlib import Path
 
+from text_extraction import extract_text_from_file
+from clients import get_s3_client
+
 # Load environment variables from project root
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
@@ -21,108 +23,23 @@ S3_BUCKET = os.getenv('S3_BUCKET', 'user-persona-data')
 S3_FOLDER = os.getenv('S3_FOLDER', 'uuid001')
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
 
-# Initialize S3 Client
+# S3 Client, created by init_s3_client() when the script runs
 s3_client = None
-try:
-    credentials = {}
-    
-    if os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY'):
-        credentials['aws_access_key_id'] = os.getenv('AWS_ACCESS_KEY_ID')
-        credentials['aws_secret_access_key'] = os.getenv('AWS_SECRET_ACCESS_KEY')
-        
-        if os.getenv('AWS_SESSION_TOKEN'):
-            credentials['aws_session_token'] = os.getenv('AWS_SESSION_TOKEN')
-        
-        s3_client = boto3.client(
-            's3',
-            region_name=AWS_REGION,
-            **credentials
-        )
-        print('✅ S3 Client initialized successfully')
-    else:
-        print('❌ Error: AWS credentials not found in environment variables')
-        exit(1)
-except Exception as s3_error:
-    print(f'❌ Failed to initialize S3 client: {s3_error}')
-    exit(1)
 
 
-def extract_text_from_file(file_path, content_type=None):
-    """Extract text from various file types"""
-    text_content = []
-    
+def init_s3_client():
+    """Create the S3 client used by this script; exits if AWS credentials are missing"""
+    global s3_client
     try:
-        # Determine file type
-        if content_type:
-            mime_type = content_type.split(';')[0].strip()
-        else:
-            mime_type, _ = mimetypes.guess_type(str(file_path))
-        
-        # Handle JSON files
-        if mime_type == 'application/json' or file_path.suffix.lower() == '.json':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                def extract_text_from_json(obj, path=''):
-                    """Recursively extract all string values from JSON"""
-                    texts = []
-                    if isinstance(obj, dict):
-                        for key, value in obj.items():
-                            if isinstance(value, str) and value.strip():
-                                texts.append(value)
-                            elif isinstance(value, (dict, list)):
-                                texts.extend(extract_text_from_json(value, f"{path}.{key}" if path else key))
-                    elif isinstance(obj, list):
-                        for i, item in enumerate(obj):
-                            if isinstance(item, str) and item.strip():
-                                texts.append(item)
-                            elif isinstance(item, (dict, list)):
-                                texts.extend(extract_text_from_json(item, f"{path}[{i}]" if path else f"[{i}]"))
-                    elif isinstance(obj, str) and obj.strip():
-                        texts.append(obj)
-                    return texts
-                
-                # Extract all text from JSON structure
-                extracted_texts = extract_text_from_json(data)
-                text_content.extend(extracted_texts)
-        
-        # Handle text files
-        elif mime_type in ['text/plain', 'text/txt'] or file_path.suffix.lower() in ['.txt', '.text']:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text_content.append(f.read())
-        
-        # Handle PDF files (requires PyPDF2 or pdfplumber)
-        elif mime_type == 'application/pdf' or file_path.suffix.lower() == '.pdf':
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    pdf_text = []
-                    for page in pdf_reader.pages:
-                        pdf_text.append(page.extract_text())
-                    text_content.append('\n'.join(pdf_text))
-            except ImportError:
-                print(f'⚠️  PyPDF2 not installed, skipping PDF text extraction for {file_path.name}')
-            except Exception as e:
-                print(f'⚠️  Error extracting text from PDF {file_path.name}: {e}')
-        
-        # Handle images (would need OCR - skip for now or add if needed)
-        elif mime_type and mime_type.startswith('image/'):
-            print(f'⚠️  Skipping image file {file_path.name} (OCR not implemented)')
-        
-        # Handle other text-based formats
+        if os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY'):
+            s3_client = get_s3_client(AWS_REGION)
+            print('✅ S3 Client initialized successfully')
         else:
-            # Try to read as text
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text_content.append(f.read())
-            except:
-                print(f'⚠️  Could not extract text from {file_path.name} (binary or unsupported format)')
-    
-    except Exception as e:
-        print(f'⚠️  Error processing {file_path.name}: {e}')
-    
-    return '\n'.join(text_content)
+            print('❌ Error: AWS credentials not found in environment variables')
+            exit(1)
+    except Exception as s3_error:
+        print(f'❌ Failed to initialize S3 client: {s3_error}')
+        exit(1)
 
 
 def list_s3_files(bucket, prefix):
@@ -168,6 +85,8 @@ def main():
     """Main function to process all S3 files and create combined JSON"""
     import sys
     
+    init_s3_client()
+    
     # Check for local file argument
     local_files = []
     if len(sys.argv) > 1:
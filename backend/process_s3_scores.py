@@ -8,17 +8,21 @@ import os
 import sys
 import json
 import tempfile
+import argparse
+import threading
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import boto3
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
 # Import process_responses and questions definition
 sys.path.append(os.path.dirname(__file__))
 from test_processor import process_responses, personality_questions  # type: ignore
-from llm_classifier import classify_user_persona  # type: ignore
+from questionnaire import compile_questionnaire  # type: ignore
+from llm_classifier import classify_user_persona_with_source, aclassify_user_persona_with_source  # type: ignore
+from clients import get_s3_client  # type: ignore
 
 
 # ---------------------------------------------------------------------------
@@ -31,7 +35,7 @@ def set_default_question_responses(
     verbose: bool = False,
 ):
     """
-    Ensure all 5 questions (Q1–Q5) have responses, using defaults when needed.
+    Ensure all questionnaire questions (Q1–Q5) have responses, using defaults when needed.
 
     Args:
         questions_list: list of question dicts with 'id' and optional 'response'
@@ -39,88 +43,14 @@ def set_default_question_responses(
         verbose: whether to print which questions got default values
 
     Returns:
-        List of exactly 5 questions with default responses filled in.
+        List with one question per questionnaire question, default responses filled in.
     """
     if personality_questions_dict is None:
         personality_questions_dict = personality_questions
 
-    # Map of question definitions keyed by ID
-    question_defs = personality_questions_dict.get("questions", {})
-
-    # Map of existing question IDs from the list
-    existing_question_ids = {
-        q.get("id"): q for q in questions_list if q.get("id")
-    }
-
-    result_questions = []
-    defaulted_questions = []
-
-    for qid in [f"Q{i}" for i in range(1, 6)]:
-        if qid in existing_question_ids:
-            # IMPORTANT: Preserve the original question object from the request
-            # This ensures we keep the actual user responses, not data from files
-            question = existing_question_ids[qid].copy()
-            
-            # Preserve all original fields (response, question text, etc.)
-            original_response = question.get("response")
-            original_question_text = question.get("question", "")
-            
-            # Only set default if response is truly missing/empty
-            if original_response is None or original_response == "" or (isinstance(original_response, str) and not original_response.strip()):
-                # Set default response only if missing
-                question_def = question_defs.get(qid, {})
-                qtype = question_def.get("type", "")
-
-                if qtype in ["likert", "likert_reverse"]:
-                    
-                    question["response"] = 3  # middle value
-                    defaulted_questions.append(f"{qid} (Likert: 3)")
-                elif qtype == "choice":
-                    answers = question_def.get("answers", {})
-                    if answers:
-                        first_option = list(answers.keys())[0]
-                        question["response"] = first_option
-                        defaulted_questions.append(
-                            f"{qid} (Choice: {first_option})"
-                        )
-                    else:
-                        question["response"] = ""
-                        defaulted_questions.append(f"{qid} (No options available)")
-                else:
-                    question["response"] = ""
-                    defaulted_questions.append(f"{qid} (Unknown type)")
-            else:
-                # Response exists - preserve it exactly as provided
-                question["response"] = original_response
-            
-            # Ensure question text is present (fill from dict if missing)
-            if not original_question_text:
-                question_def = question_defs.get(qid, {})
-                if question_def.get("question"):
-                    question["question"] = question_def["question"]
-            
-            result_questions.append(question)
-        else:
-            # Question missing, create with default
-            question_def = question_defs.get(qid, {})
-            question = {
-                "id": qid,
-                "question": question_def.get("question", ""),
-                "response": "",
-            }
-
-            qtype = question_def.get("type", "")
-            if qtype in ["likert", "likert_reverse"]:
-                question["response"] = 3
-                defaulted_questions.append(f"{qid} (Likert: 3)")
-            elif qtype == "choice":
-                answers = question_def.get("answers", {})
-                if answers:
-                    first_option = list(answers.keys())[0]
-                    question["response"] = first_option
-                    defaulted_questions.append(f"{qid} (Choice: {first_option})")
-
-            result_questions.append(question)
+    # Defaults are precomputed once per questionnaire version
+    questionnaire = compile_questionnaire(personality_questions_dict)
+    result_questions, defaulted_questions = questionnaire.fill_defaults(questions_list)
 
     if verbose and defaulted_questions:
         print(f"📝 Applied default responses to {len(defaulted_questions)} question(s):")
@@ -140,24 +70,21 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 S3_BUCKET = os.getenv("S3_BUCKET", "user-persona-data")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 
-# Initialize S3 client
-try:
-    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
-        creds = {
-            "aws_access_key_id": os.getenv("AWS_ACCESS_KEY_ID"),
-            "aws_secret_access_key": os.getenv("AWS_SECRET_ACCESS_KEY"),
-        }
-        if os.getenv("AWS_SESSION_TOKEN"):
-            creds["aws_session_token"] = os.getenv("AWS_SESSION_TOKEN")
+# Users processed in parallel by the batch mode
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+DEFAULT_CHECKPOINT = "process_s3_scores_checkpoint.json"
 
-        s3_client = boto3.client("s3", region_name=AWS_REGION, **creds)
-        print("✅ S3 Client initialized successfully")
-    else:
-        print("❌ Error: AWS credentials not found in environment variables")
-        sys.exit(1)
-except Exception as s3_error:
-    print(f"❌ Failed to initialize S3 client: {s3_error}")
-    sys.exit(1)
+
+def default_s3_client():
+    """
+    Shared S3 client used when none is passed (created on first use).
+
+    Raises:
+        RuntimeError: if AWS credentials are not set in the environment.
+    """
+    if not (os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY")):
+        raise RuntimeError("AWS credentials not found in environment variables")
+    return get_s3_client(AWS_REGION)
 
 
 # ---------------------------------------------------------------------------
@@ -170,10 +97,14 @@ def process_user_persona_data(
     bucket: str | None = None,
     user_id: str | None = None,
     verbose: bool = True,
+    bedrock_client=None,
 ) -> dict | None:
     """
-    Process user persona data, calculate scores, and optionally upload
-    results to S3 (with user_input_summary included).
+    Process user persona data, calculate scores, and optionally classify and
+    upload results to S3 (with user_input_summary included).
+
+    When uploading, the persona is classified once and the analysis file is
+    written in a single PUT that already carries the predicted category.
 
     Args:
         uploaded_data: dict containing the user persona data
@@ -181,6 +112,7 @@ def process_user_persona_data(
         bucket: optional S3 bucket name (required if s3_client_instance is provided)
         user_id: optional user ID (defaults to uploaded_data['user_id'] or 'unknown')
         verbose: whether to print progress messages
+        bedrock_client: optional Bedrock client for the classifier
 
     Returns:
         dict containing the final output with personality analysis, or None if error.
@@ -305,6 +237,7 @@ def process_user_persona_data(
             "timestamp": uploaded_data.get("timestamp", datetime.now().isoformat()),
             "user_input_summary": user_input_summary or "",
             "predicted_category": uploaded_data.get("predicted_category", ""),
+            "category_source": uploaded_data.get("category_source", ""),
             "aggregated_traits": aggregated_traits,
             "personality_analysis": {
                 "trait_scores": analysis_results.get("trait_scores", {}),
@@ -319,7 +252,7 @@ def process_user_persona_data(
             )
 
         # -------------------------------------------------------------------
-        # Upload to S3
+        # Classify once, then upload the analysis once
         # -------------------------------------------------------------------
         if s3_client_instance and bucket:
             # Warn if user_input_summary is empty, but still proceed with upload
@@ -329,94 +262,307 @@ def process_user_persona_data(
                     print("   The analysis will be uploaded but user_input_summary will be empty")
                     print("   Consider setting user_input_summary before calling process_user_persona_data")
 
-            if verbose:
-                print("📤 Uploading results to S3...")
-
-            analysis_json = json.dumps(
-                final_output, indent=2, ensure_ascii=False
+            predicted_category, category_source = classify_persona_analysis(
+                final_output,
+                bedrock_client=bedrock_client,
+                verbose=verbose,
             )
-            output_filename = f"{user_id}_final_userpersona_analysis.json"
-            output_key = f"{user_id}/{output_filename}"
-
-            s3_client_instance.put_object(
-                Bucket=bucket,
-                Key=output_key,
-                Body=analysis_json.encode("utf-8"),
-                ContentType="application/json; charset=utf-8",
-                Metadata={
-                    "userId": user_id,
-                    "processedAt": datetime.now().isoformat(),
-                    "hasAnalysis": "true",
-                    "originalFile": f"{user_id}_final_userpersona.json",
-                },
+            if predicted_category:
+                final_output["predicted_category"] = predicted_category
+                final_output["category_source"] = category_source
+
+            upload_persona_analysis(
+                final_output,
+                s3_client_instance=s3_client_instance,
+                bucket=bucket,
+                user_id=user_id,
+                verbose=verbose,
             )
 
-            if verbose:
-                print(f"✅ Successfully uploaded analysis to: s3://{bucket}/{output_key}")
-
-            # LLM classifier – predicted category
-            try:
-                if verbose:
-                    print("🔍 Classifying user persona to predict category...")
+        return final_output
 
-                predicted_category = classify_user_persona(
-                    json_data=final_output,
-                    region=AWS_REGION,
-                    verbose=verbose,
-                )
+    except Exception as e:
+        if verbose:
+            print(f"❌ Error processing data: {e}")
+            import traceback
 
-                print("\n" + "=" * 60)
-                print(f"🎯 PREDICTED CATEGORY: {predicted_category}")
-                print("=" * 60 + "\n")
+            traceback.print_exc()
+        return None
 
-                final_output["predicted_category"] = predicted_category
 
-                if verbose:
-                    print("📤 Re-uploading analysis with predicted category...")
+def classify_persona_analysis(
+    final_output: dict,
+    bedrock_client=None,
+    verbose: bool = True,
+) -> tuple[str | None, str | None]:
+    """
+    Predict the category of a persona analysis with the LLM classifier.
 
-                updated_analysis_json = json.dumps(
-                    final_output, indent=2, ensure_ascii=False
-                )
-                s3_client_instance.put_object(
-                    Bucket=bucket,
-                    Key=output_key,
-                    Body=updated_analysis_json.encode("utf-8"),
-                    ContentType="application/json; charset=utf-8",
-                    Metadata={
-                        "userId": user_id,
-                        "processedAt": datetime.now().isoformat(),
-                        "hasAnalysis": "true",
-                        "hasCategory": "true",
-                        "predictedCategory": predicted_category,
-                        "originalFile": f"{user_id}_final_userpersona.json",
-                    },
-                )
+    Args:
+        final_output: dict returned by process_user_persona_data
+        bedrock_client: optional Bedrock client (uses the shared one if not provided)
+        verbose: whether to print progress messages
 
-                if verbose:
-                    print(
-                        "✅ Successfully updated analysis with predicted category: "
-                        f"{predicted_category}"
-                    )
+    Returns:
+        Tuple (predicted category, category source 'local' or 'bedrock'),
+        or (None, None) if classification failed.
+    """
+    try:
+        if verbose:
+            print("🔍 Classifying user persona to predict category...")
 
-            except Exception as classifier_error:
-                if verbose:
-                    print(
-                        f"⚠️  Warning: Failed to classify user persona: {classifier_error}"
-                    )
-                    import traceback
+        predicted_category, category_source = classify_user_persona_with_source(
+            json_data=final_output,
+            bedrock_client=bedrock_client,
+            region=AWS_REGION,
+            verbose=verbose,
+        )
 
-                    traceback.print_exc()
-                # Do not fail the overall processing if classification fails
+        if verbose:
+            print("\n" + "=" * 60)
+            print(f"🎯 PREDICTED CATEGORY: {predicted_category}")
+            print("=" * 60 + "\n")
 
-        return final_output
+        return predicted_category, category_source
 
-    except Exception as e:
+    except Exception as classifier_error:
         if verbose:
-            print(f"❌ Error processing data: {e}")
+            print(f"⚠️  Warning: Failed to classify user persona: {classifier_error}")
             import traceback
 
             traceback.print_exc()
-        return None
+        # Do not fail the overall processing if classification fails
+        return None, None
+
+
+async def aclassify_persona_analysis(
+    final_output: dict,
+    bedrock_client=None,
+    verbose: bool = True,
+) -> tuple[str | None, str | None]:
+    """Async version of classify_persona_analysis (bedrock_client is an aioboto3 client)."""
+    try:
+        if verbose:
+            print("🔍 Classifying user persona to predict category...")
+
+        predicted_category, category_source = await aclassify_user_persona_with_source(
+            json_data=final_output,
+            bedrock_client=bedrock_client,
+            region=AWS_REGION,
+            verbose=verbose,
+        )
+
+        if verbose:
+            print("\n" + "=" * 60)
+            print(f"🎯 PREDICTED CATEGORY: {predicted_category}")
+            print("=" * 60 + "\n")
+
+        return predicted_category, category_source
+
+    except Exception as classifier_error:
+        if verbose:
+            print(f"⚠️  Warning: Failed to classify user persona: {classifier_error}")
+        return None, None
+
+
+def persona_analysis_object(final_output: dict, bucket: str, user_id: str) -> dict:
+    """put_object arguments of <user_id>_final_userpersona_analysis.json."""
+    output_key = f"{user_id}/{user_id}_final_userpersona_analysis.json"
+    predicted_category = final_output.get("predicted_category", "")
+
+    metadata = {
+        "userId": user_id,
+        "processedAt": datetime.now().isoformat(),
+        "hasAnalysis": "true",
+        "originalFile": f"{user_id}_final_userpersona.json",
+    }
+    if predicted_category:
+        metadata["hasCategory"] = "true"
+        metadata["predictedCategory"] = predicted_category
+        if final_output.get("category_source"):
+            metadata["categorySource"] = final_output["category_source"]
+
+    return {
+        "Bucket": bucket,
+        "Key": output_key,
+        "Body": json.dumps(final_output, indent=2, ensure_ascii=False).encode("utf-8"),
+        "ContentType": "application/json; charset=utf-8",
+        "Metadata": metadata,
+    }
+
+
+def upload_persona_analysis(
+    final_output: dict,
+    s3_client_instance,
+    bucket: str,
+    user_id: str,
+    verbose: bool = True,
+) -> str:
+    """
+    Upload <user_id>_final_userpersona_analysis.json in a single PUT.
+
+    Returns:
+        The S3 key of the analysis file.
+    """
+    if verbose:
+        print("📤 Uploading results to S3...")
+
+    analysis_object = persona_analysis_object(final_output, bucket, user_id)
+    s3_client_instance.put_object(**analysis_object)
+
+    if verbose:
+        print(f"✅ Successfully uploaded analysis to: s3://{bucket}/{analysis_object['Key']}")
+
+    return analysis_object["Key"]
+
+
+# ---------------------------------------------------------------------------
+# Submit pipeline (used by /api/submit-questions)
+# ---------------------------------------------------------------------------
+
+def persona_object(persona_data: dict, bucket: str, user_id: str, metadata: dict | None = None) -> dict:
+    """put_object arguments of <user_id>_final_userpersona.json."""
+    persona_metadata = {
+        "userId": user_id,
+        "uploadedAt": datetime.now().isoformat(),
+        **(metadata or {}),
+    }
+    if persona_data.get("predicted_category"):
+        persona_metadata["hasCategory"] = "true"
+        persona_metadata["predictedCategory"] = persona_data["predicted_category"]
+        if persona_data.get("category_source"):
+            persona_metadata["categorySource"] = persona_data["category_source"]
+
+    return {
+        "Bucket": bucket,
+        "Key": f"{user_id}/{user_id}_final_userpersona.json",
+        "Body": json.dumps(persona_data, indent=2, ensure_ascii=False).encode("utf-8"),
+        "ContentType": "application/json; charset=utf-8",
+        "Metadata": persona_metadata,
+    }
+
+
+def submit_user_persona(
+    persona_data: dict,
+    s3_client_instance,
+    bucket: str,
+    user_id: str,
+    metadata: dict | None = None,
+    bedrock_client=None,
+    verbose: bool = True,
+) -> dict | None:
+    """
+    Score, classify and store a submitted persona in a single pass.
+
+    The scores and the predicted category are computed once and each object
+    is written exactly once:
+      - <user_id>/<user_id>_final_userpersona_analysis.json
+      - <user_id>/<user_id>_final_userpersona.json (persona_data)
+    Both files carry the same predicted_category and category_source
+    ('local' or 'bedrock', the classifier that set it).
+
+    Args:
+        persona_data: dict in the _final_userpersona.json format; missing
+            responses, predicted_category and category_source are filled in place
+        s3_client_instance: S3 client instance
+        bucket: S3 bucket name
+        user_id: user ID (also the S3 folder)
+        metadata: extra S3 metadata for the persona file
+        bedrock_client: optional Bedrock client for the classifier
+        verbose: whether to print progress messages
+
+    Returns:
+        The final analysis output, or None if scoring failed (the persona
+        file is still stored).
+
+    Raises:
+        ClientError: if the persona file upload fails.
+    """
+    final_output = process_user_persona_data(
+        uploaded_data=persona_data,
+        s3_client_instance=s3_client_instance,
+        bucket=bucket,
+        user_id=user_id,
+        verbose=verbose,
+        bedrock_client=bedrock_client,
+    )
+
+    if final_output and final_output.get("predicted_category"):
+        persona_data["predicted_category"] = final_output["predicted_category"]
+        persona_data["category_source"] = final_output.get("category_source", "")
+
+    persona_file = persona_object(persona_data, bucket, user_id, metadata)
+
+    if verbose:
+        print(f"📤 Uploading persona data to S3: s3://{bucket}/{persona_file['Key']}")
+
+    s3_client_instance.put_object(**persona_file)
+
+    if verbose:
+        print(f"✅ Successfully uploaded persona data: s3://{bucket}/{persona_file['Key']}")
+
+    return final_output
+
+
+async def asubmit_user_persona(
+    persona_data: dict,
+    s3_client_instance,
+    bucket: str,
+    user_id: str,
+    metadata: dict | None = None,
+    bedrock_client=None,
+    verbose: bool = True,
+) -> dict | None:
+    """
+    Async version of submit_user_persona, for aioboto3 S3 and Bedrock clients.
+
+    Scoring runs inline (it is CPU-only); the classifier call and both PUTs
+    are awaited. Same objects, same return value and errors.
+    """
+    # Score only; classification and the analysis upload are awaited below
+    final_output = process_user_persona_data(
+        uploaded_data=persona_data,
+        user_id=user_id,
+        verbose=verbose,
+    )
+
+    if final_output:
+        predicted_category, category_source = await aclassify_persona_analysis(
+            final_output,
+            bedrock_client=bedrock_client,
+            verbose=verbose,
+        )
+        if predicted_category:
+            final_output["predicted_category"] = predicted_category
+            final_output["category_source"] = category_source
+
+        try:
+            if verbose:
+                print("📤 Uploading results to S3...")
+            analysis_object = persona_analysis_object(final_output, bucket, user_id)
+            await s3_client_instance.put_object(**analysis_object)
+            if verbose:
+                print(f"✅ Successfully uploaded analysis to: s3://{bucket}/{analysis_object['Key']}")
+        except Exception as e:
+            if verbose:
+                print(f"❌ Error processing data: {e}")
+            final_output = None
+
+    if final_output and final_output.get("predicted_category"):
+        persona_data["predicted_category"] = final_output["predicted_category"]
+        persona_data["category_source"] = final_output.get("category_source", "")
+
+    persona_file = persona_object(persona_data, bucket, user_id, metadata)
+
+    if verbose:
+        print(f"📤 Uploading persona data to S3: s3://{bucket}/{persona_file['Key']}")
+
+    await s3_client_instance.put_object(**persona_file)
+
+    if verbose:
+        print(f"✅ Successfully uploaded persona data: s3://{bucket}/{persona_file['Key']}")
+
+    return final_output
 
 
 # ---------------------------------------------------------------------------
@@ -434,11 +580,11 @@ def process_user_persona_file(
 
     Args:
         user_id: e.g., "uuid001"
-        s3_client_instance: optional S3 client (uses global if not provided)
+        s3_client_instance: optional S3 client (uses default_s3_client() if not provided)
         bucket: optional S3 bucket (uses global if not provided)
         verbose: whether to print progress messages
     """
-    s3_client_to_use = s3_client_instance or s3_client
+    s3_client_to_use = s3_client_instance or default_s3_client()
     bucket_to_use = bucket or S3_BUCKET
 
     input_filename = f"{user_id}_final_userpersona.json"
@@ -536,6 +682,161 @@ def process_user_persona_file(
             os.unlink(temp_path)
 
 
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def list_user_ids(s3_client_instance=None, bucket: str | None = None) -> list[str]:
+    """
+    List every user folder in the bucket: top-level prefixes holding a
+    <user_id>/<user_id>_final_userpersona.json file.
+
+    Returns:
+        Sorted list of user IDs.
+    """
+    s3_client_to_use = s3_client_instance or default_s3_client()
+    bucket_to_use = bucket or S3_BUCKET
+
+    user_ids = []
+    paginator = s3_client_to_use.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_to_use):
+        for obj in page.get("Contents", []):
+            user_id, _, filename = obj["Key"].partition("/")
+            if user_id and filename == f"{user_id}_final_userpersona.json":
+                user_ids.append(user_id)
+    return sorted(user_ids)
+
+
+def read_user_ids_file(path: str) -> list[str]:
+    """Read user IDs from a file, one per line (blank lines and # comments are ignored)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+def default_run_id() -> str:
+    """Run ID of a batch: the questionnaire version, so a changed questionnaire starts a new run."""
+    return f"questionnaire-{compile_questionnaire(personality_questions).version}"
+
+
+def load_checkpoint(path: str, run_id: str) -> dict:
+    """
+    Load a batch checkpoint, or an empty one if the file doesn't exist.
+
+    Raises:
+        ValueError: if the checkpoint belongs to another run (e.g. an older
+            questionnaire), whose completed users would wrongly be skipped.
+    """
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("runId") != run_id:
+            raise ValueError(
+                f"Checkpoint {path} belongs to run {checkpoint.get('runId') or 'unknown'}, not {run_id}; "
+                "delete it or pass another --checkpoint"
+            )
+        checkpoint.setdefault("completed", [])
+        checkpoint.setdefault("failed", [])
+        return checkpoint
+    return {"runId": run_id, "completed": [], "failed": []}
+
+
+def save_checkpoint(path: str, checkpoint: dict) -> None:
+    """Write a checkpoint atomically so a crash never leaves a partial file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def process_user_persona_batch(
+    user_ids: list[str],
+    s3_client_instance=None,
+    bucket: str | None = None,
+    workers: int = BATCH_WORKERS,
+    checkpoint_path: str | None = DEFAULT_CHECKPOINT,
+    verbose: bool = False,
+    run_id: str | None = None,
+) -> dict:
+    """
+    Download, re-score, classify and upload many users in parallel.
+
+    Progress is checkpointed after every user: users already marked completed
+    in the checkpoint are skipped, so rerunning a crashed batch resumes it.
+    Failed users are retried on the next run. The checkpoint is tied to a run
+    ID (the questionnaire version by default) and removed once every user
+    succeeded, so a later batch re-scores everyone.
+
+    Args:
+        user_ids: user IDs to process
+        s3_client_instance: optional S3 client (uses default_s3_client() if not provided)
+        bucket: optional S3 bucket (uses global if not provided)
+        workers: number of users processed concurrently
+        checkpoint_path: checkpoint file, or None to disable checkpointing
+        verbose: whether to print per-user progress messages
+        run_id: run the checkpoint belongs to (default: default_run_id())
+
+    Returns:
+        Dict with 'completed', 'failed' and 'skipped' counts.
+
+    Raises:
+        ValueError: if the checkpoint file belongs to another run.
+    """
+    run_id = run_id or default_run_id()
+    checkpoint = load_checkpoint(checkpoint_path, run_id) if checkpoint_path else {"runId": run_id, "completed": [], "failed": []}
+    done = set(checkpoint["completed"])
+    unique_ids = list(dict.fromkeys(user_ids))
+    pending = [user_id for user_id in unique_ids if user_id not in done]
+    checkpoint["failed"] = [user_id for user_id in checkpoint["failed"] if user_id not in pending]
+    checkpoint_lock = threading.Lock()
+
+    print(f"📋 {len(pending)} user(s) to process, {len(unique_ids) - len(pending)} already done")
+
+    summary = {"completed": 0, "failed": 0, "skipped": len(unique_ids) - len(pending)}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(
+                process_user_persona_file,
+                user_id,
+                s3_client_instance=s3_client_instance,
+                bucket=bucket,
+                verbose=verbose,
+            ): user_id
+            for user_id in pending
+        }
+        for future in as_completed(futures):
+            user_id = futures[future]
+            try:
+                success = future.result()
+            except Exception as e:
+                print(f"❌ {user_id}: {e}")
+                success = False
+
+            with checkpoint_lock:
+                if success:
+                    checkpoint["completed"].append(user_id)
+                    summary["completed"] += 1
+                else:
+                    checkpoint["failed"].append(user_id)
+                    summary["failed"] += 1
+                checkpoint["updatedAt"] = datetime.now().isoformat()
+                if checkpoint_path:
+                    save_checkpoint(checkpoint_path, checkpoint)
+
+                processed = summary["completed"] + summary["failed"]
+                print(f"{'✅' if success else '❌'} [{processed}/{len(pending)}] {user_id}")
+
+    # Nothing left to resume: the next batch starts from scratch
+    if checkpoint_path and summary["failed"] == 0 and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+        print(f"🧹 Batch complete, removed checkpoint {checkpoint_path}")
+
+    return summary
+
+
 # ---------------------------------------------------------------------------
 # CLI main
 # ---------------------------------------------------------------------------
@@ -544,6 +845,7 @@ def main() -> None:
     """CLI entrypoint."""
     if len(sys.argv) < 2:
         print("Usage: python3 process_s3_scores.py <user_id>")
+        print("       python3 process_s3_scores.py --all | --ids-file <path> [--workers N] [--checkpoint <path>] [--run-id <id>]")
         print("Example: python3 process_s3_scores.py uuid001")
         print("\nThis script will:")
         print("  1. Download s3://user-persona-data/<user_id>/<user_id>_final_userpersona.json")
@@ -552,14 +854,54 @@ def main() -> None:
             "  3. Upload results to "
             "s3://user-persona-data/<user_id>/<user_id>_final_userpersona_analysis.json"
         )
+        print("\nBatch mode (--all: every user folder in the bucket, --ids-file: one user ID per line)")
+        print("processes users in parallel and resumes from the checkpoint file if rerun with the same run ID")
+        print("(default: the questionnaire version).")
         sys.exit(1)
 
-    user_id = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Re-score and classify user persona files in S3.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("user_id", nargs="?", help="single user ID to process")
+    source.add_argument("--all", action="store_true", help="process every user folder in the bucket")
+    source.add_argument("--ids-file", help="file with one user ID per line")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="users processed in parallel")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="checkpoint file used to resume a batch")
+    parser.add_argument("--run-id", help="run ID of the checkpoint (default: the questionnaire version)")
+    parser.add_argument("--verbose", action="store_true", help="print per-user progress in batch mode")
+    args = parser.parse_args()
+
+    # Fail fast on missing credentials, before any work is scheduled
+    try:
+        default_s3_client()
+        print("✅ S3 Client initialized successfully")
+    except Exception as s3_error:
+        print(f"❌ Failed to initialize S3 client: {s3_error}")
+        sys.exit(1)
 
     print(f"📦 S3 Bucket: {S3_BUCKET}")
-    print(f"👤 User ID: {user_id}")
 
-    success = process_user_persona_file(user_id)
+    if args.user_id:
+        print(f"👤 User ID: {args.user_id}")
+        success = process_user_persona_file(args.user_id)
+    else:
+        user_ids = list_user_ids() if args.all else read_user_ids_file(args.ids_file)
+        print(f"👥 Users: {len(user_ids)} (workers: {args.workers}, checkpoint: {args.checkpoint})")
+        try:
+            summary = process_user_persona_batch(
+                user_ids,
+                workers=args.workers,
+                checkpoint_path=args.checkpoint,
+                verbose=args.verbose,
+                run_id=args.run_id,
+            )
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(
+            f"\n📊 Completed: {summary['completed']}, failed: {summary['failed']}, "
+            f"skipped (already done): {summary['skipped']}"
+        )
+        success = summary["failed"] == 0
 
     if success:
         print("\n✅ Processing completed successfully!")
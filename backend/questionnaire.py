@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Compiled personality questionnaire.
+
+personality_traits.json is the single source of the questionnaire. It is
+compiled once per schema version into lookup tables (default answers,
+choice-to-trait scores, likert score tables) so scoring and default filling
+don't walk the raw schema on every request. Compiled questionnaires are
+cached by version; schema dicts are treated as read-only once compiled.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+QUESTIONNAIRE_PATH = os.getenv(
+    'QUESTIONNAIRE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'personality_traits.json')
+)
+
+LIKERT_TYPES = ('likert', 'likert_reverse')
+
+
+def schema_version(schema: Dict) -> str:
+    """Version of a schema: its 'version' field, else a hash of its content."""
+    if schema.get('version'):
+        return str(schema['version'])
+    raw = json.dumps(schema, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _likert_table(qtype: str, weight) -> Dict[int, Any]:
+    """Score of every likert value 1-5 (3 scores 0, the trait is still reported)."""
+    high, low = (weight, -weight) if qtype == 'likert' else (-weight, weight)
+    return {1: low, 2: low, 3: 0, 4: high, 5: high}
+
+
+class CompiledQuestionnaire:
+    """Questionnaire schema compiled into per-question lookup tables."""
+
+    def __init__(self, schema: Dict, version: Optional[str] = None):
+        """
+        Args:
+            schema: questionnaire dict in the personality_traits.json format
+            version: schema version (default: schema_version(schema))
+        """
+        self.schema = schema
+        self.version = version or schema_version(schema)
+        self.traits = list(schema.get('traits', []))
+        self.questions = schema.get('questions', {})
+        self.question_ids = list(self.questions)
+        self.question_texts = {qid: q.get('question', '') for qid, q in self.questions.items()}
+        self.question_types = {qid: q.get('type', '') for qid, q in self.questions.items()}
+
+        # qid -> (trait, {value: score}) for likert questions
+        self.likert_rules = {}
+        # qid -> {option: {trait: score}} for choice questions
+        self.choice_tables = {}
+        # qid -> (default response, description used in the defaults log)
+        self.defaults = {}
+
+        for qid, question in self.questions.items():
+            qtype = question.get('type', '')
+            if qtype in LIKERT_TYPES:
+                self.likert_rules[qid] = (question['trait'], _likert_table(qtype, question.get('weight', 1)))
+                self.defaults[qid] = (3, 'Likert: 3')
+            elif qtype == 'choice':
+                answers = question.get('answers', {})
+                self.choice_tables[qid] = answers
+                if answers:
+                    first_option = next(iter(answers))
+                    self.defaults[qid] = (first_option, f'Choice: {first_option}')
+                else:
+                    self.defaults[qid] = ('', 'No options available')
+            else:
+                self.defaults[qid] = ('', 'Unknown type')
+
+        self._matrix = None
+        self._matrix_lock = threading.Lock()
+
+    def fill_defaults(self, questions_list: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        Return one question dict per schema question, filling missing responses with defaults.
+
+        Submitted question objects are copied and keep all their fields; only
+        empty responses and missing question texts are filled in.
+
+        Returns:
+            Tuple (questions, descriptions of the defaults applied).
+        """
+        existing = {q.get('id'): q for q in questions_list if q.get('id')}
+        result = []
+        defaulted = []
+
+        for qid in self.question_ids:
+            default_response, description = self.defaults[qid]
+            submitted = existing.get(qid)
+
+            if submitted is not None:
+                question = submitted.copy()
+                response = question.get('response')
+                if response is None or response == '' or (isinstance(response, str) and not response.strip()):
+                    question['response'] = default_response
+                    defaulted.append(f'{qid} ({description})')
+                if not question.get('question', '') and self.question_texts[qid]:
+                    question['question'] = self.question_texts[qid]
+            else:
+                question = {
+                    'id': qid,
+                    'question': self.question_texts[qid],
+                    'response': default_response,
+                }
+                if default_response != '':
+                    defaulted.append(f'{qid} ({description})')
+
+            result.append(question)
+
+        return result, defaulted
+
+    def process_responses(self, user_responses: Dict) -> Dict:
+        """Score one user's answers; same output as test_processor.process_responses."""
+        results = {
+            'user_id': user_responses.get('user_id', 'unknown'),
+            'questions': self.schema,
+            'responses': [],
+            'trait_scores': defaultdict(int)
+        }
+
+        for qid, answer in user_responses.get('answers', {}).items():
+            qtype = self.question_types.get(qid)
+            if qtype is None:
+                print(f'Warning: QID {qid} not found in questions mapping')
+                continue
+
+            trait_scores = {}
+            if qid in self.likert_rules:
+                trait, table = self.likert_rules[qid]
+                try:
+                    score = table.get(int(answer))
+                    if score is not None:
+                        trait_scores[trait] = score
+                        results['trait_scores'][trait] += score
+                except (ValueError, TypeError):
+                    print(f"Warning: Invalid likert value '{answer}' for QID {qid}")
+            elif qid in self.choice_tables:
+                if answer in self.choice_tables[qid]:
+                    trait_scores = self.choice_tables[qid][answer]
+                    for trait, score in trait_scores.items():
+                        results['trait_scores'][trait] += score
+                else:
+                    print(f"Warning: Answer '{answer}' not found for QID {qid}")
+
+            results['responses'].append({
+                'question_id': qid,
+                'question': self.question_texts[qid],
+                'user_response': answer,
+                'type': qtype,
+                'traits_affected': trait_scores
+            })
+
+        results['trait_scores'] = dict(results['trait_scores'])
+        return results
+
+    @property
+    def matrix(self):
+        """Response-to-trait weight matrix for batch scoring (built on first use)."""
+        with self._matrix_lock:
+            if self._matrix is None:
+                from trait_matrix import TraitWeightMatrix
+                self._matrix = TraitWeightMatrix(self.schema)
+            return self._matrix
+
+
+_compiled_by_version = {}
+_compiled_by_identity = {}
+_loaded_files = {}
+_cache_lock = threading.Lock()
+
+
+def compile_questionnaire(schema: Dict) -> CompiledQuestionnaire:
+    """
+    Get the compiled form of a questionnaire schema.
+
+    The same dict object is only compiled (and hashed) once; equal schemas
+    share one compiled questionnaire through the version cache.
+    """
+    with _cache_lock:
+        entry = _compiled_by_identity.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+
+        version = schema_version(schema)
+        compiled = _compiled_by_version.get(version)
+        if compiled is None:
+            compiled = _compiled_by_version[version] = CompiledQuestionnaire(schema, version)
+        # Keep a reference to the dict so its id can't be reused by another object
+        _compiled_by_identity[id(schema)] = (schema, compiled)
+        return compiled
+
+
+def load_questionnaire(path: Optional[str] = None) -> CompiledQuestionnaire:
+    """Load and compile a questionnaire file, reloading it when the file changes."""
+    path = path or QUESTIONNAIRE_PATH
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        entry = _loaded_files.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        compiled = compile_questionnaire(json.load(f))
+
+    with _cache_lock:
+        _loaded_files[path] = (mtime, compiled)
+    return compiled
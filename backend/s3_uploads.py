@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Streaming uploads to S3.
+
+S3StreamingUpload takes a file's bytes as they arrive (e.g. from the request
+stream) and sends them to an S3 multipart upload in fixed-size parts. Parts
+are uploaded in parallel on a shared thread pool, and at most
+UPLOAD_MAX_PARTS_IN_FLIGHT parts per file are held in memory: when they are
+all in flight, write() blocks, which slows down reading the request instead
+of buffering it. Files smaller than one part are sent with a single PutObject.
+The SHA-256 of the content is computed along the way.
+
+Whole files are uploaded concurrently with submit_upload(), on a second
+shared pool of UPLOAD_CONCURRENCY threads.
+"""
+
+import os
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# S3 requires parts of at least 5 MB, except the last one
+MIN_PART_SIZE = 5 * 1024 * 1024
+UPLOAD_PART_SIZE = max(int(os.getenv('UPLOAD_PART_SIZE', str(8 * 1024 * 1024))), MIN_PART_SIZE)
+
+# Threads uploading parts (shared by all uploads), and parts buffered per file
+UPLOAD_PART_WORKERS = int(os.getenv('UPLOAD_PART_WORKERS', '8'))
+UPLOAD_MAX_PARTS_IN_FLIGHT = int(os.getenv('UPLOAD_MAX_PARTS_IN_FLIGHT', '4'))
+
+# Files uploaded at once (shared by all requests)
+UPLOAD_CONCURRENCY = int(os.getenv('UPLOAD_CONCURRENCY', '4'))
+
+# Separate pools: a file upload waits on its parts, so they can't share threads
+_part_executor = None
+_upload_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_part_executor():
+    """The thread pool uploading parts, started on first use."""
+    global _part_executor
+    with _executor_lock:
+        if _part_executor is None:
+            _part_executor = ThreadPoolExecutor(max_workers=UPLOAD_PART_WORKERS, thread_name_prefix='s3-part')
+        return _part_executor
+
+
+def _get_upload_executor():
+    """The thread pool uploading whole files, started on first use."""
+    global _upload_executor
+    with _executor_lock:
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY, thread_name_prefix='s3-upload')
+        return _upload_executor
+
+
+class S3StreamingUpload:
+    """Upload of one S3 object from data written in chunks."""
+
+    def __init__(self, s3_client_instance, bucket, key, content_type='application/octet-stream',
+                 metadata=None, part_size=UPLOAD_PART_SIZE, max_parts_in_flight=UPLOAD_MAX_PARTS_IN_FLIGHT,
+                 callback=None):
+        """
+        Args:
+            s3_client_instance: S3 client instance
+            bucket: S3 bucket name
+            key: object key
+            content_type: ContentType of the object
+            metadata: optional S3 metadata dict
+            part_size: size of each part but the last (at least 5 MB)
+            max_parts_in_flight: parts buffered or uploading at once
+            callback: optional function called with the number of bytes
+                sent each time a part (or the single PutObject) finishes;
+                may run on a pool thread
+        """
+        self.s3 = s3_client_instance
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.metadata = metadata or {}
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.upload_id = None
+        self._buffer = bytearray()
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(max_parts_in_flight)
+        self._callback = callback
+
+    def write(self, data):
+        """Add the next chunk of the file, sending every complete part."""
+        self._buffer += data
+        self.size += len(data)
+        self.sha256.update(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._submit_part(part)
+
+    def _raise_failed_part(self):
+        for future in self._parts:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+
+    def _submit_part(self, data):
+        # Stop reading the file as soon as a part has failed
+        self._raise_failed_part()
+        if self.upload_id is None:
+            response = self.s3.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                ContentType=self.content_type,
+                Metadata=self.metadata
+            )
+            self.upload_id = response['UploadId']
+
+        self._slots.acquire()
+        try:
+            future = _get_part_executor().submit(self._upload_part, len(self._parts) + 1, data)
+        except Exception:
+            self._slots.release()
+            raise
+        self._parts.append(future)
+
+    def _upload_part(self, part_number, data):
+        try:
+            response = self.s3.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=data
+            )
+            if self._callback:
+                self._callback(len(data))
+            return {'PartNumber': part_number, 'ETag': response['ETag']}
+        finally:
+            self._slots.release()
+
+    def complete(self):
+        """
+        Send the rest of the file and finish the upload (aborted on error).
+
+        Returns:
+            Dict with the object's 'etag' and 'size'.
+        """
+        if self.upload_id is None:
+            response = self.s3.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=bytes(self._buffer),
+                ContentType=self.content_type,
+                Metadata=self.metadata
+            )
+            self._buffer = bytearray()
+            if self._callback:
+                self._callback(self.size)
+            return {'etag': response.get('ETag'), 'size': self.size}
+
+        try:
+            if self._buffer:
+                self._submit_part(bytes(self._buffer))
+                self._buffer = bytearray()
+            parts = [future.result() for future in self._parts]
+            response = self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            self.abort()
+            raise
+        return {'etag': response.get('ETag'), 'size': self.size}
+
+    def abort(self):
+        """Abandon the upload, deleting the parts already sent."""
+        self._buffer = bytearray()
+        if self.upload_id is None:
+            return
+
+        for future in self._parts:
+            future.cancel()
+        wait(self._parts)
+        try:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            print(f'✓ Aborted multipart upload of {self.key}')
+        except Exception as e:
+            print(f'⚠️  Failed to abort multipart upload of {self.key}: {e}')
+        self.upload_id = None
+
+
+def file_sha256(fileobj, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a seekable file object, which is rewound afterwards."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(chunk_size), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def sha256_checksum(hexdigest):
+    """S3 ChecksumSHA256 value (base64) of a SHA-256 hex digest."""
+    return base64.b64encode(bytes.fromhex(hexdigest)).decode('ascii')
+
+
+def verified_sha256(response):
+    """
+    SHA-256 hex digest that S3 verified for an object, from a HeadObject /
+    GetObject response requested with ChecksumMode='ENABLED'.
+
+    Returns:
+        The hex digest, or None if the object has no full-object SHA-256
+        checksum (multipart checksums are checksums of the parts).
+    """
+    checksum = response.get('ChecksumSHA256')
+    if not checksum or '-' in checksum:
+        return None
+    try:
+        return base64.b64decode(checksum).hex()
+    except ValueError:
+        return None
+
+
+def upload_fileobj(s3_client_instance, bucket, key, fileobj, content_type='application/octet-stream',
+                   metadata=None, callback=None):
+    """
+    Upload a readable file object with S3StreamingUpload (aborted on error).
+
+    Returns:
+        Dict with the object's 'etag' and 'size'.
+    """
+    upload = S3StreamingUpload(s3_client_instance, bucket, key, content_type, metadata, callback=callback)
+    try:
+        while True:
+            chunk = fileobj.read(upload.part_size)
+            if not chunk:
+                break
+            upload.write(chunk)
+        return upload.complete()
+    except Exception:
+        upload.abort()
+        raise
+
+
+def submit_upload(s3_client_instance, bucket, key, fileobj, content_type='application/octet-stream',
+                  metadata=None, callback=None):
+    """Run upload_fileobj() on the shared upload pool; returns its Future."""
+    return _get_upload_executor().submit(
+        upload_fileobj, s3_client_instance, bucket, key, fileobj, content_type, metadata, callback
+    )
@@ -5,31 +5,38 @@ Python Flask server for handling file uploads to AWS S3
 """
 
 import os
+import io
 import uuid
 import re
 import json
-import tempfile
 import sys
-import mimetypes
-from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import queue
 import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, Future
 from werkzeug.utils import secure_filename
-import boto3
+from werkzeug.sansio.multipart import MultipartDecoder, Data, Epilogue, Field, File, NeedData
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
 
 # Import process_responses from test_processor
 sys.path.append(os.path.dirname(__file__))
 from test_processor import process_responses, personality_questions
-from process_s3_scores import process_user_persona_data, set_default_question_responses
-from llm_classifier import classify_user_persona
-from debate_agents import main as run_debate
+from process_s3_scores import submit_user_persona, set_default_question_responses
+from debate_agents import main as run_debate, stream_debate, GEMINI_MODEL
+from debate_cache import debate_cache_key, load_cached_debate, store_cached_debate, DEBATE_CACHE_SUFFIX
 from mentor_agent import ask_llm, get_peer_mentor_recommendations
+from llm_cache import get_llm_cache
+from session_store import get_session_store
+from text_extraction import resolve_extractor, ExtractionError, SNIFF_BYTES
+from extraction_cache import get_cached_text, store_cached_text, is_sidecar, EXTRACTED_SUFFIX
+from upload_manifest import get_manifest, load_manifest, record_uploads, manifest_entry, load_content_hash_index, MANIFEST_SUFFIX
+from s3_uploads import S3StreamingUpload, submit_upload, file_sha256, sha256_checksum, verified_sha256
+from clients import lazy_aws_client, aws_credentials, get_bedrock_client, prewarm_clients_in_background, warmup_status
 
 # Load environment variables from project root
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -43,30 +50,42 @@ S3_BUCKET = os.getenv('S3_BUCKET', 'user-persona-data')
 S3_FOLDER = os.getenv('S3_FOLDER', 'uuid001')
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
 
-# Initialize S3 Client
+# Files read in parallel when combining a user's uploads, and the largest file read into memory
+COMBINE_FETCH_WORKERS = int(os.getenv('COMBINE_FETCH_WORKERS', '8'))
+COMBINE_MAX_FILE_BYTES = int(os.getenv('COMBINE_MAX_FILE_BYTES', str(20 * 1024 * 1024)))
+
+# /api/upload-stream: bytes read from the request at a time, and the largest form field kept in memory
+STREAM_UPLOAD_READ_BYTES = int(os.getenv('STREAM_UPLOAD_READ_BYTES', str(64 * 1024)))
+STREAM_UPLOAD_MAX_FIELD_BYTES = int(os.getenv('STREAM_UPLOAD_MAX_FIELD_BYTES', str(1024 * 1024)))
+
+# Presigned direct-to-S3 uploads: lifetime of the upload form and largest accepted file
+PRESIGN_EXPIRES = int(os.getenv('PRESIGN_EXPIRES', '900'))
+PRESIGN_MAX_BYTES = int(os.getenv('PRESIGN_MAX_BYTES', str(1024 * 1024 * 1024)))
+
+# Keys handed out by /api/upload/presign: <folder>/<timestamp>-<sanitized name>
+UPLOAD_KEY_NAME_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}(-\d+)?-[a-zA-Z0-9._-]+$')
+
+# Create the shared clients (S3, Bedrock, Gemini, Groq, Tavily) in the background
+# when the server starts serving, so importing this module stays cheap
+PREWARM_CLIENTS = os.getenv('PREWARM_CLIENTS', 'true').lower() in ('true', '1', 'yes', 'on')
+
+# S3 Client (shared process-wide, see clients.py); boto3 is loaded on first use
 s3_client = None
-try:
-    credentials = {}
-    
-    if os.getenv('AWS_ACCESS_KEY_ID') and os.getenv('AWS_SECRET_ACCESS_KEY'):
-        credentials['aws_access_key_id'] = os.getenv('AWS_ACCESS_KEY_ID')
-        credentials['aws_secret_access_key'] = os.getenv('AWS_SECRET_ACCESS_KEY')
-        
-        # Add session token if provided (for temporary credentials)
-        if os.getenv('AWS_SESSION_TOKEN'):
-            credentials['aws_session_token'] = os.getenv('AWS_SESSION_TOKEN')
-        
-        s3_client = boto3.client(
-            's3',
-            region_name=AWS_REGION,
-            **credentials
-        )
-        print('S3 Client initialized successfully')
-    else:
-        print('Warning: AWS credentials not found in environment variables')
-except Exception as s3_error:
-    print(f'Failed to initialize S3 client: {s3_error}')
-    s3_client = None
+if aws_credentials():
+    s3_client = lazy_aws_client('s3', AWS_REGION)
+else:
+    print('Warning: AWS credentials not found in environment variables')
+
+
+def start_client_prewarm():
+    """Start warming up the shared clients in the background (once per process)"""
+    if PREWARM_CLIENTS and s3_client:
+        prewarm_clients_in_background(bucket=S3_BUCKET, gemini_model=GEMINI_MODEL, region=AWS_REGION)
+
+
+@app.before_request
+def prewarm_on_first_request():
+    start_client_prewarm()
 
 
 def sanitize_filename(filename):
@@ -74,84 +93,6 @@ def sanitize_filename(filename):
     return re.sub(r'[^a-zA-Z0-9._-]', '_', filename)
 
 
-def extract_text_from_file(file_path, content_type=None):
-    """Extract text from various file types"""
-    text_content = []
-    
-    try:
-        # Determine file type
-        if content_type:
-            mime_type = content_type.split(';')[0].strip()
-        else:
-            mime_type, _ = mimetypes.guess_type(str(file_path))
-        
-        # Handle JSON files
-        if mime_type == 'application/json' or file_path.suffix.lower() == '.json':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-                def extract_text_from_json(obj, path=''):
-                    """Recursively extract all string values from JSON"""
-                    texts = []
-                    if isinstance(obj, dict):
-                        for key, value in obj.items():
-                            if isinstance(value, str) and value.strip():
-                                texts.append(value)
-                            elif isinstance(value, (dict, list)):
-                                texts.extend(extract_text_from_json(value, f"{path}.{key}" if path else key))
-                    elif isinstance(obj, list):
-                        for i, item in enumerate(obj):
-                            if isinstance(item, str) and item.strip():
-                                texts.append(item)
-                            elif isinstance(item, (dict, list)):
-                                texts.extend(extract_text_from_json(item, f"{path}[{i}]" if path else f"[{i}]"))
-                    elif isinstance(obj, str) and obj.strip():
-                        texts.append(obj)
-                    return texts
-                
-                # Extract all text from JSON structure
-                extracted_texts = extract_text_from_json(data)
-                text_content.extend(extracted_texts)
-        
-        # Handle text files
-        elif mime_type in ['text/plain', 'text/txt'] or file_path.suffix.lower() in ['.txt', '.text']:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                text_content.append(f.read())
-        
-        # Handle PDF files (requires PyPDF2 or pdfplumber)
-        elif mime_type == 'application/pdf' or file_path.suffix.lower() == '.pdf':
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    pdf_text = []
-                    for page in pdf_reader.pages:
-                        pdf_text.append(page.extract_text())
-                    text_content.append('\n'.join(pdf_text))
-            except ImportError:
-                print(f'⚠️  PyPDF2 not installed, skipping PDF text extraction for {file_path.name}')
-            except Exception as e:
-                print(f'⚠️  Error extracting text from PDF {file_path.name}: {e}')
-        
-        # Handle images (would need OCR - skip for now or add if needed)
-        elif mime_type and mime_type.startswith('image/'):
-            print(f'⚠️  Skipping image file {file_path.name} (OCR not implemented)')
-        
-        # Handle other text-based formats
-        else:
-            # Try to read as text
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    text_content.append(f.read())
-            except:
-                print(f'⚠️  Could not extract text from {file_path.name} (binary or unsupported format)')
-    
-    except Exception as e:
-        print(f'⚠️  Error processing {file_path.name}: {e}')
-    
-    return '\n'.join(text_content)
-
-
 def list_s3_files_in_folder(bucket, folder_prefix, s3_client_instance):
     """List all files in S3 bucket with the given folder prefix"""
     files = []
@@ -162,12 +103,13 @@ def list_s3_files_in_folder(bucket, folder_prefix, s3_client_instance):
         for page in pages:
             if 'Contents' in page:
                 for obj in page['Contents']:
-                    # Skip directories (objects ending with /)
-                    if not obj['Key'].endswith('/'):
+                    # Skip directories (objects ending with /) and extracted-text sidecars
+                    if not obj['Key'].endswith('/') and not is_sidecar(obj['Key']):
                         files.append({
                             'key': obj['Key'],
                             'size': obj['Size'],
-                            'last_modified': obj['LastModified'].isoformat()
+                            'last_modified': obj['LastModified'].isoformat(),
+                            'etag': obj.get('ETag')
                         })
         
         return files
@@ -189,44 +131,28 @@ def get_latest_description_file(bucket, folder_prefix, s3_client_instance):
         String content of the latest description.txt file, or empty string if not found
     """
     try:
-        # List all files in the folder
-        s3_files = list_s3_files_in_folder(bucket, folder_prefix, s3_client_instance)
+        # Resolve the latest description from the upload manifest (one GET)
+        # instead of listing the whole folder
+        manifest = get_manifest(s3_client_instance, bucket, folder_prefix)
+        latest_file = manifest.get('latest_description')
         
-        if not s3_files:
-            print(f'No files found in s3://{bucket}/{folder_prefix}/')
-            return ''
-        
-        # Filter for description.txt files
-        description_files = [
-            f for f in s3_files 
-            if f['key'].endswith('-description.txt') and folder_prefix in f['key']
-        ]
-        
-        if not description_files:
+        if not latest_file:
             print(f'No description.txt files found in s3://{bucket}/{folder_prefix}/')
             return ''
         
-        # Sort by last_modified (most recent first)
-        description_files.sort(key=lambda x: x['last_modified'], reverse=True)
-        
-        # Get the latest file
-        latest_file = description_files[0]
         latest_key = latest_file['key']
         filename = os.path.basename(latest_key)
         
         print(f'Found latest description file: {filename} (modified: {latest_file["last_modified"]})')
         
-        # Download and read the file
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = os.path.join(temp_dir, 'description.txt')
-            s3_client_instance.download_file(bucket, latest_key, temp_path)
-            
-            # Read the content
-            with open(temp_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            print(f'✓ Read {len(content)} characters from latest description file')
-            return content.strip()
+        content = latest_file.get('text')
+        if content is None:
+            # Too large to be stored inline in the manifest
+            response = s3_client_instance.get_object(Bucket=bucket, Key=latest_key)
+            content = response['Body'].read().decode('utf-8')
+        
+        print(f'✓ Read {len(content)} characters from latest description file')
+        return content.strip()
     
     except ClientError as e:
         print(f'❌ Error getting latest description file: {e}')
@@ -236,52 +162,118 @@ def get_latest_description_file(bucket, folder_prefix, s3_client_instance):
         return ''
 
 
+def fetch_and_extract_text(bucket, key, s3_client_instance, etag=None):
+    """Download an S3 object into memory (up to COMBINE_MAX_FILE_BYTES) and extract its text
+    
+    The content type comes from the GetObject response, so no HeadObject call
+    or temporary file is needed. The file type is sniffed from the first bytes
+    of the body: audio, video, images and other binaries are rejected without
+    reading the rest. Extracted text is cached per ETag in a
+    <key>.extracted.txt sidecar, so unchanged files are not downloaded again.
+    Rejected binaries are cached as empty text; failed or timed-out
+    extractions aren't cached, so the next submit tries again.
+    
+    Args:
+        bucket: S3 bucket name
+        key: object key
+        s3_client_instance: S3 client instance
+        etag: ETag of the object if known (from the manifest or a listing)
+    
+    Returns:
+        Extracted text, or an empty string
+    """
+    filename = os.path.basename(key)
+    try:
+        cached_text = get_cached_text(s3_client_instance, bucket, key, etag)
+        if cached_text is not None:
+            print(f'✓ Using cached text of {filename} ({len(cached_text)} characters)')
+            return cached_text
+        
+        response = s3_client_instance.get_object(Bucket=bucket, Key=key)
+        body = response['Body']
+        content_type = response.get('ContentType', 'application/octet-stream')
+        current_etag = response.get('ETag') or etag
+        try:
+            if response.get('ContentLength', 0) > COMBINE_MAX_FILE_BYTES:
+                print(f'⚠️  Skipping {filename}: {response["ContentLength"]} bytes exceeds the {COMBINE_MAX_FILE_BYTES} byte limit')
+                return ''
+            
+            head = body.read(SNIFF_BYTES)
+            extractor, reason = resolve_extractor(head, filename, content_type)
+            if extractor is None:
+                # Closing the body early drops the rest of the download
+                print(f'⚠️  Skipping {filename}: {reason}')
+                store_cached_text(s3_client_instance, bucket, key, current_etag, '')
+                return ''
+            if extractor.too_large(response.get('ContentLength', 0)):
+                print(f'⚠️  Skipping {filename}: {response["ContentLength"]} bytes exceeds the {extractor.max_bytes} byte {extractor.name} limit')
+                return ''
+            
+            data = head + body.read(COMBINE_MAX_FILE_BYTES + 1 - len(head))
+        finally:
+            body.close()
+        
+        if len(data) > COMBINE_MAX_FILE_BYTES:
+            print(f'⚠️  Skipping {filename}: exceeds the {COMBINE_MAX_FILE_BYTES} byte limit')
+            return ''
+        
+        try:
+            text = extractor.extract(data, filename)
+        except ExtractionError as e:
+            # Not cached: a timeout or transient error must not blank the file until it is re-uploaded
+            print(f'⚠️  {e}')
+            return ''
+        store_cached_text(s3_client_instance, bucket, key, current_etag, text)
+        
+        if text.strip():
+            print(f'✓ Extracted {len(text)} characters from {filename}')
+        else:
+            print(f'⚠️  No text extracted from {filename}')
+        return text
+    
+    except Exception as e:
+        print(f'⚠️  Error processing {filename}: {e}')
+        return ''
+
+
 def combine_files_from_s3_folder(bucket, folder_prefix, s3_client_instance, exclude_patterns=None):
     """Read all files from S3 folder and combine their text content"""
     if exclude_patterns is None:
-        exclude_patterns = ['_final_userpersona.json', '_final_userpersona_analysis.json']
+        exclude_patterns = ['_final_userpersona.json', '_final_userpersona_analysis.json', DEBATE_CACHE_SUFFIX, MANIFEST_SUFFIX, EXTRACTED_SUFFIX]
     
-    # List all files in the folder
-    s3_files = list_s3_files_in_folder(bucket, folder_prefix, s3_client_instance)
+    # List all files in the folder (from the upload manifest when there is one)
+    manifest = load_manifest(s3_client_instance, bucket, folder_prefix)
+    if manifest is not None:
+        s3_files = sorted(manifest['files'].values(), key=lambda f: f['key'])
+    else:
+        s3_files = list_s3_files_in_folder(bucket, folder_prefix, s3_client_instance)
     
     if not s3_files:
         print(f'No files found in s3://{bucket}/{folder_prefix}/')
         return ''
     
-    all_text_content = []
+    files_to_read = []
+    for s3_file in s3_files:
+        filename = os.path.basename(s3_file['key'])
+        
+        # Skip excluded files
+        if any(pattern in filename for pattern in exclude_patterns):
+            print(f'Skipping excluded file: {filename}')
+            continue
+        files_to_read.append(s3_file)
     
-    # Create temporary directory for downloads
-    with tempfile.TemporaryDirectory() as temp_dir:
-        for s3_file in s3_files:
-            key = s3_file['key']
-            filename = os.path.basename(key)
-            
-            # Skip excluded files
-            if any(pattern in filename for pattern in exclude_patterns):
-                print(f'Skipping excluded file: {filename}')
-                continue
-            
-            local_path = Path(temp_dir) / filename
-            
-            try:
-                # Download file
-                s3_client_instance.download_file(bucket, key, str(local_path))
-                
-                # Get content type
-                response = s3_client_instance.head_object(Bucket=bucket, Key=key)
-                content_type = response.get('ContentType', 'application/octet-stream')
-                
-                # Extract text
-                text = extract_text_from_file(local_path, content_type)
-                
-                if text.strip():
-                    all_text_content.append(f'--- Content from {filename} ---\n{text}')
-                    print(f'✓ Extracted {len(text)} characters from {filename}')
-                else:
-                    print(f'⚠️  No text extracted from {filename}')
-                    
-            except Exception as e:
-                print(f'⚠️  Error processing {filename}: {e}')
+    # Fetch and extract concurrently; map() keeps the listing order
+    with ThreadPoolExecutor(max_workers=COMBINE_FETCH_WORKERS) as executor:
+        texts = list(executor.map(
+            lambda s3_file: fetch_and_extract_text(bucket, s3_file['key'], s3_client_instance, s3_file.get('etag')),
+            files_to_read
+        ))
+    
+    all_text_content = [
+        f'--- Content from {os.path.basename(s3_file["key"])} ---\n{text}'
+        for s3_file, text in zip(files_to_read, texts)
+        if text.strip()
+    ]
     
     # Combine all text
     combined_text = '\n\n'.join(all_text_content)
@@ -292,6 +284,223 @@ def combine_files_from_s3_folder(bucket, folder_prefix, s3_client_instance, excl
 
 
 
+def s3_unavailable_response():
+    """Error response when S3 isn't configured, else None"""
+    # Validate AWS credentials
+    if not os.getenv('AWS_ACCESS_KEY_ID') or not os.getenv('AWS_SECRET_ACCESS_KEY'):
+        print('AWS credentials not configured')
+        return jsonify({
+            'success': False,
+            'error': 'AWS credentials not configured. Please check your .env file.'
+        }), 500
+    
+    # Check if S3 client is initialized
+    if not s3_client:
+        print('S3 client not initialized')
+        return jsonify({
+            'success': False,
+            'error': 'S3 client not initialized. Please check your AWS configuration.'
+        }), 500
+    
+    return None
+
+
+def upload_response_body(uploaded_keys, session_id, file_count, message, duplicate_keys=()):
+    """Response of a successful upload
+    
+    duplicate_keys are the existing keys returned for files whose content was already uploaded.
+    """
+    return {
+        'success': True,
+        's3Keys': uploaded_keys,
+        'duplicateKeys': list(duplicate_keys),
+        'message': f'Successfully uploaded {len(uploaded_keys)} item(s) to S3',
+        'sessionId': session_id,
+        'bucket': S3_BUCKET,
+        'folder': S3_FOLDER,
+        'uploadedFiles': file_count,
+        'uploadedText': 1 if message else 0
+    }
+
+
+def start_uploads(message, files, timestamp, session_id, progress_callback=None):
+    """Start uploading the description text and media files concurrently on the shared upload pool
+    
+    Args:
+        message: description text, uploaded as <timestamp>-description.txt if not empty
+        files: uploaded files (werkzeug FileStorage)
+        timestamp: key prefix of this upload
+        session_id: upload session id stored in the object metadata
+        progress_callback: optional function(job, bytes_sent), called from upload threads
+    
+    Files whose content (SHA-256) is already in the folder's manifest, or
+    earlier in the same request, are not uploaded again: their job is marked
+    'duplicate' and carries the existing key.
+    
+    Returns:
+        List of upload jobs (dicts with key, name, size, content_type, original_name,
+        sha256 and future), the description first
+    """
+    jobs = []
+    known_hashes = load_content_hash_index(s3_client, S3_BUCKET, S3_FOLDER) if files else {}
+    started_hashes = {}
+    
+    def start(job, fileobj, metadata):
+        callback = (lambda sent: progress_callback(job, sent)) if progress_callback else None
+        job['future'] = submit_upload(s3_client, S3_BUCKET, job['key'], fileobj, job['content_type'], metadata, callback)
+        jobs.append(job)
+    
+    # Upload text as .txt file
+    if message:
+        text_key = f'{S3_FOLDER}/{timestamp}-description.txt'
+        text_body = message.encode('utf-8')
+        print(f'Uploading text as .txt file: {text_key}')
+        start({
+            'key': text_key,
+            'name': 'text file',
+            'size': len(text_body),
+            'content_type': 'text/plain; charset=utf-8',
+            'original_name': None,
+            'sha256': None
+        }, io.BytesIO(text_body), {
+            'sessionId': session_id,
+            'uploadedAt': datetime.now().isoformat(),
+            'fileCount': str(len(files))
+        })
+    
+    # Upload media files
+    for i, file in enumerate(files):
+        if not file.filename:
+            continue
+        
+        # Keep original filename, just add timestamp prefix to avoid conflicts
+        file_key = f'{S3_FOLDER}/{timestamp}-{sanitize_filename(file.filename)}'
+        
+        # Get file size
+        file.seek(0, os.SEEK_END)
+        file_size = file.tell()
+        file.seek(0)  # Reset file pointer
+        
+        job = {
+            'key': file_key,
+            'name': file.filename,
+            'size': file_size,
+            'content_type': file.content_type or 'application/octet-stream',
+            'original_name': file.filename,
+            'sha256': file_sha256(file.stream)
+        }
+        
+        # Skip the PUT when the same content was already uploaded
+        existing = known_hashes.get(job['sha256'])
+        if existing or job['sha256'] in started_hashes:
+            job['duplicate'] = True
+            if existing:
+                job['key'] = existing['key']
+                job['future'] = Future()
+                job['future'].set_result({'etag': existing.get('etag'), 'size': existing.get('size', file_size)})
+            else:
+                job['key'] = started_hashes[job['sha256']]['key']
+                job['future'] = started_hashes[job['sha256']]['future']
+            print(f'✓ {file.filename} is already uploaded as {job["key"]}, skipping')
+            jobs.append(job)
+            continue
+        
+        started_hashes[job['sha256']] = job
+        print(f'Uploading file {i + 1}/{len(files)}: {file.filename} ({round(file_size / 1024 / 1024, 2)} MB) -> {file_key}')
+        start(job, file.stream, {
+            'originalName': file.filename,
+            'sessionId': session_id,
+            'uploadedAt': datetime.now().isoformat()
+        })
+    
+    return jobs
+
+
+def finish_uploads(jobs):
+    """Wait for the upload jobs of start_uploads()
+    
+    Returns:
+        Tuple (uploaded keys, manifest entries, error of the first failed job or None)
+    """
+    uploaded_keys = []
+    manifest_entries = []
+    first_error = None
+    
+    for job in jobs:
+        try:
+            result = job['future'].result()
+        except ClientError as upload_error:
+            error_code = upload_error.response.get('Error', {}).get('Code', 'Unknown')
+            error_message = upload_error.response.get('Error', {}).get('Message', str(upload_error))
+            print(f'✗ Failed to upload {job["name"]}: {upload_error}')
+            print(f'Error details: Code={error_code}, Message={error_message}')
+            first_error = first_error or Exception(f'Failed to upload {job["name"]}: {error_message or error_code}')
+            continue
+        except Exception as upload_error:
+            print(f'✗ Failed to upload {job["name"]}: {upload_error}')
+            first_error = first_error or upload_error
+            continue
+        
+        uploaded_keys.append(job['key'])
+        if job.get('duplicate'):
+            continue
+        manifest_entries.append(manifest_entry(
+            key=job['key'],
+            size=result['size'],
+            etag=result['etag'],
+            content_type=job['content_type'],
+            original_name=job['original_name'],
+            sha256=job['sha256']
+        ))
+        print(f'✓ Successfully uploaded: {job["key"]}')
+    
+    return uploaded_keys, manifest_entries, first_error
+
+
+def upload_error_response(error):
+    """JSON error response for a failed upload"""
+    if isinstance(error, ClientError):
+        error_code = error.response.get('Error', {}).get('Code', 'Unknown')
+        error_message = error.response.get('Error', {}).get('Message', str(error))
+        
+        print(f'✗ Upload error: {error}')
+        print(f'Error Code: {error_code}, Message: {error_message}')
+        
+        # Provide more helpful error messages
+        if error_code == 'AccessDenied':
+            error_message = 'Access denied. Please check your AWS IAM permissions for S3.'
+        elif error_code == 'NoSuchBucket':
+            error_message = f'S3 bucket "{S3_BUCKET}" does not exist or is not accessible.'
+        elif error_code == 'InvalidAccessKeyId':
+            error_message = 'Invalid AWS Access Key ID. Please check your .env file.'
+        elif error_code == 'SignatureDoesNotMatch':
+            error_message = 'Invalid AWS Secret Access Key. Please check your .env file.'
+        elif 'credentials' in str(error).lower():
+            error_message = 'AWS credentials are invalid or expired. Please check your .env file.'
+        
+        return jsonify({
+            'success': False,
+            'error': error_message,
+            'errorCode': error_code
+        }), 500
+    
+    if isinstance(error, NoCredentialsError):
+        return jsonify({
+            'success': False,
+            'error': 'AWS credentials not configured. Please check your .env file.'
+        }), 500
+    
+    print(f'✗ Upload error: {error}')
+    
+    error_message = str(error) if str(error) else 'Failed to upload files to S3'
+    
+    return jsonify({
+        'success': False,
+        'error': error_message,
+        'details': str(error) if os.getenv('FLASK_ENV') == 'development' else None
+    }), 500
+
+
 @app.route('/api/upload', methods=['POST'])
 def upload_files():
     """Handle file uploads to S3"""
@@ -311,155 +520,639 @@ def upload_files():
                 'error': 'Please provide either a message or at least one file.'
             }), 400
         
-        # Validate AWS credentials
-        if not os.getenv('AWS_ACCESS_KEY_ID') or not os.getenv('AWS_SECRET_ACCESS_KEY'):
-            print('AWS credentials not configured')
-            return jsonify({
-                'success': False,
-                'error': 'AWS credentials not configured. Please check your .env file.'
-            }), 500
+        error_response = s3_unavailable_response()
+        if error_response:
+            return error_response
         
-        # Check if S3 client is initialized
-        if not s3_client:
-            print('S3 client not initialized')
+        timestamp = datetime.now().isoformat().replace(':', '-').replace('.', '-')
+        session_id = str(uuid.uuid4())
+        
+        print(f'Uploading to S3: s3://{S3_BUCKET}/{S3_FOLDER}/')
+        
+        # Upload the text and all media files concurrently
+        jobs = start_uploads(message, files, timestamp, session_id)
+        uploaded_keys, manifest_entries, upload_error = finish_uploads(jobs)
+        
+        # Keep the folder's manifest in sync so submit doesn't have to list the folder
+        # (including the files that made it when another one failed)
+        if manifest_entries:
+            record_uploads(s3_client, S3_BUCKET, S3_FOLDER, manifest_entries, description_text=message or None)
+        if upload_error:
+            raise upload_error
+        
+        print(f'✓ Upload complete! Total items uploaded: {len(uploaded_keys)}')
+        print(f'  - Text file: {1 if message else 0}')
+        print(f'  - Media files: {len(files)}')
+        print(f'  - S3 Location: s3://{S3_BUCKET}/{S3_FOLDER}/')
+        
+        duplicate_keys = [job['key'] for job in jobs if job.get('duplicate')]
+        return jsonify(upload_response_body(uploaded_keys, session_id, len(files), message, duplicate_keys))
+        
+    except Exception as error:
+        return upload_error_response(error)
+
+
+@app.route('/api/upload-progress', methods=['POST'])
+def upload_files_progress():
+    """Upload files and text to S3 like /api/upload, reporting progress with Server-Sent Events
+    
+    Events (same framing as the debate stream):
+        upload_started - the files being uploaded (key, name, totalBytes)
+        progress - bytes sent so far for one file, as its parts finish
+        file_complete / file_error - one file is done
+        complete - the /api/upload response; error - the upload failed
+    """
+    message = request.form.get('message', '').strip()
+    files = request.files.getlist('files')
+    
+    print(f'Received upload request with progress: {len(files)} file(s), message: {"yes" if message else "no"}')
+    
+    # Validate input
+    if not message and len(files) == 0:
+        return jsonify({
+            'success': False,
+            'error': 'Please provide either a message or at least one file.'
+        }), 400
+    
+    error_response = s3_unavailable_response()
+    if error_response:
+        return error_response
+    
+    def sse(event_type, data):
+        return f"data: {json.dumps({'type': event_type, 'data': data})}\n\n"
+    
+    def generate():
+        timestamp = datetime.now().isoformat().replace(':', '-').replace('.', '-')
+        session_id = str(uuid.uuid4())
+        event_queue = queue.Queue()
+        
+        try:
+            jobs = start_uploads(message, files, timestamp, session_id, lambda job, sent: event_queue.put((job, sent)))
+            for job in jobs:
+                job['sent'] = 0
+                job['future'].add_done_callback(lambda future, job=job: event_queue.put((job, None)))
+            
+            yield sse('upload_started', {
+                'sessionId': session_id,
+                'files': [{'key': job['key'], 'name': job['name'], 'totalBytes': job['size']} for job in jobs]
+            })
+            
+            remaining = len(jobs)
+            while remaining:
+                job, sent = event_queue.get()
+                if sent is not None:
+                    job['sent'] += sent
+                    yield sse('progress', {'key': job['key'], 'name': job['name'], 'bytesSent': job['sent'], 'totalBytes': job['size']})
+                    continue
+                
+                remaining -= 1
+                error = job['future'].exception()
+                if error:
+                    yield sse('file_error', {'key': job['key'], 'name': job['name'], 'message': str(error)})
+                else:
+                    yield sse('file_complete', {'key': job['key'], 'name': job['name'], 'totalBytes': job['size'], 'duplicate': bool(job.get('duplicate'))})
+            
+            uploaded_keys, manifest_entries, upload_error = finish_uploads(jobs)
+            if manifest_entries:
+                record_uploads(s3_client, S3_BUCKET, S3_FOLDER, manifest_entries, description_text=message or None)
+            if upload_error:
+                yield f"data: {json.dumps({'type': 'error', 'message': str(upload_error)})}\n\n"
+                return
+            
+            print(f'✓ Upload complete! Total items uploaded: {len(uploaded_keys)}')
+            duplicate_keys = [job['key'] for job in jobs if job.get('duplicate')]
+            yield sse('complete', upload_response_body(uploaded_keys, session_id, len(files), message, duplicate_keys))
+        
+        except Exception as error:
+            print(f'✗ Upload error: {error}')
+            yield f"data: {json.dumps({'type': 'error', 'message': str(error)})}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
+
+@app.route('/api/upload-stream', methods=['POST'])
+def upload_files_stream():
+    """Handle file uploads to S3 without buffering them
+    
+    Same form fields and response as /api/upload, but the multipart request
+    body is parsed as it arrives and each file is sent to an S3 multipart
+    upload part by part (see s3_uploads.py), so memory use doesn't grow with
+    the file size.
+    """
+    upload = None
+    try:
+        boundary = request.mimetype_params.get('boundary')
+        if request.mimetype != 'multipart/form-data' or not boundary:
             return jsonify({
                 'success': False,
-                'error': 'S3 client not initialized. Please check your AWS configuration.'
-            }), 500
+                'error': 'Expected a multipart/form-data request.'
+            }), 400
+        
+        error_response = s3_unavailable_response()
+        if error_response:
+            return error_response
         
         uploaded_keys = []
+        manifest_entries = []
         timestamp = datetime.now().isoformat().replace(':', '-').replace('.', '-')
         session_id = str(uuid.uuid4())
+        message_parts = []
+        file_count = 0
+        duplicate_keys = []
+        known_hashes = load_content_hash_index(s3_client, S3_BUCKET, S3_FOLDER)
+        
+        print(f'Streaming upload to S3: s3://{S3_BUCKET}/{S3_FOLDER}/')
+        
+        decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=STREAM_UPLOAD_MAX_FIELD_BYTES)
+        part = None
+        while True:
+            chunk = request.stream.read(STREAM_UPLOAD_READ_BYTES)
+            decoder.receive_data(chunk or None)
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, (Field, File)):
+                    part = event
+                    if isinstance(event, File) and event.name == 'files' and event.filename:
+                        # Keep original filename, just add timestamp prefix to avoid conflicts
+                        file_key = f'{S3_FOLDER}/{timestamp}-{sanitize_filename(event.filename)}'
+                        print(f'Streaming file {file_count + 1}: {event.filename} -> {file_key}')
+                        upload = S3StreamingUpload(
+                            s3_client,
+                            S3_BUCKET,
+                            file_key,
+                            content_type=event.headers.get('Content-Type') or 'application/octet-stream',
+                            metadata={
+                                'originalName': event.filename,
+                                'sessionId': session_id,
+                                'uploadedAt': datetime.now().isoformat()
+                            }
+                        )
+                elif isinstance(event, Data):
+                    if upload is not None:
+                        upload.write(event.data)
+                    elif isinstance(part, Field) and part.name == 'message':
+                        message_parts.append(event.data)
+                    
+                    if not event.more_data and upload is not None:
+                        file_count += 1
+                        digest = upload.sha256.hexdigest()
+                        existing = known_hashes.get(digest)
+                        if existing:
+                            # Same content already stored: drop the parts sent so far
+                            upload.abort()
+                            uploaded_keys.append(existing['key'])
+                            duplicate_keys.append(existing['key'])
+                            print(f'✓ {upload.metadata["originalName"]} is already uploaded as {existing["key"]}, skipping')
+                        else:
+                            result = upload.complete()
+                            entry = manifest_entry(
+                                key=upload.key,
+                                size=result['size'],
+                                etag=result['etag'],
+                                content_type=upload.content_type,
+                                original_name=upload.metadata['originalName'],
+                                sha256=digest
+                            )
+                            uploaded_keys.append(upload.key)
+                            manifest_entries.append(entry)
+                            known_hashes[digest] = entry
+                            print(f'✓ Successfully uploaded: {upload.key} ({round(result["size"] / 1024 / 1024, 2)} MB)')
+                        upload = None
+                event = decoder.next_event()
+            
+            if not chunk or isinstance(event, Epilogue):
+                break
         
-        print(f'Uploading to S3: s3://{S3_BUCKET}/{S3_FOLDER}/')
+        if upload is not None:
+            raise Exception(f'Upload of {upload.metadata["originalName"]} ended before the end of the file')
         
-        # Upload text as .txt file
+        message = b''.join(message_parts).decode('utf-8', errors='replace').strip()
+        if not message and file_count == 0:
+            return jsonify({
+                'success': False,
+                'error': 'Please provide either a message or at least one file.'
+            }), 400
+        
+        # Upload text as .txt file (after the files, whose count is only known at the end)
         if message:
             text_key = f'{S3_FOLDER}/{timestamp}-description.txt'
+            text_body = message.encode('utf-8')
+            put_response = s3_client.put_object(
+                Bucket=S3_BUCKET,
+                Key=text_key,
+                Body=text_body,
+                ContentType='text/plain; charset=utf-8',
+                Metadata={
+                    'sessionId': session_id,
+                    'uploadedAt': datetime.now().isoformat(),
+                    'fileCount': str(file_count)
+                }
+            )
+            uploaded_keys.insert(0, text_key)
+            manifest_entries.append(manifest_entry(
+                key=text_key,
+                size=len(text_body),
+                etag=put_response.get('ETag'),
+                content_type='text/plain; charset=utf-8'
+            ))
+            print(f'✓ Successfully uploaded text file: {text_key}')
+        
+        # Keep the folder's manifest in sync so submit doesn't have to list the folder
+        if manifest_entries:
+            record_uploads(s3_client, S3_BUCKET, S3_FOLDER, manifest_entries, description_text=message or None)
+        
+        print(f'✓ Streaming upload complete! Total items uploaded: {len(uploaded_keys)}')
+        
+        return jsonify(upload_response_body(uploaded_keys, session_id, file_count, message, duplicate_keys))
+    
+    except Exception as error:
+        # Don't leave the parts of an unfinished file behind
+        if upload is not None:
+            upload.abort()
+        return upload_error_response(error)
+
+
+@app.route('/api/upload/presign', methods=['POST'])
+def presign_uploads():
+    """Issue presigned POST forms so the browser uploads files straight to S3
+    
+    Request JSON: {"files": [{"name": ..., "contentType": ..., "size": ..., "sha256": ...}]}
+    
+    Each form is scoped to one key <S3_FOLDER>/<timestamp>-<name>, its content
+    type and PRESIGN_MAX_BYTES. Once the files are uploaded, the client calls
+    /api/upload/complete with the keys and the sessionId.
+    
+    When the client sends the file's SHA-256 and that content is already in
+    the folder, no form is issued: the upload is returned with the existing
+    key and "duplicate": true, and doesn't need to be sent to complete.
+    Otherwise the form requires that SHA-256 as the object's S3 checksum, so
+    S3 rejects content that doesn't match it.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        requested_files = data.get('files') or []
+        
+        if not isinstance(requested_files, list) or not requested_files:
+            return jsonify({
+                'success': False,
+                'error': 'Please provide at least one file.'
+            }), 400
+        
+        error_response = s3_unavailable_response()
+        if error_response:
+            return error_response
+        
+        timestamp = datetime.now().isoformat().replace(':', '-').replace('.', '-')
+        session_id = str(uuid.uuid4())
+        uploads = []
+        known_hashes = load_content_hash_index(s3_client, S3_BUCKET, S3_FOLDER)
+        
+        for requested in requested_files:
+            name = str(requested.get('name') or '').strip()
+            if not name:
+                return jsonify({
+                    'success': False,
+                    'error': 'Every file needs a name.'
+                }), 400
             
-            print(f'Uploading text as .txt file: {text_key}')
-            
-            try:
-                s3_client.put_object(
-                    Bucket=S3_BUCKET,
-                    Key=text_key,
-                    Body=message.encode('utf-8'),
-                    ContentType='text/plain; charset=utf-8',
-                    Metadata={
-                        'sessionId': session_id,
-                        'uploadedAt': datetime.now().isoformat(),
-                        'fileCount': str(len(files))
-                    }
-                )
-                
-                uploaded_keys.append(text_key)
-                print(f'✓ Successfully uploaded text file: {text_key}')
-            except ClientError as text_error:
-                error_code = text_error.response.get('Error', {}).get('Code', 'Unknown')
-                error_message = text_error.response.get('Error', {}).get('Message', str(text_error))
-                print(f'✗ Failed to upload text file: {text_error}')
-                print(f'Error details: Code={error_code}, Message={error_message}')
-                raise Exception(f'Failed to upload text file: {error_message or error_code}')
-        
-        # Upload media files
-        for i, file in enumerate(files):
-            if not file.filename:
-                continue
-                
-            # Keep original filename, just add timestamp prefix to avoid conflicts
-            sanitized_original_name = sanitize_filename(file.filename)
-            file_key = f'{S3_FOLDER}/{timestamp}-{sanitized_original_name}'
+            size = requested.get('size')
+            if isinstance(size, int) and size > PRESIGN_MAX_BYTES:
+                return jsonify({
+                    'success': False,
+                    'error': f'{name} is larger than the {PRESIGN_MAX_BYTES} byte upload limit.'
+                }), 400
             
-            # Get file size in MB
-            file.seek(0, os.SEEK_END)
-            file_size = file.tell()
-            file.seek(0)  # Reset file pointer
-            file_size_mb = round(file_size / 1024 / 1024, 2)
+            digest = str(requested.get('sha256') or '').lower()
+            if not re.fullmatch(r'[0-9a-f]{64}', digest):
+                digest = None
+            elif digest in known_hashes:
+                uploads.append({
+                    'name': name,
+                    'key': known_hashes[digest]['key'],
+                    'duplicate': True
+                })
+                continue
             
-            print(f'Uploading file {i + 1}/{len(files)}: {file.filename} ({file_size_mb} MB) -> {file_key}')
+            file_key = f'{S3_FOLDER}/{timestamp}-{sanitize_filename(name)}'
+            content_type = requested.get('contentType') or 'application/octet-stream'
+            original_name = name.encode('ascii', errors='replace').decode('ascii')
+            fields = {
+                'Content-Type': content_type,
+                'x-amz-meta-originalname': original_name,
+                'x-amz-meta-sessionid': session_id,
+            }
+            conditions = [
+                {'Content-Type': content_type},
+                {'x-amz-meta-originalname': original_name},
+                {'x-amz-meta-sessionid': session_id},
+                ['content-length-range', 1, PRESIGN_MAX_BYTES],
+            ]
+            if digest:
+                # S3 checks the content against the declared hash; only then
+                # does /api/upload/complete index it for deduplication
+                checksum = sha256_checksum(digest)
+                fields['x-amz-checksum-algorithm'] = 'SHA256'
+                fields['x-amz-checksum-sha256'] = checksum
+                conditions.append({'x-amz-checksum-algorithm': 'SHA256'})
+                conditions.append({'x-amz-checksum-sha256': checksum})
             
-            try:
-                # Determine content type
-                content_type = file.content_type or 'application/octet-stream'
-                
-                s3_client.put_object(
-                    Bucket=S3_BUCKET,
-                    Key=file_key,
-                    Body=file.read(),
-                    ContentType=content_type,
-                    Metadata={
-                        'originalName': file.filename,
-                        'sessionId': session_id,
-                        'uploadedAt': datetime.now().isoformat()
-                    }
-                )
-                
-                uploaded_keys.append(file_key)
-                print(f'✓ Successfully uploaded: {file_key}')
-            except ClientError as file_error:
-                error_code = file_error.response.get('Error', {}).get('Code', 'Unknown')
-                error_message = file_error.response.get('Error', {}).get('Message', str(file_error))
-                print(f'✗ Failed to upload {file.filename}: {file_error}')
-                print(f'Error details: Code={error_code}, Message={error_message}')
-                raise Exception(f'Failed to upload {file.filename}: {error_message or error_code}')
+            presigned = s3_client.generate_presigned_post(
+                Bucket=S3_BUCKET,
+                Key=file_key,
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=PRESIGN_EXPIRES
+            )
+            uploads.append({
+                'name': name,
+                'key': file_key,
+                'url': presigned['url'],
+                'fields': presigned['fields'],
+                'duplicate': False
+            })
         
-        print(f'✓ Upload complete! Total items uploaded: {len(uploaded_keys)}')
-        print(f'  - Text file: {1 if message else 0}')
-        print(f'  - Media files: {len(files)}')
-        print(f'  - S3 Location: s3://{S3_BUCKET}/{S3_FOLDER}/')
+        print(f'✓ Presigned {len(uploads)} upload(s) to s3://{S3_BUCKET}/{S3_FOLDER}/ (session {session_id})')
         
         return jsonify({
             'success': True,
-            's3Keys': uploaded_keys,
-            'message': f'Successfully uploaded {len(uploaded_keys)} item(s) to S3',
             'sessionId': session_id,
+            'uploads': uploads,
+            'expiresIn': PRESIGN_EXPIRES,
             'bucket': S3_BUCKET,
-            'folder': S3_FOLDER,
-            'uploadedFiles': len(files),
-            'uploadedText': 1 if message else 0
+            'folder': S3_FOLDER
         })
+    
+    except Exception as error:
+        return upload_error_response(error)
+
+
+@app.route('/api/upload/complete', methods=['POST'])
+def complete_uploads():
+    """Record files uploaded with /api/upload/presign (and the optional description text)
+    
+    Request JSON: {"sessionId": ..., "keys": [...], "message": "..."}
+    
+    Each key is checked with HeadObject: it must exist and carry the session id
+    set by its presigned form. Only a SHA-256 that S3 verified (the object's
+    ChecksumSHA256) is added to the content hash index. Responds like /api/upload.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        session_id = data.get('sessionId') or ''
+        keys = data.get('keys') or []
+        message = (data.get('message') or '').strip()
         
-    except ClientError as error:
-        error_code = error.response.get('Error', {}).get('Code', 'Unknown')
-        error_message = error.response.get('Error', {}).get('Message', str(error))
+        if not isinstance(keys, list) or (not keys and not message):
+            return jsonify({
+                'success': False,
+                'error': 'Please provide either a message or at least one uploaded file.'
+            }), 400
         
-        print(f'✗ Upload error: {error}')
-        print(f'Error Code: {error_code}, Message: {error_message}')
+        invalid_keys = [
+            key for key in keys
+            if not isinstance(key, str)
+            or not key.startswith(f'{S3_FOLDER}/')
+            or not UPLOAD_KEY_NAME_PATTERN.match(key[len(S3_FOLDER) + 1:])
+        ]
+        if invalid_keys or (keys and not session_id):
+            return jsonify({
+                'success': False,
+                'error': 'Unknown upload keys or missing sessionId.',
+                'invalidKeys': invalid_keys
+            }), 400
         
-        # Provide more helpful error messages
-        if error_code == 'AccessDenied':
-            error_message = 'Access denied. Please check your AWS IAM permissions for S3.'
-        elif error_code == 'NoSuchBucket':
-            error_message = f'S3 bucket "{S3_BUCKET}" does not exist or is not accessible.'
-        elif error_code == 'InvalidAccessKeyId':
-            error_message = 'Invalid AWS Access Key ID. Please check your .env file.'
-        elif error_code == 'SignatureDoesNotMatch':
-            error_message = 'Invalid AWS Secret Access Key. Please check your .env file.'
-        elif 'credentials' in str(error).lower():
-            error_message = 'AWS credentials are invalid or expired. Please check your .env file.'
+        error_response = s3_unavailable_response()
+        if error_response:
+            return error_response
         
-        return jsonify({
-            'success': False,
-            'error': error_message,
-            'errorCode': error_code
-        }), 500
+        def head(key):
+            try:
+                return s3_client.head_object(Bucket=S3_BUCKET, Key=key, ChecksumMode='ENABLED')
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                    return None
+                raise
         
-    except NoCredentialsError:
-        return jsonify({
-            'success': False,
-            'error': 'AWS credentials not configured. Please check your .env file.'
-        }), 500
+        heads = []
+        if keys:
+            with ThreadPoolExecutor(max_workers=min(len(keys), COMBINE_FETCH_WORKERS)) as executor:
+                heads = list(executor.map(head, keys))
         
-    except Exception as error:
-        print(f'✗ Upload error: {error}')
+        missing_keys = [key for key, response in zip(keys, heads) if response is None or response.get('Metadata', {}).get('sessionid') != session_id]
+        if missing_keys:
+            return jsonify({
+                'success': False,
+                'error': 'Some files were not uploaded (or belong to another upload session).',
+                'missingKeys': missing_keys
+            }), 400
         
-        error_message = str(error) if str(error) else 'Failed to upload files to S3'
+        uploaded_keys = []
+        manifest_entries = []
         
-        return jsonify({
-            'success': False,
-            'error': error_message,
-            'details': str(error) if os.getenv('FLASK_ENV') == 'development' else None
-        }), 500
+        # Upload text as .txt file
+        if message:
+            timestamp = datetime.now().isoformat().replace(':', '-').replace('.', '-')
+            text_key = f'{S3_FOLDER}/{timestamp}-description.txt'
+            text_body = message.encode('utf-8')
+            put_response = s3_client.put_object(
+                Bucket=S3_BUCKET,
+                Key=text_key,
+                Body=text_body,
+                ContentType='text/plain; charset=utf-8',
+                Metadata={
+                    'sessionId': session_id,
+                    'uploadedAt': datetime.now().isoformat(),
+                    'fileCount': str(len(keys))
+                }
+            )
+            uploaded_keys.append(text_key)
+            manifest_entries.append(manifest_entry(
+                key=text_key,
+                size=len(text_body),
+                etag=put_response.get('ETag'),
+                content_type='text/plain; charset=utf-8'
+            ))
+            print(f'✓ Successfully uploaded text file: {text_key}')
+        
+        for key, response in zip(keys, heads):
+            uploaded_keys.append(key)
+            manifest_entries.append(manifest_entry(
+                key=key,
+                size=response.get('ContentLength', 0),
+                etag=response.get('ETag'),
+                content_type=response.get('ContentType'),
+                last_modified=response['LastModified'].isoformat() if response.get('LastModified') else None,
+                original_name=response.get('Metadata', {}).get('originalname'),
+                sha256=verified_sha256(response)
+            ))
+        
+        # Keep the folder's manifest in sync so submit doesn't have to list the folder
+        record_uploads(s3_client, S3_BUCKET, S3_FOLDER, manifest_entries, description_text=message or None)
+        
+        print(f'✓ Recorded direct upload: {len(keys)} file(s), text file: {1 if message else 0}')
+        
+        return jsonify(upload_response_body(uploaded_keys, session_id, len(keys), message))
+    
+    except Exception as error:
+        return upload_error_response(error)
+
+
+def load_user_input_summary(s3_folder, s3_client_instance):
+    """
+    Text the user uploaded: the latest description, or else the text of all their files.
+    
+    Args:
+        s3_folder: the user's S3 folder
+        s3_client_instance: S3 client instance
+    
+    Returns:
+        The text, possibly empty
+    """
+    # First, try to get the latest description.txt file
+    print(f'Looking for latest description.txt file in s3://{S3_BUCKET}/{s3_folder}/...')
+    user_input_summary = get_latest_description_file(
+        bucket=S3_BUCKET,
+        folder_prefix=s3_folder,
+        s3_client_instance=s3_client_instance
+    )
+    
+    # If no description.txt found, read all files from the user's S3 folder and combine their text content
+    if not user_input_summary or not user_input_summary.strip():
+        print(f'No description.txt found. Reading all files from s3://{S3_BUCKET}/{s3_folder}/ to create user_input_summary...')
+        user_input_summary = combine_files_from_s3_folder(
+            bucket=S3_BUCKET,
+            folder_prefix=s3_folder,
+            s3_client_instance=s3_client_instance,
+            exclude_patterns=['_final_userpersona.json', '_final_userpersona_analysis.json', DEBATE_CACHE_SUFFIX, MANIFEST_SUFFIX, EXTRACTED_SUFFIX]
+        )
+    
+    return user_input_summary
+
+
+def prepare_persona_submission(data, user_id, user_input_summary):
+    """
+    Build the <user_id>_final_userpersona.json content of a questionnaire submission.
+    
+    Args:
+        data: the request JSON (with a non-empty 'questions' list)
+        user_id: user ID
+        user_input_summary: text from load_user_input_summary()
+    
+    Returns:
+        The persona data dict passed to submit_user_persona
+    """
+    # If still no files found or empty, use the provided summary from request as fallback
+    if not user_input_summary or not user_input_summary.strip():
+        user_input_summary = data.get('user_input_summary', '') or ''
+        if user_input_summary:
+            print(f'No files found in S3 folder, using user_input_summary from request ({len(user_input_summary)} chars)')
+        else:
+            print('⚠️  Warning: user_input_summary is empty - no files in S3 and no summary in request')
+    
+    questions = data.get('questions', [])
+    
+    print(f'📋 Received {len(questions)} questions from request')
+    # Log first few questions to verify they're from request
+    if questions:
+        sample_q = questions[0]
+        print(f'   Sample question from request: id={sample_q.get("id")}, response={sample_q.get("response")}, has_question_text={bool(sample_q.get("question"))}')
+    
+    # If still no user_input_summary, try to create from questions
+    if not user_input_summary or not user_input_summary.strip():
+        if questions:
+            question_texts = [q.get('question', '') for q in questions if q.get('question')]
+            if question_texts:
+                user_input_summary = ' '.join(question_texts[:3])  # Use first 3 questions as fallback
+                print(f'Created fallback summary from questions ({len(user_input_summary)} chars)')
+    
+    # Ensure questions preserve their original question text from request
+    # If question text is missing, fill it from personality_questions dict
+    for q in questions:
+        if not q.get('question') and q.get('id'):
+            qid = q.get('id')
+            question_def = personality_questions.get('questions', {}).get(qid, {})
+            if question_def.get('question'):
+                q['question'] = question_def['question']
+    
+    questions_with_defaults = set_default_question_responses(questions, personality_questions, verbose=True)
+    
+    # Verify we're using request data and log sample responses
+    print(f'✓ Processed {len(questions_with_defaults)} questions (from request, with defaults applied)')
+    
+    # Log first few responses to verify they're from request
+    if questions_with_defaults:
+        print('   Sample responses from processed questions:')
+        for i, q in enumerate(questions_with_defaults[:3], 1):
+            print(f'      {q.get("id")}: response="{q.get("response")}"')
+    
+    questions_with_responses = sum(1 for q in questions_with_defaults if q.get('response') and q.get('response') != '')
+    print(f'✓ Ensured all 5 questions have responses (total: {len(questions_with_defaults)}, with responses: {questions_with_responses})')
+    
+    # Calculate aggregated traits from question-level trait_scores if they exist
+    aggregated_traits = defaultdict(int)
+    has_question_trait_scores = False
+    
+    for question in questions_with_defaults:
+        if 'trait_scores' in question and isinstance(question['trait_scores'], dict):
+            has_question_trait_scores = True
+            for trait, score in question['trait_scores'].items():
+                try:
+                    aggregated_traits[trait] += int(score)
+                except (ValueError, TypeError):
+                    # Skip invalid scores
+                    pass
+    
+    # Convert defaultdict to regular dict and sort by score (descending)
+    aggregated_traits_dict = {}
+    if has_question_trait_scores:
+        aggregated_traits_dict = dict(sorted(aggregated_traits.items(), key=lambda x: x[1], reverse=True))
+        print(f'✓ Calculated aggregated_traits from {len(aggregated_traits_dict)} traits')
+    
+    # Log user_input_summary status
+    summary_length = len(user_input_summary) if user_input_summary else 0
+    print(f'📝 user_input_summary prepared: {summary_length} characters')
+    if summary_length > 0:
+        preview = user_input_summary[:100] + '...' if len(user_input_summary) > 100 else user_input_summary
+        print(f'   Preview: {preview}')
+    else:
+        print('   ⚠️  Warning: user_input_summary is empty')
+    
+    # Prepare the JSON structure (only responses, trait scores calculated separately)
+    output_data = {
+        'user_id': user_id,
+        'timestamp': datetime.now().isoformat(),
+        'user_input_summary': user_input_summary,
+        'predicted_category': data.get('predicted_category', ''),
+        'questions': questions_with_defaults
+    }
+    
+    # Add aggregated_traits if we calculated them
+    if aggregated_traits_dict:
+        output_data['aggregated_traits'] = aggregated_traits_dict
+    
+    return output_data
+
+
+def submit_questions_response_body(user_id, output_data):
+    """JSON body of a successful /api/submit-questions request"""
+    s3_folder = user_id
+    filename = f'{user_id}_final_userpersona.json'
+    
+    # Include predicted_category in response if available
+    response_data = {
+        'success': True,
+        'message': f'Successfully saved questions to S3 and processed personality analysis',
+        's3Key': f'{s3_folder}/{filename}',
+        'bucket': S3_BUCKET,
+        'folder': s3_folder,
+        'filename': filename
+    }
+    
+    # Add predicted_category if available
+    if 'predicted_category' in output_data and output_data['predicted_category']:
+        response_data['predicted_category'] = output_data['predicted_category']
+    
+    return response_data
 
 
 @app.route('/api/submit-questions', methods=['POST'])
@@ -487,245 +1180,45 @@ def submit_questions():
                 'error': 'AWS credentials not configured. Please check your .env file.'
             }), 500
         
-        # Check if S3 client is initialized
-        if not s3_client:
-            print('S3 client not initialized')
-            return jsonify({
-                'success': False,
-                'error': 'S3 client not initialized. Please check your AWS configuration.'
-            }), 500
-        
-        # First, try to get the latest description.txt file
-        print(f'Looking for latest description.txt file in s3://{S3_BUCKET}/{s3_folder}/...')
-        user_input_summary = get_latest_description_file(
-            bucket=S3_BUCKET,
-            folder_prefix=s3_folder,
-            s3_client_instance=s3_client
-        )
-        
-        # If no description.txt found, read all files from the user's S3 folder and combine their text content
-        if not user_input_summary or not user_input_summary.strip():
-            print(f'No description.txt found. Reading all files from s3://{S3_BUCKET}/{s3_folder}/ to create user_input_summary...')
-            user_input_summary = combine_files_from_s3_folder(
-                bucket=S3_BUCKET,
-                folder_prefix=s3_folder,
-                s3_client_instance=s3_client,
-                exclude_patterns=['_final_userpersona.json', '_final_userpersona_analysis.json']
-            )
-        
-        # If still no files found or empty, use the provided summary from request as fallback
-        if not user_input_summary or not user_input_summary.strip():
-            user_input_summary = data.get('user_input_summary', '') or ''
-            if user_input_summary:
-                print(f'No files found in S3 folder, using user_input_summary from request ({len(user_input_summary)} chars)')
-            else:
-                print('⚠️  Warning: user_input_summary is empty - no files in S3 and no summary in request')
-        
-        # Get questions from request data - ensure we're using the actual request data
-        questions = data.get('questions', [])
-        
         # Validate that we have questions from the request
-        if not questions:
+        if not data.get('questions'):
             print('⚠️  Warning: No questions found in request data')
             return jsonify({
                 'success': False,
                 'error': 'Questions data is required in the request.'
             }), 400
         
-        print(f'📋 Received {len(questions)} questions from request')
-        # Log first few questions to verify they're from request
-        if questions:
-            sample_q = questions[0]
-            print(f'   Sample question from request: id={sample_q.get("id")}, response={sample_q.get("response")}, has_question_text={bool(sample_q.get("question"))}')
-        
-        # If still no user_input_summary, try to create from questions
-        if not user_input_summary or not user_input_summary.strip():
-            if questions:
-                question_texts = [q.get('question', '') for q in questions if q.get('question')]
-                if question_texts:
-                    user_input_summary = ' '.join(question_texts[:3])  # Use first 3 questions as fallback
-                    print(f'Created fallback summary from questions ({len(user_input_summary)} chars)')
-        
-        # Ensure questions preserve their original question text from request
-        # If question text is missing, fill it from personality_questions dict
-        for q in questions:
-            if not q.get('question') and q.get('id'):
-                qid = q.get('id')
-                question_def = personality_questions.get('questions', {}).get(qid, {})
-                if question_def.get('question'):
-                    q['question'] = question_def['question']
-        
-        questions_with_defaults = set_default_question_responses(questions, personality_questions, verbose=True)
-        
-        # Verify we're using request data and log sample responses
-        print(f'✓ Processed {len(questions_with_defaults)} questions (from request, with defaults applied)')
-        
-        # Log first few responses to verify they're from request
-        if questions_with_defaults:
-            print('   Sample responses from processed questions:')
-            for i, q in enumerate(questions_with_defaults[:3], 1):
-                print(f'      {q.get("id")}: response="{q.get("response")}"')
-        
-        questions_with_responses = sum(1 for q in questions_with_defaults if q.get('response') and q.get('response') != '')
-        print(f'✓ Ensured all 5 questions have responses (total: {len(questions_with_defaults)}, with responses: {questions_with_responses})')
-        
-        # Calculate aggregated traits from question-level trait_scores if they exist
-        aggregated_traits = defaultdict(int)
-        has_question_trait_scores = False
-        
-        for question in questions_with_defaults:
-            if 'trait_scores' in question and isinstance(question['trait_scores'], dict):
-                has_question_trait_scores = True
-                for trait, score in question['trait_scores'].items():
-                    try:
-                        aggregated_traits[trait] += int(score)
-                    except (ValueError, TypeError):
-                        # Skip invalid scores
-                        pass
-        
-        # Convert defaultdict to regular dict and sort by score (descending)
-        aggregated_traits_dict = {}
-        if has_question_trait_scores:
-            aggregated_traits_dict = dict(sorted(aggregated_traits.items(), key=lambda x: x[1], reverse=True))
-            print(f'✓ Calculated aggregated_traits from {len(aggregated_traits_dict)} traits')
-        
-        # Log user_input_summary status
-        summary_length = len(user_input_summary) if user_input_summary else 0
-        print(f'📝 user_input_summary prepared: {summary_length} characters')
-        if summary_length > 0:
-            preview = user_input_summary[:100] + '...' if len(user_input_summary) > 100 else user_input_summary
-            print(f'   Preview: {preview}')
-        else:
-            print('   ⚠️  Warning: user_input_summary is empty')
-        
-        # Prepare the JSON structure (only responses, trait scores calculated separately)
-        output_data = {
-            'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
-            'user_input_summary': user_input_summary,
-            'predicted_category': data.get('predicted_category', ''),
-            'questions': questions_with_defaults
-        }
-        
-        # Add aggregated_traits if we calculated them
-        if aggregated_traits_dict:
-            output_data['aggregated_traits'] = aggregated_traits_dict
-        
-        # Convert to JSON string
-        json_string = json.dumps(output_data, indent=2, ensure_ascii=False)
-        
-        # Create S3 key - will be stored in s3://user-persona-data/uuid001/
-        filename = f'{user_id}_final_userpersona.json'
-        s3_key = f'{s3_folder}/{filename}'  # e.g., "uuid001/uuid001_final_userpersona.json"
+        # Check if S3 client is initialized
+        if not s3_client:
+            print('S3 client not initialized')
+            return jsonify({
+                'success': False,
+                'error': 'S3 client not initialized. Please check your AWS configuration.'
+            }), 500
         
-        print(f'Uploading questions data to S3: s3://{S3_BUCKET}/{s3_key}')
+        user_input_summary = load_user_input_summary(s3_folder, s3_client)
+        output_data = prepare_persona_submission(data, user_id, user_input_summary)
         
-        # Upload to S3
+        # Score, classify and upload in a single pass: one classifier call,
+        # one PUT for the analysis file and one PUT for the persona file
         try:
-            s3_client.put_object(
-                Bucket=S3_BUCKET,
-                Key=s3_key,
-                Body=json_string.encode('utf-8'),
-                ContentType='application/json; charset=utf-8',
-                Metadata={
-                    'userId': user_id,
-                    'uploadedAt': datetime.now().isoformat(),
-                    'questionCount': str(len(data['questions']))
-                }
+            print(f'Processing responses and generating personality analysis...')
+            final_output = submit_user_persona(
+                persona_data=output_data,
+                s3_client_instance=s3_client,
+                bucket=S3_BUCKET,
+                user_id=user_id,
+                metadata={'questionCount': str(len(data['questions']))},
+                bedrock_client=get_bedrock_client(AWS_REGION),
+                verbose=True
             )
             
-            print(f'✓ Successfully uploaded questions data: {s3_key}')
-            
-            # Now process the responses and generate personality analysis using process_s3_scores
-            try:
-                print(f'Processing responses and generating personality analysis...')
-                
-                # Process the data using the shared function from process_s3_scores
-                # This will calculate scores and upload the analysis file to S3
-                final_output = process_user_persona_data(
-                    uploaded_data=output_data,
-                    s3_client_instance=s3_client,
-                    bucket=S3_BUCKET,
-                    user_id=user_id,
-                    verbose=True
-                )
-                
-                if final_output:
-                    print(f'✓ Successfully processed and uploaded personality analysis')
-                    
-                    # Call LLM classifier to get predicted category
-                    try:
-                        print(f'🔍 Calling LLM classifier to predict category...')
-                        predicted_category = classify_user_persona(
-                            json_data=final_output,
-                            region=AWS_REGION,
-                            verbose=True
-                        )
-                        
-                        # Update predicted_category in final_output
-                        final_output['predicted_category'] = predicted_category
-                        
-                        # Update predicted_category in output_data
-                        output_data['predicted_category'] = predicted_category
-                        
-                        # Print predicted category prominently
-                        print('\n' + '=' * 60)
-                        print(f'🎯 PREDICTED CATEGORY: {predicted_category}')
-                        print('=' * 60 + '\n')
-                        
-                        # Update the initial _final_userpersona.json file with predicted_category
-                        try:
-                            updated_json_string = json.dumps(output_data, indent=2, ensure_ascii=False)
-                            
-                            s3_client.put_object(
-                                Bucket=S3_BUCKET,
-                                Key=s3_key,
-                                Body=updated_json_string.encode('utf-8'),
-                                ContentType='application/json; charset=utf-8',
-                                Metadata={
-                                    'userId': user_id,
-                                    'uploadedAt': datetime.now().isoformat(),
-                                    'questionCount': str(len(data['questions'])),
-                                    'hasCategory': 'true',
-                                    'predictedCategory': predicted_category
-                                }
-                            )
-                            print(f'✓ Updated initial file with predicted category: {predicted_category}')
-                        except Exception as update_error:
-                            print(f'⚠️  Warning: Failed to update initial file with predicted category: {update_error}')
-                            
-                    except Exception as classifier_error:
-                        print(f'⚠️  Warning: Failed to classify user persona: {classifier_error}')
-                        import traceback
-                        traceback.print_exc()
-                        # Use predicted_category from final_output if available
-                        if 'predicted_category' in final_output and final_output['predicted_category']:
-                            output_data['predicted_category'] = final_output['predicted_category']
-                            print(f'Using predicted category from process output: {final_output["predicted_category"]}')
-                else:
-                    print(f'⚠️  Warning: Processing completed but no output was generated')
-                    
-            except Exception as process_error:
-                print(f'⚠️  Warning: Failed to process responses: {process_error}')
-                # Don't fail the request if processing fails, just log it
-                import traceback
-                traceback.print_exc()
-            
-            # Include predicted_category in response if available
-            response_data = {
-                'success': True,
-                'message': f'Successfully saved questions to S3 and processed personality analysis',
-                's3Key': s3_key,
-                'bucket': S3_BUCKET,
-                'folder': s3_folder,
-                'filename': filename
-            }
-            
-            # Add predicted_category if available
-            if 'predicted_category' in output_data and output_data['predicted_category']:
-                response_data['predicted_category'] = output_data['predicted_category']
+            if final_output:
+                print(f'✓ Successfully processed and uploaded personality analysis')
+            else:
+                print(f'⚠️  Warning: Processing completed but no output was generated')
             
-            return jsonify(response_data)
+            return jsonify(submit_questions_response_body(user_id, output_data))
             
         except ClientError as upload_error:
             error_code = upload_error.response.get('Error', {}).get('Code', 'Unknown')
@@ -826,16 +1319,31 @@ def find_best_role(user_id):
         try:
             # Get the user persona data from S3
             response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
-            user_persona = json.loads(response['Body'].read().decode('utf-8'))
+            analysis_body = response['Body'].read()
+            user_persona = json.loads(analysis_body.decode('utf-8'))
             
-            print(f"Running debate agents for user {user_id} with category: {predicted_category}")
+            # Reuse the stored recommendation if the analysis hasn't changed
+            cache_key = debate_cache_key(analysis_body, predicted_category, GEMINI_MODEL)
+            analysis_etag = response.get('ETag')
+            cached = load_cached_debate(s3_client, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag)
             
-            # Run the debate with the user persona and predicted category
-            debate_results = run_debate(
-                user_persona=user_persona,
-                predicted_category=predicted_category,
-                verbose=True
-            )
+            if cached:
+                debate_results = cached['results']
+            else:
+                print(f"Running debate agents for user {user_id} with category: {predicted_category}")
+                
+                # Collect events too, so the streaming endpoint can replay a cached debate
+                debate_events = []
+                
+                # Run the debate with the user persona and predicted category
+                debate_results = run_debate(
+                    user_persona=user_persona,
+                    predicted_category=predicted_category,
+                    verbose=True,
+                    stream_callback=lambda event_type, data: debate_events.append({'type': event_type, 'data': data})
+                )
+                
+                store_cached_debate(s3_client, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag, debate_results, debate_events)
             
             if 'error' in debate_results:
                 return jsonify({
@@ -845,13 +1353,7 @@ def find_best_role(user_id):
             
             return jsonify({
                 'success': True,
-                'recommended_role': debate_results.get('recommended_role', ''),
-                'confidence': debate_results.get('confidence', 0),
-                'reason': debate_results.get('reason', ''),
-                'pros': debate_results.get('pros', []),
-                'considerations': debate_results.get('considerations', []),
-                'debated_roles': debate_results.get('debated_roles', []),
-                'predicted_category': debate_results.get('predicted_category', predicted_category)
+                **recommendation_data(debate_results, predicted_category)
             })
             
         except ClientError as e:
@@ -886,6 +1388,31 @@ def find_best_role(user_id):
         }), 500
 
 
+def recommendation_data(debate_results, predicted_category):
+    """The recommendation fields of a finished debate, as returned to the client"""
+    return {
+        'recommended_role': debate_results.get('recommended_role', ''),
+        'confidence': debate_results.get('confidence', 0),
+        'reason': debate_results.get('reason', ''),
+        'pros': debate_results.get('pros', []),
+        'considerations': debate_results.get('considerations', []),
+        'debated_roles': debate_results.get('debated_roles', []),
+        'predicted_category': debate_results.get('predicted_category', predicted_category)
+    }
+
+
+def final_result_event(debate_results, predicted_category):
+    """Format the final SSE event for a finished debate"""
+    if 'error' in debate_results:
+        return f"data: {json.dumps({'type': 'error', 'message': debate_results['error']})}\n\n"
+    
+    final_data = {
+        'type': 'final_result',
+        'data': recommendation_data(debate_results, predicted_category)
+    }
+    return f"data: {json.dumps(final_data)}\n\n"
+
+
 @app.route('/api/find-best-role-stream/<user_id>', methods=['POST'])
 def find_best_role_stream(user_id):
     """Run debate agents with live streaming output using Server-Sent Events"""
@@ -905,11 +1432,23 @@ def find_best_role_stream(user_id):
             try:
                 # Get the user persona data from S3
                 response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
-                user_persona = json.loads(response['Body'].read().decode('utf-8'))
+                analysis_body = response['Body'].read()
+                user_persona = json.loads(analysis_body.decode('utf-8'))
+                
+                # Replay the stored debate right away if the analysis hasn't changed
+                cache_key = debate_cache_key(analysis_body, predicted_category, GEMINI_MODEL)
+                analysis_etag = response.get('ETag')
+                cached = load_cached_debate(s3_client, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag)
+                if cached:
+                    for event in cached.get('events', []):
+                        yield f"data: {json.dumps(event)}\n\n"
+                    yield final_result_event(cached['results'], predicted_category)
+                    return
                 
                 # Queue to collect events and results
                 event_queue = queue.Queue()
                 result_queue = queue.Queue()
+                debate_events = []
                 
                 # Stream callback function that puts events in queue
                 def stream_callback(event_type, data):
@@ -918,6 +1457,7 @@ def find_best_role_stream(user_id):
                         'type': event_type,
                         'data': data
                     }
+                    debate_events.append(event_data)
                     event_queue.put(event_data)
                 
                 # Run debate in a separate thread
@@ -960,24 +1500,10 @@ def find_best_role_stream(user_id):
                 # Get final results
                 try:
                     debate_results = result_queue.get(timeout=5)
+                    store_cached_debate(s3_client, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag, debate_results, debate_events)
                     
                     # Send final result
-                    if 'error' in debate_results:
-                        yield f"data: {json.dumps({'type': 'error', 'message': debate_results['error']})}\n\n"
-                    else:
-                        final_data = {
-                            'type': 'final_result',
-                            'data': {
-                                'recommended_role': debate_results.get('recommended_role', ''),
-                                'confidence': debate_results.get('confidence', 0),
-                                'reason': debate_results.get('reason', ''),
-                                'pros': debate_results.get('pros', []),
-                                'considerations': debate_results.get('considerations', []),
-                                'debated_roles': debate_results.get('debated_roles', []),
-                                'predicted_category': debate_results.get('predicted_category', predicted_category)
-                            }
-                        }
-                        yield f"data: {json.dumps(final_data)}\n\n"
+                    yield final_result_event(debate_results, predicted_category)
                 except queue.Empty:
                     yield f"data: {json.dumps({'type': 'error', 'message': 'Timeout waiting for debate results'})}\n\n"
                 
@@ -1002,8 +1528,90 @@ def find_best_role_stream(user_id):
     return Response(stream_with_context(generate()), mimetype='text/event-stream')
 
 
-# Store conversation histories per session (in production, use Redis or database)
-conversation_sessions = {}
+# Event loop shared by every async debate (started on first use)
+debate_loop = None
+debate_loop_lock = threading.Lock()
+
+
+def get_debate_loop():
+    """Get the background event loop that runs async debates"""
+    global debate_loop
+    with debate_loop_lock:
+        if debate_loop is None:
+            debate_loop = asyncio.new_event_loop()
+            threading.Thread(target=debate_loop.run_forever, name='debate-loop', daemon=True).start()
+        return debate_loop
+
+
+@app.route('/api/find-best-role-async-stream/<user_id>', methods=['POST'])
+def find_best_role_async_stream(user_id):
+    """Run the async debate engine with live streaming output using Server-Sent Events
+    
+    Same events as /api/find-best-role-stream, but every debate runs as coroutines
+    on one shared event loop instead of its own thread, and events are read
+    straight from the debate's async generator instead of polling a queue.
+    """
+    def generate():
+        try:
+            data = request.get_json() or {}
+            predicted_category = data.get('predicted_category', '')
+            
+            if not predicted_category:
+                yield f"data: {json.dumps({'type': 'error', 'message': 'predicted_category is required'})}\n\n"
+                return
+            
+            s3_key = f"{S3_FOLDER}/{user_id}_final_userpersona_analysis.json"
+            
+            try:
+                response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key)
+                analysis_body = response['Body'].read()
+                user_persona = json.loads(analysis_body.decode('utf-8'))
+            except ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+                if error_code == 'NoSuchKey':
+                    yield f"data: {json.dumps({'type': 'error', 'message': 'User analysis not found. Please complete the questions first.'})}\n\n"
+                else:
+                    yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                return
+            
+            # Replay the stored debate right away if the analysis hasn't changed
+            cache_key = debate_cache_key(analysis_body, predicted_category, GEMINI_MODEL)
+            analysis_etag = response.get('ETag')
+            cached = load_cached_debate(s3_client, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag)
+            if cached:
+                for event in cached.get('events', []):
+                    yield f"data: {json.dumps(event)}\n\n"
+                yield final_result_event(cached['results'], predicted_category)
+                return
+            
+            loop = get_debate_loop()
+            events = stream_debate(user_persona=user_persona, predicted_category=predicted_category)
+            debate_events = []
+            try:
+                while True:
+                    try:
+                        event = asyncio.run_coroutine_threadsafe(events.__anext__(), loop).result()
+                    except StopAsyncIteration:
+                        break
+                    
+                    if event['type'] == 'result':
+                        store_cached_debate(s3_client, S3_BUCKET, S3_FOLDER, user_id, cache_key, analysis_etag, event['data'], debate_events)
+                        yield final_result_event(event['data'], predicted_category)
+                    else:
+                        debate_events.append(event)
+                        yield f"data: {json.dumps(event)}\n\n"
+            finally:
+                # Cancels the debate if the client disconnected early
+                asyncio.run_coroutine_threadsafe(events.aclose(), loop)
+                
+        except Exception as error:
+            print(f'Error in find_best_role_async_stream: {error}')
+            import traceback
+            traceback.print_exc()
+            yield f"data: {json.dumps({'type': 'error', 'message': str(error)})}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
 
 @app.route('/api/chat-with-mentor', methods=['POST'])
 def chat_with_mentor():
@@ -1027,20 +1635,18 @@ def chat_with_mentor():
                 'error': 'message is required'
             }), 400
         
-        # Get or initialize conversation history for this session
-        if session_id not in conversation_sessions:
-            conversation_sessions[session_id] = {}
-        
-        if job_title not in conversation_sessions[session_id]:
-            conversation_sessions[session_id][job_title] = []
-        
-        conversation_history = conversation_sessions[session_id][job_title]
-        
-        # Get response from mentor agent (now returns 3 values: reply, history, peer_mentors)
-        reply, updated_history, peer_mentors = ask_llm(job_title, message, conversation_history, category=category)
+        # Conversation histories per session and role (bounded, optionally shared by workers; see session_store.py)
+        session_store = get_session_store()
         
-        # Update conversation history
-        conversation_sessions[session_id][job_title] = updated_history
+        # Hold the conversation's lock so concurrent messages don't overwrite each other's history
+        with session_store.lock(session_id, job_title):
+            conversation_history = session_store.get(session_id, job_title)
+            
+            # Get response from mentor agent (now returns 3 values: reply, history, peer_mentors)
+            reply, updated_history, peer_mentors = ask_llm(job_title, message, conversation_history, category=category)
+            
+            # Update conversation history
+            session_store.set(session_id, job_title, updated_history)
         
         response_data = {
             'success': True,
@@ -1115,12 +1721,38 @@ def get_peer_mentors(category):
         }), 500
 
 
+@app.route('/api/llm-cache/stats', methods=['GET'])
+def llm_cache_stats():
+    """LLM response cache hit/miss counters"""
+    return jsonify({
+        'success': True,
+        'stats': get_llm_cache().stats()
+    })
+
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint: 503 until the shared clients are warmed up
+    
+    The warm-up also starts on the first request of any kind, so a readiness
+    probe is enough to warm a new instance before it takes traffic.
+    """
+    status = warmup_status()
+    ready = not PREWARM_CLIENTS or not s3_client or status['state'] in ('warm', 'degraded')
+    return jsonify({
+        'ready': ready,
+        'timestamp': datetime.now().isoformat(),
+        'clients': status
+    }), 200 if ready else 503
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'ok',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'clients': warmup_status()
     })
 
 
@@ -1140,6 +1772,8 @@ if __name__ == '__main__':
     else:
         print('✅ S3 client ready\n')
     
+    start_client_prewarm()
+    
     # Enable debug mode and auto-reload to pick up code changes
     app.run(host='0.0.0.0', port=PORT, debug=True, use_reloader=True)
 
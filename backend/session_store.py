@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Conversation session store for the mentor chat.
+
+Keeps each (session_id, job_title) conversation history. Two backends:
+  - MemorySessionStore: per-process LRU bounded by entry count and total
+    size, with a TTL refreshed on every access.
+  - SQLiteSessionStore: one SQLite file shared by every worker on a host,
+    with the same TTL and size bounds.
+
+A chat turn reads the history, calls the LLM and writes the new history;
+holding lock() (or alock() in async code) around the turn keeps two
+concurrent messages in the same conversation from overwriting each other.
+The SQLite backend's lock is a lease row, so it also holds across workers.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+
+# Backend: 'memory' (per process) or 'sqlite' (shared by the workers on a host)
+SESSION_STORE = os.getenv('SESSION_STORE', 'memory').lower()
+SESSION_STORE_DB = os.getenv('SESSION_STORE_DB', os.path.join(tempfile.gettempdir(), 'career_spark_sessions.db'))
+
+# Conversations expire after SESSION_TTL seconds without activity (0 = never)
+SESSION_TTL = float(os.getenv('SESSION_TTL', '86400'))
+SESSION_MAX_ENTRIES = int(os.getenv('SESSION_MAX_ENTRIES', '10000'))
+SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# How long a chat turn may wait for the conversation lock, which is also the lease of a held lock
+SESSION_LOCK_TIMEOUT = float(os.getenv('SESSION_LOCK_TIMEOUT', '120'))
+_LOCK_POLL_INTERVAL = 0.05
+
+
+class SessionStore(ABC):
+    """Conversation histories keyed by (session_id, job_title)."""
+
+    def __init__(self, ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES, max_bytes=SESSION_MAX_BYTES,
+                 lock_timeout=SESSION_LOCK_TIMEOUT):
+        """
+        Args:
+            ttl: seconds a conversation is kept after its last access (0 or less means no expiry)
+            max_entries: maximum number of conversations kept
+            max_bytes: maximum total size of the stored histories (JSON bytes)
+            lock_timeout: seconds lock() waits, and the lease of a held lock
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock_timeout = lock_timeout
+
+    def _expires_at(self, now):
+        return now + self.ttl if self.ttl and self.ttl > 0 else None
+
+    @abstractmethod
+    def get(self, session_id, job_title):
+        """Return the conversation history (a list of messages), or [] if there is none."""
+
+    @abstractmethod
+    def set(self, session_id, job_title, history):
+        """Store the conversation history."""
+
+    @abstractmethod
+    def delete(self, session_id, job_title=None):
+        """Drop one conversation, or every conversation of the session when job_title is None."""
+
+    @abstractmethod
+    def stats(self):
+        """Backend name and current size."""
+
+    @abstractmethod
+    def _try_acquire(self, key, owner, now):
+        """Take the lock of a conversation if it is free or its lease expired."""
+
+    @abstractmethod
+    def _release(self, key, owner):
+        """Release a conversation's lock if owner still holds it."""
+
+    @contextmanager
+    def lock(self, session_id, job_title):
+        """
+        Hold the conversation's lock for a read-modify-write of its history.
+
+        Raises:
+            TimeoutError: if the lock isn't free within lock_timeout seconds.
+        """
+        key = (session_id, job_title)
+        owner = uuid.uuid4().hex
+        deadline = time.time() + self.lock_timeout
+        while not self._try_acquire(key, owner, time.time()):
+            if time.time() >= deadline:
+                raise TimeoutError(f'Conversation {session_id}/{job_title} is busy')
+            time.sleep(_LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            self._release(key, owner)
+
+    @asynccontextmanager
+    async def alock(self, session_id, job_title):
+        """Async version of lock(): waits without blocking the event loop."""
+        key = (session_id, job_title)
+        owner = uuid.uuid4().hex
+        deadline = time.time() + self.lock_timeout
+        while not await asyncio.to_thread(self._try_acquire, key, owner, time.time()):
+            if time.time() >= deadline:
+                raise TimeoutError(f'Conversation {session_id}/{job_title} is busy')
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(self._release, key, owner)
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU of conversations, bounded by count, total bytes and TTL."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def _drop(self, key):
+        """Remove an entry (caller holds the lock)."""
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones over the bounds (caller holds the lock)."""
+        # Every access refreshes the TTL and moves the entry to the end, so expired ones are at the front
+        while self._entries:
+            key, (_, _, expires_at) = next(iter(self._entries.items()))
+            expired = expires_at is not None and expires_at <= now
+            if not expired and len(self._entries) <= self.max_entries and self._bytes <= self.max_bytes:
+                break
+            self._drop(key)
+            self._evictions += 1
+
+    def get(self, session_id, job_title):
+        key = (session_id, job_title)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return []
+            history, size, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                self._drop(key)
+                return []
+            self._entries[key] = (history, size, self._expires_at(now))
+            self._entries.move_to_end(key)
+            return json.loads(history)
+
+    def set(self, session_id, job_title, history):
+        key = (session_id, job_title)
+        data = json.dumps(history, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (data, size, self._expires_at(now))
+            self._bytes += size
+            self._evict(now)
+
+    def delete(self, session_id, job_title=None):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == session_id and job_title in (None, key[1])]:
+                self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+            }
+
+    def _try_acquire(self, key, owner, now):
+        with self._lock:
+            held = self._locks.get(key)
+            if held is not None and held[1] > now:
+                return False
+            self._locks[key] = (owner, now + self.lock_timeout)
+            return True
+
+    def _release(self, key, owner):
+        with self._lock:
+            if self._locks.get(key, (None,))[0] == owner:
+                del self._locks[key]
+
+
+class SQLiteSessionStore(SessionStore):
+    """Conversations in an SQLite file shared by every worker on the host."""
+
+    # Expired and over-budget conversations are purged at most this often (seconds)
+    PURGE_INTERVAL = 60
+
+    def __init__(self, db_path=SESSION_STORE_DB, **kwargs):
+        """
+        Args:
+            db_path: SQLite file (WAL mode, so workers read while another writes)
+        """
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self._db = None
+        self._lock = threading.Lock()
+        self._last_purge = 0
+
+    def _connect(self):
+        """Open the database on first use (caller holds the lock)."""
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(session_id TEXT NOT NULL, job_title TEXT NOT NULL, history TEXT NOT NULL, '
+                'size INTEGER NOT NULL, updated_at REAL NOT NULL, expires_at REAL, '
+                'PRIMARY KEY (session_id, job_title))'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS session_locks '
+                '(session_id TEXT NOT NULL, job_title TEXT NOT NULL, owner TEXT NOT NULL, expires_at REAL NOT NULL, '
+                'PRIMARY KEY (session_id, job_title))'
+            )
+            self._db.commit()
+        return self._db
+
+    def _purge(self, db, now):
+        """Delete expired conversations, then the least recently used ones over the bounds."""
+        self._last_purge = now
+        db.execute('DELETE FROM sessions WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,))
+        count, total = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        doomed = []
+        for session_id, job_title, size in db.execute('SELECT session_id, job_title, size FROM sessions ORDER BY updated_at'):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((session_id, job_title))
+            count -= 1
+            total -= size
+        db.executemany('DELETE FROM sessions WHERE session_id = ? AND job_title = ?', doomed)
+
+    def get(self, session_id, job_title):
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._connect()
+                row = db.execute(
+                    'SELECT history, expires_at FROM sessions WHERE session_id = ? AND job_title = ?',
+                    (session_id, job_title)
+                ).fetchone()
+                if row is None:
+                    return []
+                if row[1] is not None and row[1] <= now:
+                    db.execute('DELETE FROM sessions WHERE session_id = ? AND job_title = ?', (session_id, job_title))
+                    db.commit()
+                    return []
+                db.execute(
+                    'UPDATE sessions SET updated_at = ?, expires_at = ? WHERE session_id = ? AND job_title = ?',
+                    (now, self._expires_at(now), session_id, job_title)
+                )
+                db.commit()
+                return json.loads(row[0])
+            except sqlite3.Error as e:
+                print(f'⚠️  Session store read failed: {e}')
+                return []
+
+    def set(self, session_id, job_title, history):
+        data = json.dumps(history, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._connect()
+                db.execute(
+                    'INSERT OR REPLACE INTO sessions (session_id, job_title, history, size, updated_at, expires_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (session_id, job_title, data, len(data.encode('utf-8')), now, self._expires_at(now))
+                )
+                if now - self._last_purge >= self.PURGE_INTERVAL:
+                    self._purge(db, now)
+                db.commit()
+            except sqlite3.Error as e:
+                print(f'⚠️  Session store write failed: {e}')
+
+    def delete(self, session_id, job_title=None):
+        with self._lock:
+            try:
+                db = self._connect()
+                if job_title is None:
+                    db.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+                else:
+                    db.execute('DELETE FROM sessions WHERE session_id = ? AND job_title = ?', (session_id, job_title))
+                db.commit()
+            except sqlite3.Error as e:
+                print(f'⚠️  Session store delete failed: {e}')
+
+    def stats(self):
+        stats = {
+            'backend': 'sqlite',
+            'entries': None,
+            'bytes': None,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'db_path': self.db_path,
+        }
+        with self._lock:
+            try:
+                db = self._connect()
+                stats['entries'], stats['bytes'] = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions').fetchone()
+            except sqlite3.Error as e:
+                print(f'⚠️  Session store stats failed: {e}')
+                stats['error'] = str(e)
+        return stats
+
+    def _try_acquire(self, key, owner, now):
+        with self._lock:
+            try:
+                db = self._connect()
+                # Take the lease if there is none or it expired; one statement, so it's atomic across workers
+                cursor = db.execute(
+                    'INSERT INTO session_locks (session_id, job_title, owner, expires_at) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (session_id, job_title) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                    'WHERE session_locks.expires_at <= ?',
+                    (key[0], key[1], owner, now + self.lock_timeout, now)
+                )
+                db.commit()
+                return cursor.rowcount == 1
+            except sqlite3.OperationalError:
+                # Database busy (or not reachable yet): try again on the next poll
+                if self._db is not None:
+                    self._db.rollback()
+                return False
+
+    def _release(self, key, owner):
+        with self._lock:
+            try:
+                db = self._connect()
+                db.execute(
+                    'DELETE FROM session_locks WHERE session_id = ? AND job_title = ? AND owner = ?',
+                    (key[0], key[1], owner)
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                print(f'⚠️  Session lock release failed: {e}')
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Get the process-wide session store, configured from environment variables."""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            if SESSION_STORE == 'sqlite':
+                _session_store = SQLiteSessionStore(db_path=SESSION_STORE_DB)
+            elif SESSION_STORE == 'memory':
+                _session_store = MemorySessionStore()
+            else:
+                raise ValueError(f'Unknown SESSION_STORE backend: {SESSION_STORE} (expected memory or sqlite)')
+        return _session_store
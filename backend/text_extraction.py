@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Text extraction from uploaded files, shared by server.py and process_s3_files.py.
+
+PDF parsing runs in separate worker processes so it never holds the request
+thread's GIL. Pages are extracted one at a time up to PDF_MAX_PAGES /
+PDF_MAX_CHARS, and a file that takes longer than PDF_EXTRACTION_TIMEOUT
+gets its own worker process killed.
+
+Extractors are registered per MIME type and file suffix. A file's type is
+sniffed from its first bytes, so audio, video, images and archives are
+skipped without being decoded, whatever their declared type or name.
+"""
+
+import io
+import os
+import re
+import mimetypes
+import threading
+import multiprocessing
+from json.decoder import scanstring as _scanstring
+from pathlib import Path
+
+# PDF extraction limits
+PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', '2'))  # 0 = extract in the calling thread
+PDF_EXTRACTION_TIMEOUT = float(os.getenv('PDF_EXTRACTION_TIMEOUT', '30'))
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '50'))
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', '200000'))
+
+# Per-type size limits (bytes); larger files are skipped
+JSON_MAX_BYTES = int(os.getenv('JSON_MAX_BYTES', str(20 * 1024 * 1024)))
+TEXT_MAX_BYTES = int(os.getenv('TEXT_MAX_BYTES', str(5 * 1024 * 1024)))
+PDF_MAX_BYTES = int(os.getenv('PDF_MAX_BYTES', str(20 * 1024 * 1024)))
+
+# Bytes read to identify a file type
+SNIFF_BYTES = 512
+
+# Never decoded as text
+REJECTED_MIME_PREFIXES = ('audio/', 'video/', 'image/')
+REJECTED_MIME_TYPES = frozenset([
+    'application/zip', 'application/gzip', 'application/x-7z-compressed',
+    'application/vnd.rar', 'application/x-tar', 'application/x-executable',
+])
+
+# Declared types that say nothing about the content
+GENERIC_MIME_TYPES = frozenset(['application/octet-stream', 'binary/octet-stream'])
+
+# Characters of text extracted from one JSON file
+JSON_TEXT_BUDGET = int(os.getenv('JSON_TEXT_BUDGET', '200000'))
+
+# Everything between these characters is whitespace or a number/true/false/null
+_JSON_SIGNIFICANT = re.compile(r'["{}\[\],:]')
+
+# Idle PDF worker processes, and the number of PDFs being extracted
+_pdf_idle_workers = []
+_pdf_workers_lock = threading.Lock()
+_pdf_slots = threading.BoundedSemaphore(max(PDF_EXTRACTION_WORKERS, 1))
+
+
+class ExtractionError(Exception):
+    """Extracting a file's text failed or timed out (as opposed to the file having no text)."""
+
+
+def _extract_pdf_pages(data, max_pages, max_chars):
+    """Extract text page by page, stopping at the page and character limits (runs in a worker process)."""
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+    pdf_text = []
+    remaining = max_chars
+    for page_number, page in enumerate(pdf_reader.pages):
+        if page_number >= max_pages or remaining <= 0:
+            break
+        text = (page.extract_text() or '')[:remaining]
+        pdf_text.append(text)
+        remaining -= len(text) + 1
+    return '\n'.join(pdf_text)
+
+
+def _pdf_worker_main(conn):
+    """Worker process loop: extract the PDFs received on conn, one at a time."""
+    while True:
+        try:
+            data, max_pages, max_chars = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, _extract_pdf_pages(data, max_pages, max_chars)))
+        except ImportError:
+            conn.send((False, 'PyPDF2 not installed'))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+
+class _PdfWorker:
+    """A worker process that extracts one PDF at a time and can be killed on its own."""
+
+    def __init__(self):
+        # spawn: never fork the multi-threaded server process
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_pdf_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def extract(self, data, timeout):
+        """
+        Extract a PDF, waiting up to timeout seconds once the worker has it.
+
+        Returns:
+            Tuple (ok, text or error message)
+
+        Raises:
+            TimeoutError: if the worker didn't answer in time
+            EOFError / OSError: if the worker process died
+        """
+        self.conn.send((data, PDF_MAX_PAGES, PDF_MAX_CHARS))
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def _checkout_pdf_worker():
+    with _pdf_workers_lock:
+        if _pdf_idle_workers:
+            return _pdf_idle_workers.pop()
+    return _PdfWorker()
+
+
+def _checkin_pdf_worker(worker):
+    with _pdf_workers_lock:
+        _pdf_idle_workers.append(worker)
+
+
+def extract_pdf_text(data, filename):
+    """
+    Extract the text of a PDF in a worker process.
+
+    At most PDF_EXTRACTION_WORKERS PDFs are extracted at once; the others
+    wait for a free worker, and PDF_EXTRACTION_TIMEOUT only counts from the
+    moment a worker has the file. A worker that times out is killed on its
+    own, without affecting the PDFs other workers are extracting.
+
+    Returns:
+        Extracted text
+
+    Raises:
+        ExtractionError: if PyPDF2 is missing, the file is invalid or
+            extraction timed out
+    """
+    if PDF_EXTRACTION_WORKERS <= 0:
+        try:
+            return _extract_pdf_pages(data, PDF_MAX_PAGES, PDF_MAX_CHARS)
+        except ImportError as e:
+            raise ExtractionError(f'PyPDF2 not installed, skipping PDF text extraction for {filename}') from e
+        except Exception as e:
+            raise ExtractionError(f'Error extracting text from PDF {filename}: {e}') from e
+
+    with _pdf_slots:
+        worker = _checkout_pdf_worker()
+        try:
+            ok, result = worker.extract(data, PDF_EXTRACTION_TIMEOUT)
+        except TimeoutError as e:
+            worker.kill()
+            raise ExtractionError(f'PDF text extraction timed out after {PDF_EXTRACTION_TIMEOUT}s for {filename}, killed worker') from e
+        except (EOFError, OSError) as e:
+            worker.kill()
+            raise ExtractionError(f'PDF worker process died while extracting {filename}') from e
+        _checkin_pdf_worker(worker)
+
+    if not ok:
+        raise ExtractionError(f'Error extracting text from PDF {filename}: {result}')
+    return result
+
+
+def iter_json_strings(document, budget=None, filename='JSON'):
+    """
+    Yield the non-blank string values of a JSON document, in document order.
+
+    The document is scanned in place (object keys are skipped) instead of
+    being parsed into Python objects, and scanning stops once budget
+    characters have been yielded. A malformed document yields the strings
+    found before the error.
+
+    Args:
+        document: JSON text
+        budget: maximum number of characters to yield (None for no limit)
+        filename: name used in warnings
+    """
+    stack = []
+    expecting_key = False
+    remaining = budget
+    position = 0
+    try:
+        while True:
+            match = _JSON_SIGNIFICANT.search(document, position)
+            if match is None:
+                return
+            char = match.group()
+            position = match.end()
+
+            if char == '"':
+                value, position = _scanstring(document, position, False)
+                if expecting_key or not value.strip():
+                    continue
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    value = value[:remaining]
+                    remaining -= len(value)
+                yield value
+            elif char == '{' or char == '[':
+                stack.append(char)
+                expecting_key = char == '{'
+            elif char == '}' or char == ']':
+                if stack:
+                    stack.pop()
+                expecting_key = False
+            elif char == ',':
+                expecting_key = bool(stack) and stack[-1] == '{'
+            else:  # ':'
+                expecting_key = False
+    except ValueError as e:
+        print(f'⚠️  Malformed JSON in {filename}, keeping text read so far: {e}')
+
+
+def _extract_json(data, filename):
+    return '\n'.join(iter_json_strings(data.decode('utf-8'), JSON_TEXT_BUDGET, filename))
+
+
+def _extract_plain_text(data, filename):
+    return data.decode('utf-8', errors='ignore')
+
+
+class Extractor:
+    """A text extractor for one family of file types."""
+
+    def __init__(self, name, handler, mime_types=(), suffixes=(), max_bytes=None):
+        """
+        Args:
+            name: short name used in logs
+            handler: function (data, filename) -> text
+            mime_types: MIME types handled
+            suffixes: file name suffixes handled (lowercase, with the dot)
+            max_bytes: larger files are skipped (None for no limit)
+        """
+        self.name = name
+        self.handler = handler
+        self.mime_types = frozenset(mime_types)
+        self.suffixes = frozenset(suffixes)
+        self.max_bytes = max_bytes
+
+    def too_large(self, size):
+        return self.max_bytes is not None and size > self.max_bytes
+
+    def extract(self, data, filename):
+        """
+        Run the handler.
+
+        Returns:
+            Extracted text, or an empty string when the file is too large
+
+        Raises:
+            ExtractionError: if the handler failed or timed out, so callers
+                can tell a failure from a file without text
+        """
+        if self.too_large(len(data)):
+            print(f'⚠️  Skipping {filename}: {len(data)} bytes exceeds the {self.max_bytes} byte {self.name} limit')
+            return ''
+        try:
+            return self.handler(data, filename)
+        except ExtractionError:
+            raise
+        except Exception as e:
+            raise ExtractionError(f'Error processing {filename}: {e}') from e
+
+
+# Registered extractors, matched in order
+_extractors = []
+
+# (((offset, magic bytes), ...), MIME type): every part must match the first SNIFF_BYTES of a file
+_signatures = []
+
+
+def register_extractor(name, handler, mime_types=(), suffixes=(), max_bytes=None):
+    """Register a text extractor (see Extractor); returns it."""
+    extractor = Extractor(name, handler, mime_types, suffixes, max_bytes)
+    _extractors.append(extractor)
+    return extractor
+
+
+def register_signature(magic, mime_type, offset=0, requires=()):
+    """
+    Register the magic bytes identifying a file type.
+
+    Sniffed types override the declared type and the file name, so a
+    signature must be specific enough not to match the start of plain text.
+
+    Args:
+        magic: bytes expected at offset
+        mime_type: MIME type of matching files
+        offset: position of magic in the file
+        requires: other (offset, bytes) parts that must match as well
+    """
+    _signatures.append((((offset, magic),) + tuple(requires), mime_type))
+
+
+register_extractor('JSON', _extract_json, ('application/json',), ('.json',), JSON_MAX_BYTES)
+register_extractor('text', _extract_plain_text, ('text/plain', 'text/txt'), ('.txt', '.text'), TEXT_MAX_BYTES)
+register_extractor('PDF', extract_pdf_text, ('application/pdf',), ('.pdf',), PDF_MAX_BYTES)
+
+# Files of unknown type that look like UTF-8 text
+_fallback_text = Extractor('text', _extract_plain_text, max_bytes=TEXT_MAX_BYTES)
+
+# Full signatures only: short ASCII prefixes such as "ID3" or "GIF8" also
+# start ordinary text files
+_RIFF = ((0, b'RIFF'),)
+for _magic, _mime_type, _offset, _requires in [
+    (b'%PDF-', 'application/pdf', 0, ()),
+    # Images
+    (b'\x89PNG\r\n\x1a\n', 'image/png', 0, ()),
+    (b'\xff\xd8\xff', 'image/jpeg', 0, ()),
+    (b'GIF87a', 'image/gif', 0, ()),
+    (b'GIF89a', 'image/gif', 0, ()),
+    (b'WEBP', 'image/webp', 8, _RIFF),
+    # Audio and video
+    (b'ftyp', 'video/mp4', 4, ((0, b'\x00'),)),  # also m4a, mov, heic; box size < 16 MB
+    (b'\x1a\x45\xdf\xa3', 'video/webm', 0, ()),  # also mkv
+    (b'AVI ', 'video/x-msvideo', 8, _RIFF),
+    (b'WAVE', 'audio/wav', 8, _RIFF),
+    (b'ID3\x02', 'audio/mpeg', 0, ()),  # ID3v2.2 - v2.4 tag
+    (b'ID3\x03', 'audio/mpeg', 0, ()),
+    (b'ID3\x04', 'audio/mpeg', 0, ()),
+    (b'\xff\xfb', 'audio/mpeg', 0, ()),
+    (b'\xff\xf3', 'audio/mpeg', 0, ()),
+    (b'OggS\x00', 'audio/ogg', 0, ()),
+    (b'fLaC\x00\x00\x00\x22', 'audio/flac', 0, ()),  # STREAMINFO block header
+    (b'fLaC\x80\x00\x00\x22', 'audio/flac', 0, ()),  # STREAMINFO as the last block
+    # Archives and executables
+    (b'PK\x03\x04', 'application/zip', 0, ()),
+    (b'\x1f\x8b', 'application/gzip', 0, ()),
+    (b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed', 0, ()),
+    (b'Rar!\x1a\x07', 'application/vnd.rar', 0, ()),
+    (b'\x7fELF', 'application/x-executable', 0, ()),
+]:
+    register_signature(_magic, _mime_type, _offset, _requires)
+
+
+def sniff_mime_type(head):
+    """MIME type identified by a file's first bytes, or None."""
+    for parts, mime_type in _signatures:
+        if all(head[offset:offset + len(magic)] == magic for offset, magic in parts):
+            return mime_type
+    return None
+
+
+def looks_like_text(head):
+    """Whether a file's first bytes look like UTF-8 text."""
+    if b'\x00' in head:
+        return False
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        return e.reason == 'unexpected end of data'
+    return True
+
+
+def resolve_extractor(head, filename, content_type=None):
+    """
+    Pick the extractor of a file from its first bytes, content type and name.
+
+    Sniffed magic bytes take precedence over the declared content type, so
+    audio, video, images and archives are rejected before the rest of the
+    file is read or decoded.
+
+    Args:
+        head: first SNIFF_BYTES of the file (or all of it)
+        filename: file name
+        content_type: optional declared MIME type
+
+    Returns:
+        Tuple (extractor, reason): extractor is None when the file is skipped,
+        with reason saying why.
+    """
+    suffix = Path(filename).suffix.lower()
+    sniffed = sniff_mime_type(head)
+    if sniffed:
+        mime_type = sniffed
+    else:
+        mime_type = content_type.split(';')[0].strip().lower() if content_type else None
+        if not mime_type or mime_type in GENERIC_MIME_TYPES:
+            mime_type, _ = mimetypes.guess_type(filename)
+
+    if mime_type and (mime_type.startswith(REJECTED_MIME_PREFIXES) or mime_type in REJECTED_MIME_TYPES):
+        return None, f'{mime_type} is not a text format'
+
+    for extractor in _extractors:
+        if mime_type in extractor.mime_types or (not sniffed and suffix in extractor.suffixes):
+            return extractor, None
+
+    if looks_like_text(head):
+        return _fallback_text, None
+    return None, f'binary or unsupported format ({mime_type or "unknown type"})'
+
+
+def extract_text_from_bytes(data, filename, content_type=None):
+    """Extract text from the contents of a file of various types
+
+    Args:
+        data: file contents (bytes)
+        filename: file name, used to guess the type when content_type is missing
+        content_type: optional MIME type
+
+    Returns:
+        Extracted text, or an empty string
+    """
+    extractor, reason = resolve_extractor(data[:SNIFF_BYTES], filename, content_type)
+    if extractor is None:
+        print(f'⚠️  Skipping {filename}: {reason}')
+        return ''
+    try:
+        return extractor.extract(data, filename)
+    except ExtractionError as e:
+        print(f'⚠️  {e}')
+        return ''
+
+
+def extract_text_from_file(file_path, content_type=None):
+    """Extract text from various file types"""
+    file_path = Path(file_path)
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+            extractor, reason = resolve_extractor(head, file_path.name, content_type)
+            if extractor is None:
+                print(f'⚠️  Skipping {file_path.name}: {reason}')
+                return ''
+            data = head + f.read()
+    except Exception as e:
+        print(f'⚠️  Error processing {file_path.name}: {e}')
+        return ''
+    try:
+        return extractor.extract(data, file_path.name)
+    except ExtractionError as e:
+        print(f'⚠️  {e}')
+        return ''
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Vectorized trait scoring.
+
+The questionnaire is compiled once into a response-to-trait weight matrix:
+every possible answer (a likert value or a choice option) is a row, every
+trait a column. A batch of users is one-hot encoded against those rows and
+scored with a single matrix product. The resulting trait_scores dicts are
+identical to test_processor.process_responses().
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+
+from questionnaire import compile_questionnaire
+
+LIKERT_VALUES = (1, 2, 3, 4, 5)
+
+
+def likert_score(qtype: str, value: int, weight) -> Any:
+    """Score of a likert answer, as in process_responses (3 scores 0)."""
+    if value >= 4:
+        return weight if qtype == "likert" else -weight
+    if value <= 2:
+        return -weight if qtype == "likert" else weight
+    return 0
+
+
+class TraitWeightMatrix:
+    """Response-to-trait weight matrix of a questionnaire."""
+
+    def __init__(self, personality_questions: Dict):
+        """
+        Args:
+            personality_questions: questionnaire dict (see personality_traits.json)
+        """
+        questions = personality_questions.get("questions", {})
+
+        traits = list(personality_questions.get("traits", []))
+        self.option_index = {}   # (qid, likert value or choice option) -> row
+        option_traits = []       # row -> {trait: score}, in scoring order
+
+        for qid, question_data in questions.items():
+            qtype = question_data.get("type")
+            if qtype in ("likert", "likert_reverse"):
+                trait = question_data["trait"]
+                weight = question_data.get("weight", 1)
+                for value in LIKERT_VALUES:
+                    self.option_index[(qid, value)] = len(option_traits)
+                    option_traits.append({trait: likert_score(qtype, value, weight)})
+            elif qtype == "choice":
+                for option, option_scores in question_data.get("answers", {}).items():
+                    self.option_index[(qid, option)] = len(option_traits)
+                    option_traits.append(dict(option_scores))
+
+        for option_scores in option_traits:
+            for trait in option_scores:
+                if trait not in traits:
+                    traits.append(trait)
+
+        # qid -> {answer: row}; answers missing here go through _option()
+        self.lookup = {}
+        for (qid, answer), row in self.option_index.items():
+            self.lookup.setdefault(qid, {})[answer] = row
+
+        self.questions = questions
+        self.traits = traits
+        self.option_traits = option_traits
+        trait_index = {trait: i for i, trait in enumerate(traits)}
+
+        integral = all(
+            isinstance(score, (int, np.integer)) for option_scores in option_traits for score in option_scores.values()
+        )
+        self.dtype = np.int64 if integral else np.float64
+        self._key_order = {}
+
+        # weights[row, trait] is the score an answer adds; touched marks the
+        # traits it reports even when the score is 0 (likert 3)
+        self.weights = np.zeros((len(option_traits), len(traits)), dtype=self.dtype)
+        self.touched = np.zeros((len(option_traits), len(traits)), dtype=np.int32)
+        for row, option_scores in enumerate(option_traits):
+            for trait, score in option_scores.items():
+                self.weights[row, trait_index[trait]] = score
+                self.touched[row, trait_index[trait]] = 1
+
+    def _option(self, qid, answer):
+        """Row of an answer, or None if process_responses would ignore it."""
+        question_data = self.questions.get(qid)
+        if question_data is None:
+            return None
+
+        qtype = question_data.get("type")
+        if qtype in ("likert", "likert_reverse"):
+            try:
+                value = int(answer)
+            except (ValueError, TypeError):
+                return None
+            return self.option_index.get((qid, value))
+        if qtype == "choice":
+            try:
+                return self.option_index.get((qid, answer))
+            except TypeError:
+                return None
+        return None
+
+    def encode(self, answers_list: List[Dict[str, Any]]):
+        """
+        One-hot encode answers.
+
+        Args:
+            answers_list: one {question_id: answer} dict per user
+
+        Returns:
+            Tuple (matrix of shape users x answer rows, per-user list of rows in answer order).
+        """
+        lookup = self.lookup
+        selected = []
+        user_index = []
+        row_index = []
+        for user, answers in enumerate(answers_list):
+            rows = []
+            for qid, answer in answers.items():
+                try:
+                    row = lookup[qid][answer]
+                except (KeyError, TypeError):
+                    row = self._option(qid, answer)
+                    if row is None:
+                        continue
+                rows.append(row)
+            selected.append(rows)
+            user_index.extend([user] * len(rows))
+            row_index.extend(rows)
+
+        encoded = np.zeros((len(answers_list), len(self.option_traits)), dtype=self.dtype)
+        encoded[user_index, row_index] = 1
+        return encoded, selected
+
+    def score(self, answers_list: List[Dict[str, Any]]):
+        """
+        Score a batch of users with one matrix product.
+
+        Returns:
+            Tuple (scores, touched) arrays of shape users x traits.
+        """
+        encoded, _ = self.encode(answers_list)
+        return encoded @ self.weights, (encoded.astype(np.int32) @ self.touched) > 0
+
+    def trait_scores(self, answers_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score a batch of users into trait_scores dicts.
+
+        Returns:
+            One dict per user, equal to process_responses()["trait_scores"]
+            (including key order and traits scored 0).
+        """
+        encoded, selected = self.encode(answers_list)
+        scores = (encoded @ self.weights).tolist()
+
+        results = []
+        for user_scores, rows in zip(scores, selected):
+            key = tuple(rows)
+            order = self._key_order.get(key)
+            if order is None:
+                order = self._key_order[key] = self._trait_order(rows)
+            results.append({trait: user_scores[i] for trait, i in order})
+        return results
+
+    def _trait_order(self, rows):
+        """(trait, column) pairs in the order process_responses first scores them."""
+        trait_index = {trait: i for i, trait in enumerate(self.traits)}
+        order = {}
+        for row in rows:
+            for trait in self.option_traits[row]:
+                order.setdefault(trait, trait_index[trait])
+        return list(order.items())
+
+
+def score_responses_batch(personality_questions: Dict, user_responses_list: List[Dict]) -> List[Dict[str, Any]]:
+    """
+    Batch version of process_responses() returning only the trait scores.
+
+    Unknown question IDs and invalid answers are skipped (without the
+    per-answer warnings process_responses prints).
+
+    Args:
+        personality_questions: questionnaire dict
+        user_responses_list: list of user_responses dicts (each with an 'answers' dict)
+
+    Returns:
+        List of trait_scores dicts, in input order.
+    """
+    matrix = compile_questionnaire(personality_questions).matrix
+    return matrix.trait_scores([responses.get("answers", {}) for responses in user_responses_list])
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Script to upload a JSON file to S3 in a specific folder
+
+The file is also recorded in the folder's upload manifest, which
+/api/submit-questions reads instead of listing the folder.
 """
 
 import os
@@ -11,6 +14,8 @@ from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime
 
+from upload_manifest import record_uploads, manifest_entry
+
 # Load environment variables from project root
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
@@ -66,10 +71,11 @@ def upload_json_to_s3(json_file_path, s3_folder):
         print(f'\n📤 Uploading {filename} to s3://{S3_BUCKET}/{s3_key}')
         
         # Upload to S3
-        s3_client.put_object(
+        body = json_string.encode('utf-8')
+        put_response = s3_client.put_object(
             Bucket=S3_BUCKET,
             Key=s3_key,
-            Body=json_string.encode('utf-8'),
+            Body=body,
             ContentType='application/json; charset=utf-8',
             Metadata={
                 'uploadedAt': datetime.now().isoformat(),
@@ -78,6 +84,15 @@ def upload_json_to_s3(json_file_path, s3_folder):
         )
         
         print(f'✅ Successfully uploaded to s3://{S3_BUCKET}/{s3_key}')
+        
+        # Keep the folder's manifest in sync so submit sees the new file
+        record_uploads(s3_client, S3_BUCKET, s3_folder, [manifest_entry(
+            key=s3_key,
+            size=len(body),
+            etag=put_response.get('ETag'),
+            content_type='application/json; charset=utf-8',
+            original_name=filename
+        )])
         return True
         
     except ClientError as e:
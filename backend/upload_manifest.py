@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Per-user upload manifest.
+
+/api/upload records every object it writes in <folder>/<folder>_upload_manifest.json:
+the file list with ETags and content types, and the latest description text
+(inline when small). /api/submit-questions resolves its inputs with a single
+GET of the manifest instead of listing the whole folder. When a folder has no
+manifest yet, it is rebuilt once from a listing.
+
+Every upload endpoint and worker writes the same manifest, so it is only
+replaced with a conditional PUT on the ETag it was read at, and re-read and
+retried when another writer got there first. A manifest that can't be
+updated is deleted, so submit lists the folder again instead of missing files.
+
+The manifest also indexes uploaded files by the SHA-256 of their content, so
+re-uploading an identical file returns the existing key instead of storing
+(and later extracting) a duplicate.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+from extraction_cache import is_sidecar
+
+MANIFEST_SUFFIX = '_upload_manifest.json'
+DESCRIPTION_SUFFIX = '-description.txt'
+
+# Descriptions up to this size are stored inline in the manifest
+MANIFEST_INLINE_TEXT_MAX = int(os.getenv('MANIFEST_INLINE_TEXT_MAX', str(64 * 1024)))
+
+# Version 2: hashes only come from server-side hashing or S3-verified checksums
+MANIFEST_VERSION = 2
+
+# Conditional manifest writes that lost a race are retried up to this many times
+MANIFEST_UPDATE_ATTEMPTS = int(os.getenv('MANIFEST_UPDATE_ATTEMPTS', '5'))
+
+# Error codes of a conditional PUT that lost a race with another writer
+_WRITE_CONFLICT_CODES = ('PreconditionFailed', 'ConditionalRequestConflict', '412', '409')
+
+# Saves conditional-write retries between the threads of this process; other
+# processes are kept apart by the conditional PUT itself
+_folder_locks = {}
+_folder_locks_lock = threading.Lock()
+
+
+def manifest_s3_key(folder: str) -> str:
+    """S3 key of a folder's upload manifest."""
+    return f'{folder}/{folder}{MANIFEST_SUFFIX}'
+
+
+def _folder_lock(folder):
+    with _folder_locks_lock:
+        return _folder_locks.setdefault(folder, threading.Lock())
+
+
+def _empty_manifest(folder):
+    return {
+        'version': MANIFEST_VERSION,
+        'folder': folder,
+        'updated_at': None,
+        'latest_description': None,
+        'files': {},
+        'hashes': {},
+    }
+
+
+def _read_manifest(s3_client_instance, bucket, folder):
+    """
+    Read a folder's manifest and its ETag.
+
+    Returns:
+        Tuple (manifest or None, etag or None). The ETag is set whenever the
+        object exists, even if it is unreadable or of another version.
+
+    Raises:
+        ClientError: for S3 errors other than a missing manifest.
+    """
+    s3_key = manifest_s3_key(folder)
+    try:
+        response = s3_client_instance.get_object(Bucket=bucket, Key=s3_key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'NoSuchKey':
+            return None, None
+        raise
+
+    etag = response.get('ETag')
+    try:
+        manifest = json.loads(response['Body'].read().decode('utf-8'))
+    except Exception as e:
+        print(f'⚠️  Ignoring unreadable upload manifest s3://{bucket}/{s3_key}: {e}')
+        return None, etag
+
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None, etag
+    return manifest, etag
+
+
+def load_manifest(s3_client_instance, bucket, folder):
+    """
+    Load a folder's manifest.
+
+    Returns:
+        Manifest dict, or None if there is none (or it is unreadable).
+    """
+    try:
+        return _read_manifest(s3_client_instance, bucket, folder)[0]
+    except ClientError as e:
+        print(f'⚠️  Could not read upload manifest s3://{bucket}/{manifest_s3_key(folder)}: {e}')
+        return None
+
+
+def _is_write_conflict(error):
+    return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in _WRITE_CONFLICT_CODES
+
+
+def save_manifest(s3_client_instance, bucket, folder, manifest, etag=None):
+    """
+    Write a folder's manifest if nobody else changed it since it was read.
+
+    Args:
+        etag: ETag the manifest was read at, or None if there was no manifest
+            (the write then only succeeds if there still is none)
+
+    Returns:
+        ETag of the written manifest
+
+    Raises:
+        ClientError: PreconditionFailed / ConditionalRequestConflict if
+            another writer replaced (or created) the manifest in the meantime.
+    """
+    manifest['updated_at'] = datetime.now().isoformat()
+    condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+    response = s3_client_instance.put_object(
+        Bucket=bucket,
+        Key=manifest_s3_key(folder),
+        Body=json.dumps(manifest, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json; charset=utf-8',
+        **condition
+    )
+    return response.get('ETag')
+
+
+def invalidate_manifest(s3_client_instance, bucket, folder):
+    """Delete a folder's manifest, so the next submit lists the folder and rebuilds it."""
+    s3_key = manifest_s3_key(folder)
+    try:
+        s3_client_instance.delete_object(Bucket=bucket, Key=s3_key)
+        print(f'⚠️  Removed upload manifest s3://{bucket}/{s3_key}; it will be rebuilt from a listing')
+    except Exception as e:
+        print(f'❌ Could not remove stale upload manifest s3://{bucket}/{s3_key}: {e}')
+
+
+def manifest_entry(key, size, etag, content_type, last_modified=None, original_name=None, sha256=None):
+    """One file record of the manifest (last_modified defaults to now, UTC like S3 listings)."""
+    entry = {
+        'key': key,
+        'size': size,
+        'etag': etag,
+        'content_type': content_type,
+        'last_modified': last_modified or datetime.now(timezone.utc).isoformat(),
+    }
+    if original_name:
+        entry['original_name'] = original_name
+    if sha256:
+        entry['sha256'] = sha256
+    return entry
+
+
+def _apply(manifest, entries, description_text):
+    """Add file entries to a manifest and update the latest description."""
+    for entry in entries:
+        manifest['files'][entry['key']] = entry
+        if entry.get('sha256'):
+            manifest.setdefault('hashes', {})[entry['sha256']] = entry['key']
+        if not entry['key'].endswith(DESCRIPTION_SUFFIX):
+            continue
+
+        latest = manifest.get('latest_description')
+        if latest and latest['last_modified'] > entry['last_modified']:
+            continue
+        manifest['latest_description'] = {
+            'key': entry['key'],
+            'etag': entry['etag'],
+            'last_modified': entry['last_modified'],
+            # Inline small descriptions so submit doesn't need a second GET
+            'text': description_text if description_text is not None and len(description_text) <= MANIFEST_INLINE_TEXT_MAX else None,
+        }
+
+
+def record_uploads(s3_client_instance, bucket, folder, entries, description_text=None):
+    """
+    Record newly uploaded objects in the folder's manifest.
+
+    Args:
+        s3_client_instance: S3 client instance
+        bucket: S3 bucket name
+        folder: user folder
+        entries: list of manifest_entry() dicts
+        description_text: text of the -description.txt entry, if one was uploaded
+
+    Errors are logged and not raised. If the manifest can't be updated, it is
+    deleted: submit then falls back to listing the folder and rebuilds it.
+    """
+    with _folder_lock(folder):
+        try:
+            for attempt in range(MANIFEST_UPDATE_ATTEMPTS):
+                manifest, etag = _read_manifest(s3_client_instance, bucket, folder)
+                if manifest is None:
+                    manifest = build_manifest(s3_client_instance, bucket, folder, store=False)
+                _apply(manifest, entries, description_text)
+                try:
+                    save_manifest(s3_client_instance, bucket, folder, manifest, etag)
+                except ClientError as e:
+                    if not _is_write_conflict(e):
+                        raise
+                    # Another upload changed the manifest: re-read it and apply our entries again
+                    time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+                    continue
+                print(f'✓ Updated upload manifest ({len(manifest["files"])} file(s)): {manifest_s3_key(folder)}')
+                return
+            raise RuntimeError(f'the manifest kept changing during {MANIFEST_UPDATE_ATTEMPTS} attempts')
+        except Exception as e:
+            print(f'⚠️  Failed to update upload manifest for {folder}: {e}')
+            invalidate_manifest(s3_client_instance, bucket, folder)
+
+
+def content_hash_index(manifest):
+    """SHA-256 -> manifest entry of the files of a manifest with a known content hash."""
+    if not manifest:
+        return {}
+    files = manifest['files']
+    return {digest: files[key] for digest, key in manifest.get('hashes', {}).items() if key in files}
+
+
+def load_content_hash_index(s3_client_instance, bucket, folder):
+    """Content hash index of a folder's manifest (empty if it has no manifest yet)."""
+    return content_hash_index(load_manifest(s3_client_instance, bucket, folder))
+
+
+def build_manifest(s3_client_instance, bucket, folder, store=True, etag=None):
+    """
+    Rebuild a folder's manifest from a full listing.
+
+    Content types and hashes aren't part of the listing and are left empty.
+
+    Args:
+        store: write the rebuilt manifest (conditionally, see save_manifest())
+        etag: ETag of the unreadable manifest being replaced, if any
+
+    Returns:
+        The manifest dict.
+    """
+    manifest = _empty_manifest(folder)
+    entries = []
+    paginator = s3_client_instance.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=folder + '/'):
+        for obj in page.get('Contents', []):
+            key = obj['Key']
+            if key.endswith('/') or key.endswith(MANIFEST_SUFFIX) or is_sidecar(key):
+                continue
+            entries.append(manifest_entry(
+                key=key,
+                size=obj['Size'],
+                etag=obj.get('ETag'),
+                content_type=None,
+                last_modified=obj['LastModified'].isoformat(),
+            ))
+
+    _apply(manifest, entries, None)
+
+    latest = manifest['latest_description']
+    if latest:
+        response = s3_client_instance.get_object(Bucket=bucket, Key=latest['key'])
+        text = response['Body'].read().decode('utf-8')
+        if len(text) <= MANIFEST_INLINE_TEXT_MAX:
+            latest['text'] = text
+
+    if store:
+        save_manifest(s3_client_instance, bucket, folder, manifest, etag)
+        print(f'✓ Rebuilt upload manifest from listing ({len(entries)} file(s)): {manifest_s3_key(folder)}')
+    return manifest
+
+
+def get_manifest(s3_client_instance, bucket, folder):
+    """Load a folder's manifest, rebuilding it from a listing if it doesn't exist yet."""
+    manifest = load_manifest(s3_client_instance, bucket, folder)
+    if manifest is not None:
+        return manifest
+
+    with _folder_lock(folder):
+        try:
+            manifest, etag = _read_manifest(s3_client_instance, bucket, folder)
+        except ClientError as e:
+            print(f'⚠️  Could not read upload manifest s3://{bucket}/{manifest_s3_key(folder)}: {e}')
+            return build_manifest(s3_client_instance, bucket, folder, store=False)
+        if manifest is not None:
+            return manifest
+
+        try:
+            return build_manifest(s3_client_instance, bucket, folder, etag=etag)
+        except ClientError as e:
+            if not _is_write_conflict(e):
+                raise
+            # An upload wrote the manifest while we listed: it has every file we saw and more
+            return load_manifest(s3_client_instance, bucket, folder) or build_manifest(s3_client_instance, bucket, folder, store=False)